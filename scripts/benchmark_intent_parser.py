@@ -0,0 +1,159 @@
+"""
+Benchmark the single-pass intent parser against the per-field extractors it
+replaced (separate regex searches plus keyword-list scans).
+
+    python scripts/benchmark_intent_parser.py [--repeat 2000]
+
+Prints microseconds per message for both, and lists the corpus messages
+where the two disagree (the old extractors matched keywords as substrings).
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.backend.app.models import TransportationMode
+from src.backend.app.services.intent_parser import CATEGORY_KEYWORDS, parse_intent
+
+CORPUS = [
+    "Safest route to Ellis Library at 11 pm",
+    "Take me to a dorm",
+    "Go to Student Union",
+    "Fastest way from Memorial Union to Lafferre Hall",
+    "I need to get to the rec center at 6:30am",
+    "safe walk from Hatch Hall to Jesse Hall at 12am",
+    "where can I eat near campus",
+    "find me food",
+    "bike route to Engineering Building East",
+    "Is there a shuttle to the Hearnes Center?",
+    "drive me to Parking Structure 4 at 9pm",
+    "quick route towards Mizzou Arena",
+    "How do I get to the library tonight",
+    "get me to a dining hall, avoid dark streets",
+    "walk from Gateway Hall to the Student Center at 10:15 pm",
+    "directions to Cornell Hall please",
+    "Which garage is closest to Memorial Stadium?",
+    "I feel unsafe, route to the nearest residence hall",
+    "take the tiger line to downtown",
+    "shortest path to Speakers Circle",
+    "Safest way to the gym at midnight",
+    "cycling to the Life Sciences Center at 8am",
+    "from Stankowski Field to Ellis Library",
+    "any lecture hall near Strickland",
+    "route to Building 12",
+    "go to the MU Student Recreation Complex",
+    "I'm scared walking to Lot AV at 2 am",
+    "transit options to Columbia Regional Airport",
+    "fastest walk to Tate Hall at 1:05pm",
+    "can you help me find a classroom in Middlebush",
+    "route to Jesse Hall avoiding dark alleys",
+    "I avoided Hitt St last night, take me to the union",
+    "any shortcut to Lafferre Hall?",
+    "in a hurry, get me to Ellis Library asap",
+    "most secure way to the parking garage at 11:45pm",
+]
+
+
+# -- the extractors parse_intent replaced -------------------------------------
+def _legacy_category(query: str):
+    query_lower = query.lower()
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in query_lower:
+                return category
+    return None
+
+
+def _legacy_time(message: str) -> str:
+    time_match = re.search(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|AM|PM)?", message)
+    if not time_match:
+        return "current"
+    hour = int(time_match.group(1))
+    minute = int(time_match.group(2) or 0)
+    meridiem = (time_match.group(3) or "").lower()
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    if meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return "current"
+    return f"{hour:02d}:{minute:02d}"
+
+
+def legacy_parse(message: str) -> dict:
+    lowered = message.lower()
+    match = re.search(r"(?:to|towards)\s+(.+?)(?:\s+at\s+\d|$)", message, flags=re.IGNORECASE)
+    destination = match.group(1).strip() if match else ""
+    match = re.search(r"from\s+([A-Za-z][A-Za-z\s']+)\s+(?:to|towards)", message, flags=re.IGNORECASE)
+    origin = match.group(1).strip() if match else ""
+
+    if any(w in lowered for w in ["safe", "safest", "safety", "avoid"]):
+        priority = "safety"
+    elif any(w in lowered for w in ["fast", "fastest", "quick", "short"]):
+        priority = "speed"
+    else:
+        priority = "balanced"
+
+    if any(w in lowered for w in ["bike", "biking", "cycle", "cycling"]):
+        mode = TransportationMode.BIKE
+    elif any(w in lowered for w in ["drive", "driving", "car"]):
+        mode = TransportationMode.CAR
+    elif any(w in lowered for w in ["bus", "shuttle", "tiger line", "transit"]):
+        mode = TransportationMode.BUS
+    else:
+        mode = TransportationMode.WALK
+
+    return {
+        "destination": destination,
+        "origin": origin,
+        "priority": priority,
+        "time": _legacy_time(message),
+        "transportation_mode": mode,
+        # The dispatch endpoint checks the whole message, the agent the destination
+        "category": _legacy_category(message),
+        "destination_category": _legacy_category(destination),
+    }
+
+
+def compiled_parse(message: str) -> dict:
+    return vars(parse_intent(message))
+
+
+def _time_per_message(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in CORPUS:
+            func(message)
+    return (time.perf_counter() - started) / (repeat * len(CORPUS)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the corpus")
+    args = parser.parse_args()
+
+    legacy_us = _time_per_message(legacy_parse, args.repeat)
+    compiled_us = _time_per_message(compiled_parse, args.repeat)
+    print(f"{len(CORPUS)} messages x {args.repeat} passes")
+    print(f"  per-field extractors: {legacy_us:7.2f} us/message")
+    print(f"  single-pass parser:   {compiled_us:7.2f} us/message ({legacy_us / compiled_us:.1f}x)")
+
+    differences = 0
+    for message in CORPUS:
+        old, new = legacy_parse(message), compiled_parse(message)
+        changed = {field: (old[field], new[field]) for field in old if old[field] != new[field]}
+        if changed:
+            differences += 1
+            print(f"\n  {message!r}")
+            for field, (before, after) in changed.items():
+                print(f"    {field}: {before!r} -> {after!r}")
+    print(f"\n{len(CORPUS) - differences}/{len(CORPUS)} messages parse identically")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any, Dict
 
@@ -6,12 +7,12 @@ from .intent_agent import IntentAgent
 from .route_agent import RouteAgent
 from .safety_agent import SafetyAgent
 from .context_agent import ContextAgent
-from ..services.locations import get_locations_by_category
+from ..models import Coordinates
+from ..services.locations import get_category_options
 from ..schemas.agent_schemas import (
     AgentFinalResponse, 
     AgentRouteResponse,
     AgentDisambiguationResponse,
-    LocationOption
 )
 
 logger = logging.getLogger("campus_dispatch")
@@ -39,34 +40,24 @@ class CoordinatorAgent(BaseAgent):
             category = intent.get("category")
             logger.info(f"Disambiguation needed for category: {category}")
             
-            # Get all locations in the category
-            locations = get_locations_by_category(category, limit=10)
+            # Locations in the category, nearest to the origin first
+            origin_coords = intent.get("origin_coords") or input_data.get("origin_coords")
+            origin = Coordinates(**origin_coords) if origin_coords else None
+            options = await asyncio.to_thread(get_category_options, category, origin, 10)
             
-            if not locations:
+            if not options:
                 return AgentFinalResponse(
                     routes=[],
                     explanation=f"I couldn't find any {category} locations on campus.",
                 ).model_dump()
             
-            if len(locations) == 1:
+            if len(options) == 1:
                 # Only one option, use it automatically
                 logger.info(f"Only one {category} found, using automatically")
-                intent["destination_coords"] = locations[0].coordinates.model_dump()
+                intent["destination_coords"] = options[0].coordinates.model_dump()
                 # Continue with routing below
             else:
                 # Multiple options, return disambiguation response
-                origin_coords = intent.get("origin_coords")
-                options = [
-                    LocationOption(
-                        name=loc.name,
-                        address=loc.address,
-                        coordinates=loc.coordinates,
-                        category=loc.category,
-                        distance_meters=None  # Could calculate distance from origin if available
-                    )
-                    for loc in locations
-                ]
-                
                 question = self._format_disambiguation_question(category, len(options))
                 
                 return AgentDisambiguationResponse(
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any, Dict
 
@@ -31,7 +32,9 @@ class RouteAgent(BaseAgent):
                 transportation_mode = TransportationMode.WALK
 
         try:
-            routes = generate_routes(origin_coords, dest_coords, mode=transportation_mode)
+            routes = await asyncio.to_thread(
+                generate_routes, origin_coords, dest_coords, mode=transportation_mode
+            )
         except (OsrmError, Exception):
             logger.info("Routing failed for %s -> %s", origin_coords, dest_coords)
             return {"routes": []}
@@ -1,10 +1,11 @@
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Any, Dict
 
 from .base import BaseAgent
 from ..config import settings
-from ..services.safety import analyze_route_safety, patrol_frequency_label
+from ..services.safety import analyze_routes_safety, patrol_frequency_label
 from ..services.queries import (
     fetch_incidents,
     fetch_traffic_stop_count,
@@ -27,11 +28,9 @@ class SafetyAgent(BaseAgent):
         except Exception:
             current_time = datetime.now(timezone.utc)
 
-        results = []
-        for r_dict in routes:
+        def _lookup(r_dict: Dict[str, Any]):
             route_id = r_dict.get("route_id") or r_dict.get("id")
             geometry = LineString(**r_dict["geometry"])
-
             try:
                 incidents = fetch_incidents(
                     geometry,
@@ -52,19 +51,26 @@ class SafetyAgent(BaseAgent):
                 incidents = []
                 traffic_stops = 0
                 emergency_phones = []
+            return incidents, traffic_stops, emergency_phones
 
-            patrol = patrol_frequency_label(traffic_stops)
+        # Fan the per-route lookups out so they run concurrently off the event loop
+        lookups = await asyncio.gather(*(asyncio.to_thread(_lookup, r) for r in routes))
 
-            analysis = analyze_route_safety(
-                incidents=incidents,
-                emergency_phones=len(emergency_phones),
-                lighting_quality="moderate",
-                patrol_frequency=patrol,
-                user_mode=user_mode,
-                current_time=current_time,
-                route_length_m=r_dict.get("distance_meters") or r_dict.get("distance") or 1.0,
-            )
+        analyses = analyze_routes_safety(
+            incidents=[incidents for incidents, _, _ in lookups],
+            emergency_phones=[len(phones) for _, _, phones in lookups],
+            lighting_quality=["moderate"] * len(routes),
+            patrol_frequency=[patrol_frequency_label(stops) for _, stops, _ in lookups],
+            user_mode=user_mode,
+            current_times=[current_time],
+            route_lengths_m=[
+                r_dict.get("distance_meters") or r_dict.get("distance") or 1.0 for r_dict in routes
+            ],
+        )[0]
 
+        results = []
+        for r_dict, analysis in zip(routes, analyses):
+            route_id = r_dict.get("route_id") or r_dict.get("id")
             results.append(
                 SafetyAgentResult(
                     route_id=route_id,
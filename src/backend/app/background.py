@@ -0,0 +1,46 @@
+"""
+Periodic background jobs run on the API's event loop.
+
+Jobs are plain sync callables executed with ``asyncio.to_thread`` so a slow
+refresh never blocks request handling. They are started from the FastAPI
+startup hook and cancelled on shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger("campus_dispatch")
+
+_tasks: list[asyncio.Task] = []
+
+
+def start_periodic(
+    name: str,
+    interval_seconds: float,
+    func: Callable[[], object],
+    run_immediately: bool = False,
+) -> asyncio.Task:
+    """Run ``func`` every ``interval_seconds``; failures are logged, not raised."""
+
+    async def _loop() -> None:
+        if not run_immediately:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await asyncio.to_thread(func)
+            except Exception:
+                logger.exception("Background job %s failed", name)
+            await asyncio.sleep(interval_seconds)
+
+    task = asyncio.create_task(_loop(), name=name)
+    _tasks.append(task)
+    return task
+
+
+async def stop_all() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
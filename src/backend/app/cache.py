@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any
 
@@ -42,6 +44,39 @@ class MemoryCache(Cache):
         )
 
 
+class LRUCache(Cache):
+    """Bounded in-process cache: TTL per entry, least-recently-used eviction."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max(1, max_entries)
+        self._store: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        with self._lock:
+            self._store[key] = _MemoryEntry(
+                value=value,
+                expires_at=time.time() + ttl_seconds,
+            )
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
 class RedisCache(Cache):
     def __init__(self, redis_client) -> None:
         self._redis = redis_client
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import httpx
+
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Shared async HTTP client for outbound calls (OSRM, Nominatim).
+
+    One client per process keeps TLS sessions and keep-alive connections
+    to the upstream services warm between requests.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -1,11 +1,216 @@
+"""
+Pooled Postgres connections.
+
+``get_conn()`` hands out connections borrowed from a process-wide
+``psycopg_pool.ConnectionPool``. Callers keep using the two existing styles:
+
+    with get_conn() as conn: ...          # commit/rollback, then return to pool
+    conn = get_conn(); ...; conn.close()  # close() returns to pool
+
+``get_async_conn()`` is the asyncio counterpart. When ``psycopg_pool`` is not
+installed both fall back to opening a fresh connection per call.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 import psycopg
 
 from .config import settings
 
+logger = logging.getLogger("campus_dispatch")
+
+_pool = None
+_async_pool = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+_wait_stats = {"checkouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+_wait_lock = threading.Lock()
+
+
+# Passed as ``prepare=`` by the hot spatial queries so they are prepared on
+# first use instead of after psycopg's default threshold of 5 executions.
+PREPARE_HOT_QUERIES = settings.db_prepare_statements
+
+
+def _connect_kwargs() -> dict[str, Any]:
+    # Connections live as long as the pool, so per-connection prepared
+    # statements are reused across requests.
+    return {"prepare_threshold": 5 if settings.db_prepare_statements else None}
+
+
+def _record_wait(started: float) -> None:
+    wait_ms = (time.perf_counter() - started) * 1000.0
+    with _wait_lock:
+        _wait_stats["checkouts"] += 1
+        _wait_stats["wait_ms_total"] += wait_ms
+        _wait_stats["wait_ms_max"] = max(_wait_stats["wait_ms_max"], wait_ms)
+
+
+def _get_pool():
+    global _pool, _pool_unavailable
+    if _pool is not None or _pool_unavailable:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None and not _pool_unavailable:
+            try:
+                from psycopg_pool import ConnectionPool
+            except ImportError:
+                logger.warning("psycopg_pool not installed; using unpooled connections")
+                _pool_unavailable = True
+                return None
+
+            _pool = ConnectionPool(
+                settings.database_url,
+                min_size=settings.db_pool_min_size,
+                max_size=settings.db_pool_max_size,
+                timeout=settings.db_pool_timeout_seconds,
+                kwargs=_connect_kwargs(),
+                name="campus_dispatch",
+                open=False,
+            )
+            _pool.open(wait=False)
+    return _pool
+
+
+class PooledConnection:
+    """A borrowed connection whose ``close()`` hands it back to the pool."""
+
+    def __init__(self, pool, conn) -> None:
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._conn is not None:
+                if exc_type is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self.close()
+
+    def __del__(self) -> None:
+        # Safety net for code paths that forget to close: the pool resets the
+        # connection state when it is returned.
+        if getattr(self, "_conn", None) is not None:
+            try:
+                self.close()
+            except Exception:
+                pass
+
 
 def get_conn():
-    return psycopg.connect(settings.database_url)
+    pool = _get_pool()
+    if pool is None:
+        return psycopg.connect(settings.database_url, **_connect_kwargs())
+
+    started = time.perf_counter()
+    conn = pool.getconn()
+    _record_wait(started)
+    return PooledConnection(pool, conn)
 
 
 # Alias used by locations service
 get_db_connection = get_conn
+
+
+@asynccontextmanager
+async def get_async_conn() -> AsyncIterator[Any]:
+    """Borrow an async connection; commits on success, rolls back on error."""
+    if _async_pool is None:
+        conn = await psycopg.AsyncConnection.connect(
+            settings.database_url, **_connect_kwargs()
+        )
+        async with conn:
+            yield conn
+        return
+
+    started = time.perf_counter()
+    async with _async_pool.connection() as conn:
+        _record_wait(started)
+        yield conn
+
+
+def open_pool() -> None:
+    """Open the sync pool and wait until ``db_pool_min_size`` connections exist."""
+    pool = _get_pool()
+    if pool is None:
+        return
+    try:
+        pool.wait(timeout=settings.db_pool_timeout_seconds)
+        logger.info("DB pool warmed with %d connections", settings.db_pool_min_size)
+    except Exception:
+        logger.warning("DB pool pre-warm timed out; connections will be created on demand")
+
+
+async def open_async_pool() -> None:
+    """Create and pre-warm the async pool. Must run inside the event loop."""
+    global _async_pool
+    if _async_pool is not None:
+        return
+    try:
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError:
+        return
+
+    pool = AsyncConnectionPool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        kwargs=_connect_kwargs(),
+        name="campus_dispatch_async",
+        open=False,
+    )
+    await pool.open(wait=False)
+    _async_pool = pool
+    try:
+        await pool.wait(timeout=settings.db_pool_timeout_seconds)
+    except Exception:
+        logger.warning("Async DB pool pre-warm timed out; connections will be created on demand")
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+def pool_stats() -> dict[str, Any]:
+    """Pool sizes plus checkout wait-time metrics for the metrics endpoint."""
+    with _wait_lock:
+        checkouts = _wait_stats["checkouts"]
+        stats: dict[str, Any] = {
+            "checkouts": checkouts,
+            "wait_ms_avg": round(_wait_stats["wait_ms_total"] / checkouts, 3) if checkouts else 0.0,
+            "wait_ms_max": round(_wait_stats["wait_ms_max"], 3),
+        }
+    stats["sync"] = _pool.get_stats() if _pool is not None else None
+    stats["async"] = _async_pool.get_stats() if _async_pool is not None else None
+    return stats
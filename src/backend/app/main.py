@@ -1,31 +1,48 @@
+import asyncio
+import json
 import uuid
 import logging
 from datetime import datetime, timezone
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from .models import (
-    Coordinates, LineString, RouteRequest, RoutesResponse, Recommendation,
+    BatchRouteRequest, Coordinates, LineString, RouteRequest, RoutesResponse, Recommendation,
 )
-from .services.geocoding import geocode_location, GeocodingError
-from .services.osrm import generate_routes, OsrmError
-from .services.safety import analyze_route_safety, patrol_frequency_label
-from .services.ranking import rank_routes, build_ranked_routes
+from .services.geocoding import geocode_location_async, GeocodingError, nominatim_bucket
+from .services.osrm import generate_routes_async, OsrmError
+from .services.safety import analyze_routes_safety, edge_risk_scores, patrol_frequency_label
+from .services.ranking import rank_routes, rank_routes_all, build_ranked_routes
 from .services.queries import (
-    fetch_incidents,
+    RouteSafetyData,
+    fetch_route_safety_batch_async,
     fetch_traffic_stop_count,
-    fetch_emergency_phones,
 )
 from .agents.route_agent import RouteAgent
 from .agents.safety_agent import SafetyAgent
 from .agents.context_agent import ContextAgent
-from .db import get_conn
+from .db import (
+    PREPARE_HOT_QUERIES, get_conn, get_async_conn, open_pool, open_async_pool, close_pool, close_async_pool, pool_stats,
+)
 from .config import settings
 from .clients.archia_client import call_archia
-from .services.locations import is_category_query, get_locations_by_category
-from .schemas.agent_schemas import AgentDisambiguationResponse, LocationOption
-from .utils import parse_request_time
+from .clients.http_client import close_async_client
+from .background import start_periodic, stop_all
+from .services.route_cache import route_cache
+from .services.geocode_cache import geocode_cache
+from .services.gazetteer import gazetteer
+from .services.building_index import building_index, reverse_cache, reverse_cache_key
+from .services.incident_index import incident_index
+from .services.edge_risk import edge_risk_table
+from .services.local_router import get_local_graph, reachable_area, refresh_local_graph
+from .services.intent_parser import parse_intent
+from .services.location_index import location_index
+from .services.news_service import get_news_articles, get_news_sentiment, news_cache
+from .services.locations import get_category_options
+from .schemas.agent_schemas import AgentDisambiguationResponse
+from .utils import parse_request_time, risk_level_label
 
 logger = logging.getLogger("campus_dispatch")
 
@@ -39,8 +56,88 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-News-Updated-At", "X-News-Age-Seconds", "X-News-Stale"],
 )
 
+@app.on_event("startup")
+async def startup_event():
+    # Pre-warm DB pools so the first requests don't pay for connection setup
+    await asyncio.to_thread(open_pool)
+    await open_async_pool()
+    if settings.routing_backend == "local":
+        await asyncio.to_thread(get_local_graph)
+        # Re-maps the graph when safety_graph.py rewrites it
+        start_periodic(
+            "local_graph_refresh",
+            settings.local_graph_refresh_seconds,
+            refresh_local_graph,
+        )
+    if settings.route_cache_enabled:
+        start_periodic(
+            "route_cache_purge",
+            settings.route_cache_purge_interval_seconds,
+            route_cache.purge_expired,
+        )
+    if settings.geocode_cache_enabled:
+        start_periodic(
+            "geocode_cache_purge",
+            settings.geocode_cache_purge_interval_seconds,
+            geocode_cache.purge_expired,
+        )
+    if settings.gazetteer_enabled:
+        # Rebuilds only when a source table changed
+        start_periodic(
+            "gazetteer_refresh",
+            settings.gazetteer_refresh_seconds,
+            gazetteer.refresh,
+            run_immediately=True,
+        )
+    if settings.location_index_enabled:
+        start_periodic(
+            "location_index_refresh",
+            settings.location_index_refresh_seconds,
+            location_index.refresh,
+            run_immediately=True,
+        )
+    if settings.building_index_enabled:
+        start_periodic(
+            "building_index_refresh",
+            settings.building_index_refresh_seconds,
+            building_index.refresh,
+            run_immediately=True,
+        )
+    if settings.news_refresh_enabled:
+        start_periodic(
+            "news_refresh",
+            settings.news_refresh_seconds,
+            news_cache.refresh,
+            run_immediately=True,
+        )
+    if settings.incident_index_enabled:
+        # First run loads the whole index; later runs only pull new rows
+        start_periodic(
+            "incident_index_refresh",
+            settings.incident_index_refresh_seconds,
+            incident_index.refresh,
+            run_immediately=True,
+        )
+    if settings.edge_risk_enabled:
+        start_periodic(
+            "edge_risk_refresh",
+            settings.edge_risk_refresh_seconds,
+            edge_risk_table.refresh,
+            run_immediately=True,
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_all()
+    await close_async_client()
+    await close_async_pool()
+    close_pool()
+
+
 # Initialize local agents (used by MCP endpoints)
 route_agent = RouteAgent()
 safety_agent = SafetyAgent()
@@ -50,29 +147,39 @@ context_agent = ContextAgent()
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def _resolve_coords(value) -> Coordinates:
+async def _resolve_coords(value) -> Coordinates:
     """Resolve a string location name or dict/Coordinates to Coordinates."""
     if isinstance(value, str):
-        return geocode_location(value)
+        return await geocode_location_async(value)
     if isinstance(value, dict):
         return Coordinates(**value)
     return value
 
 
-def _generate_route_pipeline(
+async def _resolve_endpoints(origin, destination) -> tuple[Coordinates, Coordinates]:
+    """Resolve origin and destination concurrently."""
+    return await asyncio.gather(_resolve_coords(origin), _resolve_coords(destination))
+
+
+async def _generate_route_candidates(
     origin: Coordinates,
     destination: Coordinates,
-    priority: str,
     user_mode: str,
     time_str: str,
     transportation_mode: str = "foot",
+    force_refresh: bool = False,
 ) -> dict:
     """
-    Full local route generation pipeline:
+    Priority-independent half of the route pipeline:
     1. OSRM route generation
-    2. Safety analysis per route (DB queries)
-    3. Ranking
-    4. Build RankedRoute objects
+    2. Safety analysis per route (one batched DB query for all routes);
+       the risk score comes from the in-memory edge_risk table when it
+       covers every route, otherwise from nearby incidents
+
+    The result can be ranked under any number of priorities without repeating
+    the OSRM request or the safety lookups. Every network and database
+    round-trip is awaited, so the event loop keeps serving other requests
+    while this one waits on OSRM or Postgres.
     """
     try:
         current_time = parse_request_time(time_str)
@@ -85,58 +192,94 @@ def _generate_route_pipeline(
         mode = TM(transportation_mode)
     except ValueError:
         mode = TM.WALK
-    routes = generate_routes(origin, destination, mode=mode)
+    routes = await generate_routes_async(
+        origin, destination, mode=mode, use_cache=not force_refresh, hour=current_time.hour
+    )
 
-    # 2. Safety analysis for each route
-    all_incidents = []
-    all_phones = []
-    analyses = []
+    # Precomputed per-edge risk scores every alternative when the edge_risk
+    # table covers all of them. Incidents are still fetched for the
+    # response, concerns and tips (from the in-memory index when loaded).
+    edge_scores = None
+    if settings.edge_risk_enabled and edge_risk_table.ready:
+        edge_scores = [edge_risk_table.score(route.geometry) for route in routes]
+        if not all(
+            score is not None and score.matched_fraction >= settings.edge_risk_min_match
+            for score in edge_scores
+        ):
+            edge_scores = None
+
+    # 2. Safety analysis for each route — one batched query for all alternatives
+    try:
+        safety_data = await fetch_route_safety_batch_async(
+            [route.geometry for route in routes],
+            radius_m=settings.spatial_radius_m,
+            phone_radius_m=settings.phone_radius_m,
+            days_back=settings.temporal_window_days,
+            traffic_days_back=settings.traffic_window_days,
+        )
+    except Exception:
+        logger.exception("Batched safety lookup failed for %d routes", len(routes))
+        safety_data = [RouteSafetyData() for _ in routes]
+
+    # One vectorized scoring pass over every alternative
+    analyses = analyze_routes_safety(
+        incidents=[data.incidents for data in safety_data],
+        emergency_phones=[len(data.emergency_phones) for data in safety_data],
+        lighting_quality=["moderate"] * len(routes),
+        patrol_frequency=[patrol_frequency_label(data.traffic_stops) for data in safety_data],
+        user_mode=user_mode,
+        current_times=[current_time],
+        route_lengths_m=[route.distance_meters for route in routes],
+    )[0]
+
+    if edge_scores is not None:
+        risks = edge_risk_scores(
+            [score.excess_risk_m for score in edge_scores],
+            [analysis.patrol_frequency for analysis in analyses],
+            current_time,
+            settings.edge_risk_full_scale_m,
+        )
+        for analysis, score, risk in zip(analyses, edge_scores, risks.tolist()):
+            analysis.risk_score = int(risk)
+            analysis.risk_level = risk_level_label(risk)
+            analysis.edge_risk_m = round(score.risk_m, 1)
+            analysis.contributing_factors.append(f"Risk from {score.edge_count} street segments along the route")
 
-    for route in routes:
-        try:
-            incidents = fetch_incidents(
-                route.geometry,
-                radius_m=settings.spatial_radius_m,
-                days_back=settings.temporal_window_days,
-            )
-        except Exception:
-            logger.exception("Incident fetch failed for route %s", route.id)
-            incidents = []
+    all_incidents = [inc for data in safety_data for inc in data.incidents]
+    all_phones = [phone for data in safety_data for phone in data.emergency_phones]
 
-        try:
-            traffic_stops = fetch_traffic_stop_count(
-                route.geometry,
-                radius_m=settings.spatial_radius_m,
-                days_back=settings.traffic_window_days,
-            )
-        except Exception:
-            traffic_stops = 0
+    # De-duplicate incidents by id
+    seen_ids: set[str] = set()
+    unique_incidents = []
+    for inc in all_incidents:
+        if inc.id not in seen_ids:
+            seen_ids.add(inc.id)
+            unique_incidents.append(inc)
 
-        try:
-            phones = fetch_emergency_phones(
-                route.geometry,
-                radius_m=settings.phone_radius_m,
-            )
-        except Exception:
-            phones = []
-
-        patrol = patrol_frequency_label(traffic_stops)
-        analysis = analyze_route_safety(
-            incidents=incidents,
-            emergency_phones=len(phones),
-            lighting_quality="moderate",
-            patrol_frequency=patrol,
-            user_mode=user_mode,
-            current_time=current_time,
-            route_length_m=route.distance_meters,
-        )
+    # De-duplicate phones
+    unique_phones = list({(p.latitude, p.longitude): p for p in all_phones}.values())
 
-        analyses.append(analysis)
-        all_incidents.extend(incidents)
-        all_phones.extend(phones)
+    return {
+        "routes": routes,
+        "analyses": analyses,
+        "current_time": current_time,
+        "incidents": unique_incidents,
+        "emergency_phones": unique_phones,
+    }
+
+
+def _rank_candidates(candidates: dict, priority: str, ranked_indices: list[int] | None = None) -> dict:
+    """
+    Ranking half of the route pipeline:
+    3. Ranking (skipped when ``ranked_indices`` was already computed)
+    4. Build RankedRoute objects
+    """
+    routes = candidates["routes"]
+    analyses = candidates["analyses"]
 
     # 3. Rank routes
-    ranked_indices = rank_routes(routes, analyses, priority, current_time.hour)
+    if ranked_indices is None:
+        ranked_indices = rank_routes(routes, analyses, priority, candidates["current_time"].hour)
 
     # 4. Build RankedRoute objects
     ranked_routes = build_ranked_routes(routes, analyses, ranked_indices)
@@ -152,25 +295,57 @@ def _generate_route_pipeline(
     else:
         explanation = "No routes could be generated."
 
-    # De-duplicate incidents by id
-    seen_ids: set[str] = set()
-    unique_incidents = []
-    for inc in all_incidents:
-        if inc.id not in seen_ids:
-            seen_ids.add(inc.id)
-            unique_incidents.append(inc)
-
-    # De-duplicate phones
-    unique_phones = list({(p.latitude, p.longitude): p for p in all_phones}.values())
-
     return {
         "ranked_routes": ranked_routes,
-        "incidents": unique_incidents,
-        "emergency_phones": unique_phones,
         "explanation": explanation,
     }
 
 
+async def _generate_route_pipeline(
+    origin: Coordinates,
+    destination: Coordinates,
+    priority: str,
+    user_mode: str,
+    time_str: str,
+    transportation_mode: str = "foot",
+    all_rankings: bool = False,
+    force_refresh: bool = False,
+) -> dict:
+    """
+    Full local route generation pipeline: candidates, then ranking.
+
+    With ``all_rankings`` the same candidates are also ranked under every
+    priority and returned as ``rankings`` (priority -> ordered route ids).
+    """
+    candidates = await _generate_route_candidates(
+        origin, destination, user_mode, time_str, transportation_mode,
+        force_refresh=force_refresh,
+    )
+    return _rank_pipeline_candidates(candidates, priority, all_rankings)
+
+
+def _rank_pipeline_candidates(candidates: dict, priority: str, all_rankings: bool = False) -> dict:
+    """Ranking half of ``_generate_route_pipeline``, reusable across priorities."""
+    rankings = None
+    ranked_indices = None
+    if all_rankings:
+        all_indices = rank_routes_all(
+            candidates["routes"], candidates["analyses"], candidates["current_time"].hour
+        )
+        ranked_indices = all_indices.get(priority)
+        rankings = {
+            p: [candidates["routes"][i].id for i in indices]
+            for p, indices in all_indices.items()
+        }
+
+    return {
+        **_rank_candidates(candidates, priority, ranked_indices),
+        "incidents": candidates["incidents"],
+        "emergency_phones": candidates["emergency_phones"],
+        "rankings": rankings,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Main route endpoint — uses LOCAL pipeline for real routes
 # ---------------------------------------------------------------------------
@@ -181,19 +356,20 @@ async def api_routes(request: RouteRequest):
     Returns structured RoutesResponse for the frontend map.
     """
     try:
-        origin = _resolve_coords(request.origin)
-        destination = _resolve_coords(request.destination)
+        origin, destination = await _resolve_endpoints(request.origin, request.destination)
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=f"Could not geocode location: {e}")
 
     try:
-        result = _generate_route_pipeline(
+        result = await _generate_route_pipeline(
             origin=origin,
             destination=destination,
             priority=request.priority,
             user_mode=request.user_mode,
             time_str=request.time,
-            transportation_mode=request.transportation_mode.value if hasattr(request.transportation_mode, 'value') else str(request.transportation_mode),
+            transportation_mode=_transportation_mode_value(request),
+            all_rankings=request.include_all_rankings,
+            force_refresh=request.force_refresh,
         )
     except OsrmError as e:
         raise HTTPException(status_code=502, detail=f"Routing service error: {e}")
@@ -201,6 +377,16 @@ async def api_routes(request: RouteRequest):
         logger.exception("Route pipeline error")
         raise HTTPException(status_code=500, detail=f"Route generation error: {e}")
 
+    return _routes_response(request, result)
+
+
+def _transportation_mode_value(request: RouteRequest) -> str:
+    mode = request.transportation_mode
+    return mode.value if hasattr(mode, 'value') else str(mode)
+
+
+def _routes_response(request: RouteRequest, result: dict) -> dict:
+    """Serialized RoutesResponse for a ranked pipeline result."""
     ranked_routes = result["ranked_routes"]
 
     recommendation = Recommendation(
@@ -220,6 +406,7 @@ async def api_routes(request: RouteRequest):
             recommendation=recommendation,
             incidents=result["incidents"],
             emergency_phones=result["emergency_phones"],
+            rankings=result["rankings"],
         )
         return resp.model_dump(mode="json")
     except Exception as e:
@@ -227,6 +414,125 @@ async def api_routes(request: RouteRequest):
         raise HTTPException(status_code=500, detail=f"Serialization error: {e}")
 
 
+# ---------------------------------------------------------------------------
+# Batch route endpoint — many origin/destination pairs, streamed as NDJSON
+# ---------------------------------------------------------------------------
+async def _geocode_batch(requests: list[RouteRequest], semaphore: asyncio.Semaphore) -> dict:
+    """Geocode every distinct location name in the batch once."""
+    names = {
+        value
+        for request in requests
+        for value in (request.origin, request.destination)
+        if isinstance(value, str)
+    }
+
+    async def resolve(name: str):
+        async with semaphore:
+            try:
+                return name, await geocode_location_async(name)
+            except Exception as e:
+                # A Nominatim outage fails only the items that need this name
+                if not isinstance(e, GeocodingError):
+                    logger.warning("Batch geocoding failed for %r: %s", name, e)
+                return name, e
+
+    return dict(await asyncio.gather(*(resolve(name) for name in names)))
+
+
+async def _batch_route_item(
+    index: int,
+    request: RouteRequest,
+    geocoded: dict,
+    candidate_tasks: dict,
+    semaphore: asyncio.Semaphore,
+) -> dict:
+    """One NDJSON line: the RoutesResponse for ``request``, or its error."""
+    endpoints = []
+    for value in (request.origin, request.destination):
+        resolved = geocoded.get(value) if isinstance(value, str) else await _resolve_coords(value)
+        if isinstance(resolved, GeocodingError):
+            return {"index": index, "status": 400, "error": f"Could not geocode location: {resolved}"}
+        if isinstance(resolved, Exception):
+            return {"index": index, "status": 502, "error": f"Geocoding service error: {resolved}"}
+        endpoints.append(resolved)
+    origin, destination = endpoints
+
+    # Requests that differ only in priority share one set of candidates
+    mode = _transportation_mode_value(request)
+    key = (
+        origin.latitude, origin.longitude, destination.latitude, destination.longitude,
+        request.user_mode, request.time, mode, request.force_refresh,
+    )
+    task = candidate_tasks.get(key)
+    if task is None:
+        async def generate():
+            async with semaphore:
+                return await _generate_route_candidates(
+                    origin, destination, request.user_mode, request.time, mode,
+                    force_refresh=request.force_refresh,
+                )
+        task = candidate_tasks[key] = asyncio.ensure_future(generate())
+
+    try:
+        candidates = await task
+        result = _rank_pipeline_candidates(candidates, request.priority, request.include_all_rankings)
+        return {"index": index, "status": 200, "response": _routes_response(request, result)}
+    except OsrmError as e:
+        return {"index": index, "status": 502, "error": f"Routing service error: {e}"}
+    except HTTPException as e:
+        return {"index": index, "status": e.status_code, "error": e.detail}
+    except Exception as e:
+        logger.exception("Batch route pipeline error")
+        return {"index": index, "status": 500, "error": f"Route generation error: {e}"}
+
+
+@app.post("/api/routes/batch")
+async def api_routes_batch(request: BatchRouteRequest):
+    """
+    Plan routes for many origin/destination pairs in one call.
+
+    Location names are geocoded once per batch and identical pairs share
+    route generation and safety scoring, which run at most
+    ``BATCH_ROUTE_CONCURRENCY`` at a time. Results stream back as NDJSON,
+    one ``{"index", "status", "response" | "error"}`` object per line, in
+    completion order.
+    """
+    if len(request.requests) > settings.batch_route_max_pairs:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_route_max_pairs} route requests per batch",
+        )
+
+    async def stream():
+        semaphore = asyncio.Semaphore(settings.batch_route_concurrency)
+        geocoded = await _geocode_batch(request.requests, semaphore)
+        candidate_tasks: dict = {}
+        items = [
+            asyncio.ensure_future(_batch_route_item(i, item, geocoded, candidate_tasks, semaphore))
+            for i, item in enumerate(request.requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(items):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away: stop the work still queued for it
+            for task in [*items, *candidate_tasks.values()]:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+async def _dispatch_origin(value) -> Coordinates | None:
+    """The user's origin or GPS fix for ranking options; None when unusable."""
+    if not value:
+        return None
+    try:
+        return await _resolve_coords(value)
+    except Exception as e:
+        logger.info(f"Could not resolve dispatch origin {value!r}: {e}")
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Chat/dispatch endpoint — Archia AI for conversational response
 # ---------------------------------------------------------------------------
@@ -238,7 +544,9 @@ async def dispatch(req: Request):
 
     Flow:
       1. Check if the message is a category query (dorm, library, etc.)
-         - If yes, return disambiguation options from local DB
+         - If yes, return disambiguation options from the in-memory
+           location table, nearest first when the body carries an
+           "origin" or "current_location" (or the message says "from X")
       2. Otherwise, forward to Archia AI for conversational routing
     """
     data = await req.json()
@@ -247,12 +555,14 @@ async def dispatch(req: Request):
         raise HTTPException(status_code=400, detail="Missing 'message' field")
 
     # ── Step 1: Local disambiguation check ──────────────────────
-    is_category, category = is_category_query(message)
-    if is_category and category:
-        locations = get_locations_by_category(category, limit=10)
-
-        if len(locations) > 1:
-            # Multiple options — ask the user to pick
+    intent = parse_intent(message)
+    category = intent.category
+    if category:
+        origin = await _dispatch_origin(data.get("origin") or data.get("current_location") or intent.origin)
+        options = await asyncio.to_thread(get_category_options, category, origin, 10)
+
+        if len(options) > 1:
+            # Multiple options — ask the user to pick, nearest first
             category_labels = {
                 "dorm": "dorm",
                 "library": "library",
@@ -263,28 +573,16 @@ async def dispatch(req: Request):
             }
             label = category_labels.get(category, category)
 
-            options = [
-                LocationOption(
-                    name=loc.name,
-                    address=loc.address,
-                    coordinates=loc.coordinates,
-                    category=loc.category,
-                    distance_meters=None,
-                )
-                for loc in locations
-            ]
-
             return AgentDisambiguationResponse(
                 category=category,
                 question=f"Which {label} would you like to go to?",
                 options=options,
             ).model_dump()
 
-        elif len(locations) == 1:
+        elif len(options) == 1:
             # Single match — skip disambiguation, route via Archia
-            loc = locations[0]
-            message = f"Take me to {loc.name}"
-            logger.info(f"Single {category} match, routing directly to {loc.name}")
+            message = f"Take me to {options[0].name}"
+            logger.info(f"Single {category} match, routing directly to {options[0].name}")
 
         # else: no locations found, fall through to Archia
 
@@ -320,15 +618,7 @@ async def mcp_route(payload: dict):
         return {"error": "Missing origin or destination"}
 
     try:
-        if isinstance(origin_raw, str):
-            origin = geocode_location(origin_raw)
-        else:
-            origin = Coordinates(**origin_raw)
-
-        if isinstance(dest_raw, str):
-            dest = geocode_location(dest_raw)
-        else:
-            dest = Coordinates(**dest_raw)
+        origin, dest = await _resolve_endpoints(origin_raw, dest_raw)
     except Exception as e:
         return {"error": f"Geocoding failed: {str(e)}"}
 
@@ -360,24 +650,18 @@ async def mcp_shuttle(payload: dict):
         return {"error": "Missing location"}
 
     try:
-        if isinstance(loc_raw, str):
-            loc = geocode_location(loc_raw)
-        else:
-            loc = Coordinates(**loc_raw)
-
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT stop_name, ST_Distance(location_geo, ST_SetSRID(ST_MakePoint(%s, %s), 4326), true) as dist
-            FROM shuttle_stops
-            WHERE ST_DWithin(location_geo, ST_SetSRID(ST_MakePoint(%s, %s), 4326), 500)
-            ORDER BY dist ASC
-            LIMIT 3;
-        """, (loc.longitude, loc.latitude, loc.longitude, loc.latitude))
-
-        stops = [{"name": row[0], "distance_meters": row[1]} for row in cur.fetchall()]
-        cur.close()
-        conn.close()
+        loc = await _resolve_coords(loc_raw)
+
+        async with get_async_conn() as conn, conn.cursor() as cur:
+            await cur.execute("""
+                SELECT stop_name, ST_Distance(location_geo, ST_SetSRID(ST_MakePoint(%s, %s), 4326), true) as dist
+                FROM shuttle_stops
+                WHERE ST_DWithin(location_geo, ST_SetSRID(ST_MakePoint(%s, %s), 4326), 500)
+                ORDER BY dist ASC
+                LIMIT 3;
+            """, (loc.longitude, loc.latitude, loc.longitude, loc.latitude))
+
+            stops = [{"name": row[0], "distance_meters": row[1]} for row in await cur.fetchall()]
 
         return {"nearby_stops": stops}
     except Exception as e:
@@ -387,17 +671,18 @@ async def mcp_shuttle(payload: dict):
 @app.post("/mcp/traffic")
 async def mcp_traffic(payload: dict):
     routes = payload.get("routes", [])
-    results = []
 
-    for r in routes:
+    def _count(r: dict) -> dict:
         try:
             geom = LineString(**r["geometry"])
             count = fetch_traffic_stop_count(geom, settings.spatial_radius_m, settings.traffic_window_days)
-            results.append({"route_id": r.get("id") or r.get("route_id"), "traffic_stops": count})
+            return {"route_id": r.get("id") or r.get("route_id"), "traffic_stops": count}
         except Exception:
-            results.append({"route_id": r.get("id") or r.get("route_id"), "traffic_stops": 0})
+            return {"route_id": r.get("id") or r.get("route_id"), "traffic_stops": 0}
 
-    return {"results": results}
+    # Per-route lookups run concurrently on pooled connections
+    results = await asyncio.gather(*(asyncio.to_thread(_count, r) for r in routes))
+    return {"results": list(results)}
 
 
 @app.post("/mcp/rag")
@@ -410,16 +695,21 @@ async def mcp_rag(payload: dict):
 # News endpoints — local safety news with NLP classification
 # ---------------------------------------------------------------------------
 @app.get("/api/news")
-def api_news():
+def api_news(response: Response):
     """Get classified, sentiment-scored local safety news articles."""
-    from .services.news_service import get_news_articles
-    return get_news_articles()
+    articles = get_news_articles()
+    # The body stays a bare list; freshness travels in headers
+    freshness = news_cache.freshness()
+    response.headers["X-News-Updated-At"] = freshness["updated_at"] or ""
+    response.headers["X-News-Stale"] = "true" if freshness["stale"] else "false"
+    if freshness["age_seconds"] is not None:
+        response.headers["X-News-Age-Seconds"] = str(freshness["age_seconds"])
+    return articles
 
 
 @app.get("/api/news/sentiment")
 def api_news_sentiment():
     """Get aggregated sentiment statistics."""
-    from .services.news_service import get_news_sentiment
     return get_news_sentiment()
 
 
@@ -456,6 +746,35 @@ def api_risk_zones(time: int = None):
     return generate_risk_grid(hour=time)
 
 
+# ---------------------------------------------------------------------------
+# Safe-walk reachability endpoint
+# ---------------------------------------------------------------------------
+@app.get("/api/reachability")
+def api_reachability(
+    lat: float,
+    lon: float,
+    minutes: float = 10,
+    max_risk: float | None = None,
+    time: str = "current",
+):
+    """
+    Area reachable on foot from (lat, lon) within ``minutes``, avoiding
+    street segments with a risk factor above ``max_risk``, as GeoJSON.
+    """
+    if not 0 < minutes <= 60:
+        raise HTTPException(status_code=400, detail="minutes must be between 0 and 60")
+    graph = get_local_graph()
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Local routing graph unavailable")
+    try:
+        current_time = parse_request_time(time)
+    except Exception:
+        current_time = datetime.now(timezone.utc)
+    return reachable_area(
+        graph, Coordinates(latitude=lat, longitude=lon), minutes, max_risk, current_time.hour
+    )
+
+
 # ---------------------------------------------------------------------------
 # Infrastructure endpoints
 # ---------------------------------------------------------------------------
@@ -473,40 +792,98 @@ def api_traffic_signals():
     return get_traffic_signals()
 
 
+# ---------------------------------------------------------------------------
+# Location typeahead endpoint
+# ---------------------------------------------------------------------------
+@app.get("/api/locations/suggest")
+def api_location_suggest(
+    q: str,
+    lat: float | None = None,
+    lon: float | None = None,
+    limit: int = 8,
+):
+    """
+    Campus place suggestions for partially typed ``q``, served from the
+    in-memory gazetteer. With (lat, lon), nearer places rank higher.
+    """
+    if not 1 <= limit <= 25:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 25")
+    origin = None
+    if lat is not None and lon is not None:
+        origin = Coordinates(latitude=lat, longitude=lon)
+    suggestions = gazetteer.suggest(q, limit=limit, origin=origin)
+    return {
+        "suggestions": [
+            {
+                "name": s.place.name,
+                "category": s.place.category,
+                "source": s.place.source,
+                "latitude": s.place.latitude,
+                "longitude": s.place.longitude,
+                "score": round(s.score, 3),
+                "distance_meters": round(s.distance_m) if s.distance_m is not None else None,
+            }
+            for s in suggestions
+        ]
+    }
+
+
 # ---------------------------------------------------------------------------
 # Reverse geocoding endpoint
 # ---------------------------------------------------------------------------
 @app.get("/api/geocode/reverse")
 def api_reverse_geocode(lat: float, lon: float):
     """Reverse geocode lat/lon to a place name."""
-    # Try campus buildings table first
+    key = reverse_cache_key(lat, lon)
+    cached = reverse_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = _reverse_geocode(lat, lon)
+    # Bare coordinates mean every source failed; worth retrying next time
+    if result["source"] != "coordinates":
+        reverse_cache.set(key, result, settings.reverse_geocode_cache_ttl_seconds)
+    return result
+
+
+def _reverse_geocode(lat: float, lon: float) -> dict:
+    # Campus buildings first: the in-memory footprint index when loaded
+    if building_index.ready:
+        name = building_index.lookup(lat, lon)
+        if name:
+            return {"display_name": name, "source": "campus_buildings"}
+        return _reverse_geocode_nominatim(lat, lon)
+
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT name FROM campus_buildings
-            WHERE ST_DWithin(
-                geometry,
-                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-                50
-            )
-            ORDER BY ST_Distance(
-                geometry,
-                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-            )
-            LIMIT 1
-        """, (lon, lat, lon, lat))
-        row = cur.fetchone()
-        cur.close()
-        conn.close()
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT name FROM campus_buildings
+                WHERE ST_DWithin(
+                    geometry,
+                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+                    50
+                )
+                ORDER BY ST_Distance(
+                    geometry,
+                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                )
+                LIMIT 1
+            """, (lon, lat, lon, lat), prepare=PREPARE_HOT_QUERIES)
+            row = cur.fetchone()
         if row:
             return {"display_name": row[0], "source": "campus_buildings"}
     except Exception:
         pass
+    return _reverse_geocode_nominatim(lat, lon)
+
 
-    # Fall back to Nominatim
+def _reverse_geocode_nominatim(lat: float, lon: float) -> dict:
     try:
         import requests
+        # Interactive: answer with the coordinates rather than queue behind
+        # forward geocoding for the shared Nominatim budget
+        if not nominatim_bucket.acquire(max_wait=settings.reverse_geocode_max_wait_seconds):
+            return {"display_name": f"{lat:.4f}, {lon:.4f}", "source": "coordinates"}
         resp = requests.get(
             "https://nominatim.openstreetmap.org/reverse",
             params={"lat": lat, "lon": lon, "format": "json", "zoom": 18},
@@ -532,22 +909,19 @@ def api_reverse_geocode(lat: float, lon: float):
 async def api_route_compare(request: RouteRequest):
     """Compare fast vs safe route side by side."""
     try:
-        origin = _resolve_coords(request.origin)
-        destination = _resolve_coords(request.destination)
+        origin, destination = await _resolve_endpoints(request.origin, request.destination)
     except GeocodingError as e:
         raise HTTPException(status_code=400, detail=f"Could not geocode: {e}")
 
     try:
-        fast_result = _generate_route_pipeline(
+        # One OSRM request and one safety lookup, ranked both ways
+        candidates = await _generate_route_candidates(
             origin=origin, destination=destination,
-            priority="speed", user_mode=request.user_mode,
-            time_str=request.time,
-        )
-        safe_result = _generate_route_pipeline(
-            origin=origin, destination=destination,
-            priority="safety", user_mode=request.user_mode,
-            time_str=request.time,
+            user_mode=request.user_mode, time_str=request.time,
+            force_refresh=request.force_refresh,
         )
+        fast_result = _rank_candidates(candidates, "speed")
+        safe_result = _rank_candidates(candidates, "safety")
     except Exception as e:
         logger.exception("Route comparison error")
         raise HTTPException(status_code=500, detail=str(e))
@@ -586,28 +960,25 @@ async def api_route_compare(request: RouteRequest):
 def api_transit_routes():
     """Get all CoMo Transit fixed routes."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT id, route_number, route_name, route_color, route_description, is_active
-            FROM transit_routes
-            WHERE is_active = TRUE
-            ORDER BY route_number;
-        """)
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, route_number, route_name, route_color, route_description, is_active
+                FROM transit_routes
+                WHERE is_active = TRUE
+                ORDER BY route_number;
+            """)
         
-        routes = []
-        for row in cur.fetchall():
-            routes.append({
-                "id": row[0],
-                "route_number": row[1],
-                "route_name": row[2],
-                "route_color": row[3],
-                "route_description": row[4],
-                "is_active": row[5],
-            })
+            routes = []
+            for row in cur.fetchall():
+                routes.append({
+                    "id": row[0],
+                    "route_number": row[1],
+                    "route_name": row[2],
+                    "route_color": row[3],
+                    "route_description": row[4],
+                    "is_active": row[5],
+                })
         
-        cur.close()
-        conn.close()
         return {"routes": routes}
     except Exception as e:
         logger.exception("Transit routes fetch error")
@@ -618,33 +989,27 @@ def api_transit_routes():
 def api_transit_route_detail(route_id: int):
     """Get detailed information for a specific route."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        
-        # Get route info
-        cur.execute("""
-            SELECT id, route_number, route_name, route_color, route_description, is_active
-            FROM transit_routes
-            WHERE id = %s;
-        """, (route_id,))
+        with get_conn() as conn, conn.cursor() as cur:
+            # Get route info
+            cur.execute("""
+                SELECT id, route_number, route_name, route_color, route_description, is_active
+                FROM transit_routes
+                WHERE id = %s;
+            """, (route_id,))
         
-        row = cur.fetchone()
-        if not row:
-            cur.close()
-            conn.close()
-            raise HTTPException(status_code=404, detail="Route not found")
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Route not found")
         
-        route = {
-            "id": row[0],
-            "route_number": row[1],
-            "route_name": row[2],
-            "route_color": row[3],
-            "route_description": row[4],
-            "is_active": row[5],
-        }
+            route = {
+                "id": row[0],
+                "route_number": row[1],
+                "route_name": row[2],
+                "route_color": row[3],
+                "route_description": row[4],
+                "is_active": row[5],
+            }
         
-        cur.close()
-        conn.close()
         return route
     except HTTPException:
         raise
@@ -657,34 +1022,30 @@ def api_transit_route_detail(route_id: int):
 def api_transit_route_stops(route_id: int):
     """Get all stops for a specific route."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT id, route_id, stop_code, stop_name, stop_sequence, 
+                       ST_Y(location_geo::geometry) as latitude, 
+                       ST_X(location_geo::geometry) as longitude,
+                       is_timepoint
+                FROM transit_stops
+                WHERE route_id = %s
+                ORDER BY stop_sequence;
+            """, (route_id,))
         
-        cur.execute("""
-            SELECT id, route_id, stop_code, stop_name, stop_sequence, 
-                   ST_Y(location_geo::geometry) as latitude, 
-                   ST_X(location_geo::geometry) as longitude,
-                   is_timepoint
-            FROM transit_stops
-            WHERE route_id = %s
-            ORDER BY stop_sequence;
-        """, (route_id,))
+            stops = []
+            for row in cur.fetchall():
+                stops.append({
+                    "id": row[0],
+                    "route_id": row[1],
+                    "stop_code": row[2],
+                    "stop_name": row[3],
+                    "stop_sequence": row[4],
+                    "latitude": row[5],
+                    "longitude": row[6],
+                    "is_timepoint": row[7],
+                })
         
-        stops = []
-        for row in cur.fetchall():
-            stops.append({
-                "id": row[0],
-                "route_id": row[1],
-                "stop_code": row[2],
-                "stop_name": row[3],
-                "stop_sequence": row[4],
-                "latitude": row[5],
-                "longitude": row[6],
-                "is_timepoint": row[7],
-            })
-        
-        cur.close()
-        conn.close()
         return {"stops": stops}
     except Exception as e:
         logger.exception("Transit stops fetch error")
@@ -695,39 +1056,35 @@ def api_transit_route_stops(route_id: int):
 def api_transit_route_schedule(route_id: int, service_type: str = "weekday"):
     """Get schedule for a specific route and service type."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT 
-                ts.id,
-                ts.stop_code,
-                ts.stop_name,
-                ts.stop_sequence,
-                sch.departure_time,
-                sch.is_last_stop,
-                sch.service_type
-            FROM transit_schedules sch
-            JOIN transit_stops ts ON ts.id = sch.stop_id
-            WHERE sch.route_id = %s 
-              AND sch.service_type = %s
-            ORDER BY sch.departure_time, ts.stop_sequence;
-        """, (route_id, service_type))
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT 
+                    ts.id,
+                    ts.stop_code,
+                    ts.stop_name,
+                    ts.stop_sequence,
+                    sch.departure_time,
+                    sch.is_last_stop,
+                    sch.service_type
+                FROM transit_schedules sch
+                JOIN transit_stops ts ON ts.id = sch.stop_id
+                WHERE sch.route_id = %s 
+                  AND sch.service_type = %s
+                ORDER BY sch.departure_time, ts.stop_sequence;
+            """, (route_id, service_type))
         
-        schedule_entries = []
-        for row in cur.fetchall():
-            schedule_entries.append({
-                "stop_id": row[0],
-                "stop_code": row[1],
-                "stop_name": row[2],
-                "stop_sequence": row[3],
-                "departure_time": str(row[4]),
-                "is_last_stop": row[5],
-                "service_type": row[6],
-            })
+            schedule_entries = []
+            for row in cur.fetchall():
+                schedule_entries.append({
+                    "stop_id": row[0],
+                    "stop_code": row[1],
+                    "stop_name": row[2],
+                    "stop_sequence": row[3],
+                    "departure_time": str(row[4]),
+                    "is_last_stop": row[5],
+                    "service_type": row[6],
+                })
         
-        cur.close()
-        conn.close()
         return {"schedule": schedule_entries, "service_type": service_type}
     except Exception as e:
         logger.exception("Transit schedule fetch error")
@@ -738,44 +1095,40 @@ def api_transit_route_schedule(route_id: int, service_type: str = "weekday"):
 def api_transit_nearest_stops(lat: float, lon: float, limit: int = 5):
     """Find nearest transit stops to a location."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT 
-                ts.id,
-                ts.stop_name,
-                ts.stop_code,
-                tr.route_name,
-                tr.route_color,
-                ST_Distance(
-                    ts.location_geo, 
-                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-                ) as distance_meters,
-                ST_Y(ts.location_geo::geometry) as latitude,
-                ST_X(ts.location_geo::geometry) as longitude
-            FROM transit_stops ts
-            JOIN transit_routes tr ON tr.id = ts.route_id
-            WHERE ts.location_geo IS NOT NULL
-            ORDER BY distance_meters ASC
-            LIMIT %s;
-        """, (lon, lat, limit))
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT 
+                    ts.id,
+                    ts.stop_name,
+                    ts.stop_code,
+                    tr.route_name,
+                    tr.route_color,
+                    ST_Distance(
+                        ts.location_geo, 
+                        ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                    ) as distance_meters,
+                    ST_Y(ts.location_geo::geometry) as latitude,
+                    ST_X(ts.location_geo::geometry) as longitude
+                FROM transit_stops ts
+                JOIN transit_routes tr ON tr.id = ts.route_id
+                WHERE ts.location_geo IS NOT NULL
+                ORDER BY distance_meters ASC
+                LIMIT %s;
+            """, (lon, lat, limit))
         
-        stops = []
-        for row in cur.fetchall():
-            stops.append({
-                "id": row[0],
-                "stop_name": row[1],
-                "stop_code": row[2],
-                "route_name": row[3],
-                "route_color": row[4],
-                "distance_meters": round(row[5], 2),
-                "latitude": row[6],
-                "longitude": row[7],
-            })
+            stops = []
+            for row in cur.fetchall():
+                stops.append({
+                    "id": row[0],
+                    "stop_name": row[1],
+                    "stop_code": row[2],
+                    "route_name": row[3],
+                    "route_color": row[4],
+                    "distance_meters": round(row[5], 2),
+                    "latitude": row[6],
+                    "longitude": row[7],
+                })
         
-        cur.close()
-        conn.close()
         return {"stops": stops}
     except Exception as e:
         logger.exception("Nearest transit stops fetch error")
@@ -786,3 +1139,19 @@ def api_transit_nearest_stops(lat: float, lon: float, limit: int = 5):
 def health():
     return {"status": "ok"}
 
+
+@app.get("/metrics")
+def metrics():
+    """Connection pool sizes, checkout wait times and cache hit rates."""
+    return {
+        "db_pool": pool_stats(),
+        "route_cache": route_cache.stats(),
+        "geocode_cache": geocode_cache.stats(),
+        "gazetteer": gazetteer.stats(),
+        "building_index": building_index.stats(),
+        "location_index": location_index.stats(),
+        "news": news_cache.stats(),
+        "incident_index": incident_index.stats(),
+        "edge_risk": edge_risk_table.stats(),
+    }
+
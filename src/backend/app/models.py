@@ -51,6 +51,9 @@ class SafetyAnalysis(BaseModel):
     concerns: list[str]
     positives: list[str]
     contributing_factors: list[str]
+    # Summed SafetyGraph edge risk along the route (risk-weighted metres),
+    # when the edge_risk table scored it; risk_score is then derived from it
+    edge_risk_m: float | None = None
 
 
 class RankedRoute(BaseModel):
@@ -113,6 +116,11 @@ class RouteRequest(BaseModel):
     transportation_mode: TransportationMode = TransportationMode.WALK
     concerns: list[str] = Field(default_factory=list)
     force_refresh: bool = False
+    include_all_rankings: bool = False
+
+
+class BatchRouteRequest(BaseModel):
+    requests: list[RouteRequest] = Field(min_length=1)
 
 
 class ErrorResponse(BaseModel):
@@ -128,3 +136,5 @@ class RoutesResponse(BaseModel):
     recommendation: Recommendation
     incidents: list[Incident]
     emergency_phones: list[Coordinates]
+    # priority -> route ids, best first; only set when include_all_rankings was requested
+    rankings: dict[str, list[str]] | None = None
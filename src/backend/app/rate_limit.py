@@ -0,0 +1,53 @@
+"""
+Process-wide rate limiting for outbound API calls.
+
+A token bucket hands out reservations under a lock, so sync callers (which
+sleep) and async callers (which await) draw from the same budget. Callers
+that would rather fail than queue pass ``max_wait``: when the wait would be
+longer, no token is taken and ``acquire`` returns False.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float = 1.0) -> None:
+        self._rate = max(rate_per_second, 1e-6)
+        self._capacity = max(capacity, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, max_wait: float | None = None) -> float | None:
+        """
+        Take one token, possibly on credit; return how long to wait for it,
+        or None (taking nothing) if that is longer than ``max_wait``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self._rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1.0
+            return wait
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        wait = self._reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, max_wait: float | None = None) -> bool:
+        wait = self._reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
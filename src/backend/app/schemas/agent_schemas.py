@@ -64,6 +64,7 @@ class LocationOption(BaseModel):
     address: Optional[str] = None
     coordinates: Coordinates
     distance_meters: Optional[float] = None
+    walk_minutes: Optional[float] = None
     category: str
 
 
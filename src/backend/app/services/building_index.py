@@ -0,0 +1,142 @@
+"""
+In-memory campus building footprints for reverse geocoding.
+
+``campus_buildings`` polygons are projected to local metres and held in a
+Shapely STR-tree of prepared geometries, so a map click resolves to the
+building containing it, or the nearest one within ``BUILDING_INDEX_NEAREST_M``,
+without a database round-trip. Recent reverse-geocoding answers are also
+cached on a ``REVERSE_GEOCODE_GRID_M`` grid, since GPS fixes and clicks
+repeat the same spots.
+
+Shapely is optional: without it the index never becomes ready and callers
+keep using the PostGIS query.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..cache import LRUCache
+from ..config import settings
+from ..db import get_conn
+from .incident_index import project
+
+try:
+    import shapely
+except ImportError:  # optional: reverse geocoding falls back to PostGIS
+    shapely = None
+
+logger = logging.getLogger("campus_dispatch")
+
+_METERS_PER_DEGREE_LAT = 111_320.0
+
+
+@dataclass(frozen=True)
+class _Footprints:
+    names: list[str]
+    geometries: np.ndarray  # prepared shapely polygons in local metres
+    tree: object  # shapely.STRtree over ``geometries``
+    signature: tuple
+
+
+def _to_metres(geometry):
+    # shapely hands over (lon, lat) pairs
+    return shapely.transform(geometry, lambda coords: np.column_stack(project(coords[:, 1], coords[:, 0])))
+
+
+class BuildingIndex:
+    def __init__(self, nearest_m: float) -> None:
+        self._nearest_m = nearest_m
+        self._footprints: _Footprints | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._footprints is not None
+
+    def refresh(self) -> bool:
+        """Reload footprints when campus_buildings changed since the last load."""
+        if shapely is None:
+            return False
+        with self._lock:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*), MAX(created_at) FROM campus_buildings")
+                signature = tuple(cur.fetchone())
+                if self._footprints is not None and signature == self._footprints.signature:
+                    return False
+                cur.execute(
+                    """
+                    SELECT name, ST_AsGeoJSON(geometry::geometry)
+                    FROM campus_buildings
+                    WHERE name IS NOT NULL AND geometry IS NOT NULL
+                    """
+                )
+                rows = cur.fetchall()
+
+            self.load(
+                [(name, json.loads(geojson) if isinstance(geojson, str) else geojson) for name, geojson in rows],
+                signature,
+            )
+            logger.info("Building index loaded with %d footprints", len(rows))
+            return True
+
+    def load(self, buildings: list[tuple[str, dict]], signature: tuple = ()) -> None:
+        """Install ``(name, GeoJSON geometry)`` footprints."""
+        names = [name for name, _ in buildings]
+        geometries = np.array(
+            [_to_metres(shapely.from_geojson(json.dumps(geometry))) for _, geometry in buildings],
+            dtype=object,
+        )
+        shapely.prepare(geometries)
+        self._footprints = _Footprints(
+            names=names,
+            geometries=geometries,
+            tree=shapely.STRtree(geometries),
+            signature=signature,
+        )
+
+    def lookup(self, lat: float, lon: float) -> str | None:
+        """Name of the building containing the point, else the nearest within range."""
+        footprints = self._footprints
+        if footprints is None or not footprints.names:
+            return None
+        x, y = project(lat, lon)
+        point = shapely.Point(float(x), float(y))
+
+        candidates = footprints.tree.query(point)
+        if len(candidates):
+            inside = candidates[shapely.contains_xy(footprints.geometries[candidates], float(x), float(y))]
+            if len(inside):
+                # Smallest footprint wins where buildings overlap (wings, annexes)
+                areas = shapely.area(footprints.geometries[inside])
+                return footprints.names[int(inside[np.argmin(areas)])]
+
+        nearest = footprints.tree.query_nearest(point, max_distance=self._nearest_m)
+        if len(nearest):
+            return footprints.names[int(nearest[0])]
+        return None
+
+    def stats(self) -> dict:
+        footprints = self._footprints
+        return {
+            "ready": self.ready,
+            "buildings": len(footprints.names) if footprints is not None else 0,
+            "cached_reverse_lookups": len(reverse_cache),
+        }
+
+
+def reverse_cache_key(lat: float, lon: float, grid_m: float | None = None) -> str:
+    """Grid cell of a point, so nearby clicks share one cached answer."""
+    grid = grid_m if grid_m is not None else settings.reverse_geocode_grid_m
+    lat_step = grid / _METERS_PER_DEGREE_LAT
+    lon_step = grid / (_METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return f"reverse:{round(lat / lat_step)}:{round(lon / lon_step)}"
+
+
+building_index = BuildingIndex(nearest_m=settings.building_index_nearest_m)
+reverse_cache = LRUCache(settings.reverse_geocode_cache_max_entries)
@@ -0,0 +1,228 @@
+"""
+Precomputed per-edge risk of the walk network.
+
+``src/routing/safety_graph.py`` writes one row per street edge to the
+``edge_risk`` table. The API keeps a compact copy in memory: NumPy arrays of
+edge sub-segments in the local metric projection, one risk factor per edge,
+and a uniform grid over the segments. Scoring an OSRM geometry splits it into
+pieces no longer than the match tolerance (OSRM collapses straight runs into
+one long segment that would otherwise match a single edge), map-matches each
+piece to the nearest edge and sums the precomputed risk, so it costs
+O(route length / tolerance) with no database work.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from ..config import settings
+from ..db import get_conn
+from ..models import LineString
+from .incident_index import project
+
+logger = logging.getLogger("campus_dispatch")
+
+
+@dataclass(frozen=True)
+class EdgeRiskScore:
+    risk_m: float  # sum of matched length x edge risk factor (SafetyGraph cost)
+    matched_m: float  # route length matched to an edge
+    matched_fraction: float  # share of route length matched to an edge
+    edge_count: int  # distinct edges the route was matched onto
+
+    @property
+    def excess_risk_m(self) -> float:
+        """Risk above a neutral (factor 1.0) walk over the matched length."""
+        return self.risk_m - self.matched_m
+
+
+@dataclass(frozen=True)
+class _EdgeArrays:
+    ax: np.ndarray
+    ay: np.ndarray
+    bx: np.ndarray
+    by: np.ndarray
+    seg_edge: np.ndarray  # sub-segment -> edge index
+    edge_risk: np.ndarray  # edge index -> risk factor
+    cell_m: float
+    cell_keys: np.ndarray
+    cell_starts: np.ndarray
+    cell_segments: np.ndarray
+    built_at: datetime | None
+
+
+def _cell_key(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    return (ix.astype(np.int64) << 32) | (iy.astype(np.int64) & 0xFFFFFFFF)
+
+
+def _pair_distances(px, py, ax, ay, bx, by) -> np.ndarray:
+    """Element-wise distance from points to segments."""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = np.where(length_sq > 0, ((px - ax) * dx + (py - ay) * dy) / np.maximum(length_sq, 1e-12), 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _densify(x: np.ndarray, y: np.ndarray, step_m: float) -> tuple[np.ndarray, np.ndarray]:
+    """Split every segment longer than ``step_m`` into equal pieces."""
+    pieces = np.maximum(np.ceil(np.hypot(np.diff(x), np.diff(y)) / step_m), 1).astype(np.int64)
+    if (pieces == 1).all():
+        return x, y
+    seg = np.repeat(np.arange(len(pieces)), pieces)
+    t = (np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)) / pieces[seg]
+    dense_x = np.append(x[seg] + t * (x[seg + 1] - x[seg]), x[-1])
+    dense_y = np.append(y[seg] + t * (y[seg + 1] - y[seg]), y[-1])
+    return dense_x, dense_y
+
+
+def _build_arrays(edges: list[tuple[float, list]], match_m: float, built_at) -> _EdgeArrays:
+    ax, ay, bx, by, seg_edge = [], [], [], [], []
+    edge_risk = np.empty(len(edges), dtype=np.float32)
+    for edge_idx, (risk_factor, coords) in enumerate(edges):
+        edge_risk[edge_idx] = risk_factor
+        lons, lats = zip(*coords)
+        x, y = project(lats, lons)
+        ax.append(x[:-1])
+        ay.append(y[:-1])
+        bx.append(x[1:])
+        by.append(y[1:])
+        seg_edge.append(np.full(len(x) - 1, edge_idx, dtype=np.int32))
+
+    concat = (lambda parts, dtype: np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype))
+    ax, ay = concat(ax, np.float64), concat(ay, np.float64)
+    bx, by = concat(bx, np.float64), concat(by, np.float64)
+    seg_edge = concat(seg_edge, np.int32)
+
+    # Register each sub-segment in every cell its tolerance-expanded bbox touches
+    cell_m = max(match_m, 1.0)
+    x0 = np.floor((np.minimum(ax, bx) - match_m) / cell_m).astype(np.int64)
+    x1 = np.floor((np.maximum(ax, bx) + match_m) / cell_m).astype(np.int64)
+    y0 = np.floor((np.minimum(ay, by) - match_m) / cell_m).astype(np.int64)
+    y1 = np.floor((np.maximum(ay, by) + match_m) / cell_m).astype(np.int64)
+    keys, segments = [], []
+    for seg in range(len(ax)):
+        cx, cy = np.meshgrid(np.arange(x0[seg], x1[seg] + 1), np.arange(y0[seg], y1[seg] + 1))
+        keys.append(_cell_key(cx.ravel(), cy.ravel()))
+        segments.append(np.full(cx.size, seg, dtype=np.int32))
+    keys = np.concatenate(keys) if keys else np.empty(0, np.int64)
+    segments = np.concatenate(segments) if segments else np.empty(0, np.int32)
+
+    order = np.argsort(keys, kind="stable")
+    cell_keys, cell_starts = np.unique(keys[order], return_index=True)
+
+    return _EdgeArrays(
+        ax=ax, ay=ay, bx=bx, by=by,
+        seg_edge=seg_edge,
+        edge_risk=edge_risk,
+        cell_m=cell_m,
+        cell_keys=cell_keys,
+        cell_starts=np.append(cell_starts, len(order)),
+        cell_segments=segments[order],
+        built_at=built_at,
+    )
+
+
+class EdgeRiskTable:
+    def __init__(self, match_m: float) -> None:
+        self._match_m = match_m
+        self._arrays: _EdgeArrays | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._arrays is not None and len(self._arrays.edge_risk) > 0
+
+    def refresh(self) -> bool:
+        """Reload from Postgres when SafetyGraph has written a newer table."""
+        with self._lock:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute("SELECT MAX(built_at) FROM edge_risk")
+                built_at = cur.fetchone()[0]
+                if self._arrays is not None and built_at == self._arrays.built_at:
+                    return False
+                cur.execute("SELECT risk_factor, ST_AsGeoJSON(geometry::geometry) FROM edge_risk")
+                rows = cur.fetchall()
+
+            edges = []
+            for risk_factor, geojson in rows:
+                geometry = json.loads(geojson) if isinstance(geojson, str) else geojson
+                if len(geometry["coordinates"]) >= 2:
+                    edges.append((float(risk_factor), geometry["coordinates"]))
+            self.load(edges, built_at)
+            logger.info("Edge risk table loaded with %d edges", len(edges))
+            return True
+
+    def load(self, edges: list[tuple[float, list]], built_at: datetime | None = None) -> None:
+        """Install ``(risk_factor, [(lon, lat), ...])`` edges."""
+        self._arrays = _build_arrays(edges, self._match_m, built_at)
+
+    def score(self, route: LineString) -> EdgeRiskScore | None:
+        """
+        Map-match ``route`` piece by piece and sum edge risk over the matched
+        length. Unmatched pieces contribute nothing, so compare routes only
+        when ``matched_fraction`` is high for all of them.
+        """
+        arrays = self._arrays
+        if arrays is None or len(arrays.cell_keys) == 0 or len(route.coordinates) < 2:
+            return None
+
+        lons, lats = zip(*route.coordinates)
+        x, y = _densify(*project(lats, lons), step_m=max(self._match_m, 1.0))
+        seg_len = np.hypot(np.diff(x), np.diff(y))
+        mx, my = (x[:-1] + x[1:]) / 2, (y[:-1] + y[1:]) / 2
+        total = float(seg_len.sum())
+        if total == 0:
+            return None
+
+        # Candidate (route segment, edge sub-segment) pairs from each midpoint's cell
+        wanted = _cell_key(np.floor(mx / arrays.cell_m), np.floor(my / arrays.cell_m))
+        pos = np.searchsorted(arrays.cell_keys, wanted)
+        pos_clipped = np.minimum(pos, len(arrays.cell_keys) - 1)
+        found = (pos < len(arrays.cell_keys)) & (arrays.cell_keys[pos_clipped] == wanted)
+        starts = np.where(found, arrays.cell_starts[pos_clipped], 0)
+        counts = np.where(found, arrays.cell_starts[pos_clipped + 1] - starts, 0)
+        if counts.sum() == 0:
+            return EdgeRiskScore(risk_m=0.0, matched_m=0.0, matched_fraction=0.0, edge_count=0)
+
+        point = np.repeat(np.arange(len(mx)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        seg = arrays.cell_segments[np.repeat(starts, counts) + offsets]
+        dist = _pair_distances(
+            mx[point], my[point], arrays.ax[seg], arrays.ay[seg], arrays.bx[seg], arrays.by[seg]
+        )
+
+        # Nearest candidate per route segment, within tolerance
+        order = np.lexsort((dist, point))
+        first = np.unique(point[order], return_index=True)[1]
+        best = order[first]
+        best = best[dist[best] <= self._match_m]
+        if best.size == 0:
+            return EdgeRiskScore(risk_m=0.0, matched_m=0.0, matched_fraction=0.0, edge_count=0)
+
+        matched_len = seg_len[point[best]]
+        edges = arrays.seg_edge[seg[best]]
+        matched = float(matched_len.sum())
+        return EdgeRiskScore(
+            risk_m=float((matched_len * arrays.edge_risk[edges]).sum()),
+            matched_m=matched,
+            matched_fraction=matched / total,
+            edge_count=int(np.unique(edges).size),
+        )
+
+    def stats(self) -> dict:
+        arrays = self._arrays
+        return {
+            "ready": self.ready,
+            "edges": len(arrays.edge_risk) if arrays is not None else 0,
+            "segments": len(arrays.ax) if arrays is not None else 0,
+            "built_at": arrays.built_at.isoformat() if arrays is not None and arrays.built_at else None,
+        }
+
+
+edge_risk_table = EdgeRiskTable(match_m=settings.edge_risk_match_m)
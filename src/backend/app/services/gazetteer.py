@@ -0,0 +1,399 @@
+"""
+Offline campus gazetteer.
+
+Every place we already have coordinates for — ``campus_locations``,
+``campus_buildings``, ``shuttle_stops`` and ``transit_stops`` — is loaded
+into one in-memory index of normalized names, aliases and building numbers.
+Exact keys are a dict lookup; anything else is matched by trigram
+similarity over an inverted index, so typos like "elis libary" still
+resolve. Geocoding only trusts exact hits (score 1.0): a fuzzy match
+against "Jesse Hall" is not evidence that "Jesse Hall, St. Louis" is on
+campus, so those queries still go to Nominatim. ``suggest`` serves
+typeahead from a sorted index of every word-suffix of every name (so "lib"
+finds "Ellis Library") topped up with trigram matches.
+
+The index is rebuilt by a background job when the source tables change
+(row count or newest timestamp per table).
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..config import settings
+from ..db import get_conn
+from ..models import Coordinates
+
+logger = logging.getLogger("campus_dispatch")
+
+_ABBREVIATIONS = {
+    "st": "street",
+    "ave": "avenue",
+    "rd": "road",
+    "dr": "drive",
+    "blvd": "boulevard",
+    "ctr": "center",
+    "centre": "center",
+    "bldg": "building",
+    "univ": "university",
+    "rec": "recreation",
+    "lib": "library",
+}
+
+# Campus shorthand -> canonical name; only added when the name is loaded
+_ALIASES = {
+    "the union": "memorial union",
+    "mu union": "memorial union",
+    "student union": "student center",
+    "mizzou student center": "student center",
+    "ellis": "ellis library",
+    "jesse": "jesse hall",
+    "mizzou rec": "student recreation complex",
+    "recreation center": "student recreation complex",
+}
+
+# Comma-separated context a user appends that still means "on campus";
+# any other suffix (another city) makes the query not a campus name
+_LOCAL_CONTEXT = frozenset(
+    "columbia mo missouri mizzou mu campus university of usa us 65201 65203 65211".split()
+)
+
+# (label, query) per source; each returns name, lat, lon, category, building number
+_SOURCES = (
+    (
+        "campus_locations",
+        """
+        SELECT name, ST_Y(location_geo::geometry), ST_X(location_geo::geometry), category, building_number
+        FROM campus_locations
+        WHERE is_active = TRUE
+        """,
+    ),
+    (
+        "campus_buildings",
+        """
+        SELECT name, ST_Y(ST_Centroid(geometry::geometry)), ST_X(ST_Centroid(geometry::geometry)),
+               'misc', building_number
+        FROM campus_buildings
+        WHERE name IS NOT NULL AND geometry IS NOT NULL
+        """,
+    ),
+    (
+        "shuttle_stops",
+        """
+        SELECT stop_name, ST_Y(location_geo::geometry), ST_X(location_geo::geometry), 'transit', NULL
+        FROM shuttle_stops
+        WHERE stop_name IS NOT NULL AND location_geo IS NOT NULL
+        """,
+    ),
+    (
+        "transit_stops",
+        """
+        SELECT stop_name, ST_Y(location_geo::geometry), ST_X(location_geo::geometry), 'transit', NULL
+        FROM transit_stops
+        WHERE location_geo IS NOT NULL
+        """,
+    ),
+)
+
+_SIGNATURE_QUERIES = {
+    "campus_locations": "SELECT COUNT(*), MAX(updated_at) FROM campus_locations",
+    "campus_buildings": "SELECT COUNT(*), MAX(created_at) FROM campus_buildings",
+    "shuttle_stops": "SELECT COUNT(*), MAX(created_at) FROM shuttle_stops",
+    "transit_stops": "SELECT COUNT(*), MAX(updated_at) FROM transit_stops",
+}
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, drop punctuation, expand common abbreviations."""
+    lowered = text.lower().replace("&", " and ").replace("'", "").replace("’", "")
+    words = re.sub(r"[^a-z0-9]+", " ", lowered).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading blanks and one trailing."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+    category: str
+    source: str
+    building_number: str | None = None
+
+    @property
+    def coordinates(self) -> Coordinates:
+        return Coordinates(latitude=self.latitude, longitude=self.longitude)
+
+
+@dataclass(frozen=True)
+class GazetteerMatch:
+    place: Place
+    score: float  # 1.0 for exact name/alias/number matches
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    place: Place
+    score: float
+    distance_m: float | None = None
+
+
+# Typeahead match quality: prefix of the whole name, prefix of a later word,
+# and the factor applied to trigram similarity for fuzzy matches
+_FULL_PREFIX_QUALITY = 1.0
+_WORD_PREFIX_QUALITY = 0.85
+_FUZZY_QUALITY = 0.7
+# Weight of proximity in a suggestion's score when an origin is given
+_PROXIMITY_WEIGHT = 0.25
+_PROXIMITY_SCALE_M = 1000.0
+
+
+@dataclass(frozen=True)
+class _Index:
+    places: list[Place]
+    exact: dict[str, int]  # normalized key -> place
+    term_place: np.ndarray  # term -> place
+    term_grams: np.ndarray  # term -> number of distinct trigrams
+    postings: dict[str, np.ndarray]  # trigram -> terms containing it
+    prefix_keys: list[str]  # sorted word-suffixes of every name
+    prefix_entries: list[tuple[int, bool]]  # (place, starts the name) per key
+
+
+def _build_index(places: list[Place]) -> _Index:
+    exact: dict[str, int] = {}
+    terms: dict[str, int] = {}
+    # Curated sources come first, so they win key collisions
+    for i, place in enumerate(places):
+        key = normalize_name(place.name)
+        if not key:
+            continue
+        exact.setdefault(key, i)
+        terms.setdefault(key, i)
+        if place.building_number:
+            exact.setdefault(normalize_name(f"building {place.building_number}"), i)
+    for alias, target in _ALIASES.items():
+        if target in exact:
+            exact.setdefault(alias, exact[target])
+            terms.setdefault(alias, exact[target])
+
+    term_place = np.fromiter(terms.values(), dtype=np.int64, count=len(terms))
+    term_grams = np.empty(len(terms), dtype=np.int64)
+    postings: dict[str, list[int]] = {}
+    for term_id, term in enumerate(terms):
+        grams = trigrams(term)
+        term_grams[term_id] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(term_id)
+
+    suffixes = []
+    for term, place in terms.items():
+        words = term.split()
+        suffixes.extend((" ".join(words[i:]), place, i == 0) for i in range(len(words)))
+    suffixes.sort(key=lambda entry: entry[0])
+
+    return _Index(
+        places=places,
+        exact=exact,
+        term_place=term_place,
+        term_grams=term_grams,
+        postings={gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()},
+        prefix_keys=[key for key, _, _ in suffixes],
+        prefix_entries=[(place, whole) for _, place, whole in suffixes],
+    )
+
+
+def _similarities(index: _Index, key: str) -> np.ndarray | None:
+    """Jaccard similarity of ``key`` to every term, over trigram sets."""
+    grams = trigrams(key)
+    hits = [index.postings[gram] for gram in grams if gram in index.postings]
+    if not hits:
+        return None
+    shared = np.bincount(np.concatenate(hits), minlength=len(index.term_place))
+    return shared / (len(grams) + index.term_grams - shared)
+
+
+def _strip_local_context(query: str) -> str:
+    """Drop trailing ", Columbia, MO"-style parts; keep anything else."""
+    parts = query.split(",")
+    while len(parts) > 1 and set(parts[-1].lower().replace(".", "").split()) <= _LOCAL_CONTEXT:
+        parts.pop()
+    return ",".join(parts)
+
+
+def _distance_m(origin: Coordinates, place: Place) -> float:
+    dy = (place.latitude - origin.latitude) * 111_320.0
+    dx = (place.longitude - origin.longitude) * 111_320.0 * math.cos(math.radians(origin.latitude))
+    return math.hypot(dx, dy)
+
+
+class Gazetteer:
+    def __init__(self, min_similarity: float) -> None:
+        self._min_similarity = min_similarity
+        self._index = _build_index([])
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._index.places)
+
+    def load(self, places: list[Place]) -> None:
+        self._index = _build_index(places)
+
+    def lookup(self, query: str) -> GazetteerMatch | None:
+        """Best place for ``query``, or None when nothing is similar enough."""
+        index = self._index
+        if not index.places:
+            return None
+        key = normalize_name(_strip_local_context(query))
+        if not key:
+            return None
+        exact = index.exact.get(key)
+        if exact is not None:
+            return GazetteerMatch(index.places[exact], 1.0)
+
+        similarity = _similarities(index, key)
+        if similarity is None:
+            return None
+        best = int(np.argmax(similarity))
+        if similarity[best] < self._min_similarity:
+            return None
+        return GazetteerMatch(index.places[index.term_place[best]], float(similarity[best]))
+
+    def suggest(
+        self,
+        text: str,
+        limit: int = 8,
+        origin: Coordinates | None = None,
+    ) -> list[Suggestion]:
+        """
+        Typeahead candidates for partial input ``text``, best first. Match
+        quality ranks prefix matches above fuzzy ones; with ``origin``, nearer
+        places get a bonus of up to ``_PROXIMITY_WEIGHT``.
+        """
+        index = self._index
+        key = normalize_name(text)
+        if not key or limit <= 0:
+            return []
+
+        quality: dict[int, float] = {}
+        start = bisect.bisect_left(index.prefix_keys, key)
+        for pos in range(start, len(index.prefix_keys)):
+            if not index.prefix_keys[pos].startswith(key):
+                break
+            place, whole = index.prefix_entries[pos]
+            score = _FULL_PREFIX_QUALITY if whole else _WORD_PREFIX_QUALITY
+            quality[place] = max(quality.get(place, 0.0), score)
+
+        # Typos: trigram matches fill in when prefixes run short
+        if len(quality) < limit and len(key) >= 3:
+            similarity = _similarities(index, key)
+            if similarity is not None:
+                for term in np.argsort(-similarity)[: limit * 2].tolist():
+                    if similarity[term] < self._min_similarity:
+                        break
+                    place = int(index.term_place[term])
+                    quality[place] = max(quality.get(place, 0.0), _FUZZY_QUALITY * float(similarity[term]))
+
+        suggestions = []
+        seen_names = set()
+        for place_id, score in quality.items():
+            place = index.places[place_id]
+            distance = None
+            if origin is not None:
+                distance = _distance_m(origin, place)
+                score += _PROXIMITY_WEIGHT * math.exp(-distance / _PROXIMITY_SCALE_M)
+            suggestions.append(Suggestion(place=place, score=score, distance_m=distance))
+        suggestions.sort(key=lambda s: (-s.score, s.place.name))
+
+        # The same place often appears in several source tables
+        unique = []
+        for suggestion in suggestions:
+            name = normalize_name(suggestion.place.name)
+            if name not in seen_names:
+                seen_names.add(name)
+                unique.append(suggestion)
+            if len(unique) == limit:
+                break
+        return unique
+
+    # -- loading from Postgres ---------------------------------------------
+    def _table_signature(self) -> tuple:
+        signature = []
+        with get_conn() as conn:
+            for table, sql in _SIGNATURE_QUERIES.items():
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(sql)
+                        signature.append((table, *cur.fetchone()))
+                except Exception:
+                    conn.rollback()
+                    signature.append((table, None, None))
+        return tuple(signature)
+
+    def _fetch_places(self) -> list[Place]:
+        places = []
+        with get_conn() as conn:
+            for source, sql in _SOURCES:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(sql)
+                        rows = cur.fetchall()
+                except Exception as e:
+                    # Optional tables (e.g. transit_stops) may not be migrated yet
+                    conn.rollback()
+                    logger.warning(f"Gazetteer source {source} unavailable: {e}")
+                    continue
+                places.extend(
+                    Place(
+                        name=name,
+                        latitude=float(lat),
+                        longitude=float(lon),
+                        category=category or "misc",
+                        source=source,
+                        building_number=number,
+                    )
+                    for name, lat, lon, category, number in rows
+                    if name and lat is not None and lon is not None
+                )
+        return places
+
+    def refresh(self) -> bool:
+        """Rebuild when any source table changed since the last build."""
+        with self._lock:
+            signature = self._table_signature()
+            if signature == self._signature:
+                return False
+            places = self._fetch_places()
+            self.load(places)
+            self._signature = signature
+            logger.info("Gazetteer loaded with %d places", len(places))
+            return True
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "ready": self.ready,
+            "places": len(index.places),
+            "keys": len(index.exact),
+            "trigrams": len(index.postings),
+        }
+
+
+gazetteer = Gazetteer(min_similarity=settings.gazetteer_min_similarity)
@@ -0,0 +1,162 @@
+"""
+Two-tier cache for Nominatim geocoding results.
+
+Tier 1 is an in-process LRU with TTL; tier 2 is the Postgres
+``geocode_cache`` table, shared by every worker and surviving restarts.
+Keys are normalized query strings. Misses ("no results") are cached too,
+with a shorter TTL, so a bad location name is not re-sent on every request.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+from dataclasses import dataclass
+
+from ..cache import LRUCache
+from ..config import settings
+from ..db import get_conn
+from ..models import Coordinates
+
+logger = logging.getLogger("campus_dispatch")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive cache key."""
+    lowered = query.lower().replace("’", "'")
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s,'&-]", " ", lowered)).strip(" ,")
+
+
+@dataclass(frozen=True)
+class CachedGeocode:
+    coordinates: Coordinates | None  # None: Nominatim found nothing
+
+
+class GeocodeCache:
+    def __init__(self, max_entries: int, ttl_seconds: int, negative_ttl_seconds: int) -> None:
+        self._memory = LRUCache(max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "negative_stores": 0,
+            "db_errors": 0,
+            "purged": 0,
+        }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    # -- lookups -----------------------------------------------------------
+    def get(self, key: str) -> CachedGeocode | None:
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._count("memory_hits")
+            return cached
+
+        cached, ttl = self._db_get(key)
+        if cached is not None:
+            self._count("db_hits")
+            self._memory.set(key, cached, ttl)
+            return cached
+
+        self._count("misses")
+        return None
+
+    async def get_async(self, key: str) -> CachedGeocode | None:
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._count("memory_hits")
+            return cached
+        return await asyncio.to_thread(self.get, key)
+
+    def put(self, key: str, coordinates: Coordinates | None) -> None:
+        ttl = self._ttl_seconds if coordinates is not None else self._negative_ttl_seconds
+        self._memory.set(key, CachedGeocode(coordinates), ttl)
+        self._db_put(key, coordinates, ttl)
+        self._count("stores" if coordinates is not None else "negative_stores")
+
+    async def put_async(self, key: str, coordinates: Coordinates | None) -> None:
+        await asyncio.to_thread(self.put, key, coordinates)
+
+    # -- persistent tier ---------------------------------------------------
+    def _db_get(self, key: str) -> tuple[CachedGeocode | None, int]:
+        try:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT latitude, longitude, EXTRACT(EPOCH FROM expires_at - NOW())
+                    FROM geocode_cache
+                    WHERE query_key = %s AND expires_at > NOW()
+                    """,
+                    (key,),
+                )
+                row = cur.fetchone()
+        except Exception as e:
+            self._count("db_errors")
+            logger.warning(f"Geocode cache lookup failed: {e}")
+            return None, 0
+
+        if row is None:
+            return None, 0
+        latitude, longitude, remaining = row
+        coordinates = (
+            Coordinates(latitude=float(latitude), longitude=float(longitude))
+            if latitude is not None
+            else None
+        )
+        return CachedGeocode(coordinates), max(1, int(remaining))
+
+    def _db_put(self, key: str, coordinates: Coordinates | None, ttl: int) -> None:
+        try:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO geocode_cache (query_key, latitude, longitude, expires_at)
+                    VALUES (%s, %s, %s, NOW() + make_interval(secs => %s))
+                    ON CONFLICT (query_key) DO UPDATE
+                    SET latitude = EXCLUDED.latitude,
+                        longitude = EXCLUDED.longitude,
+                        expires_at = EXCLUDED.expires_at,
+                        created_at = NOW()
+                    """,
+                    (
+                        key,
+                        coordinates.latitude if coordinates is not None else None,
+                        coordinates.longitude if coordinates is not None else None,
+                        ttl,
+                    ),
+                )
+        except Exception as e:
+            self._count("db_errors")
+            logger.warning(f"Geocode cache store failed: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the persistent tier."""
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM geocode_cache WHERE expires_at <= NOW()")
+            deleted = cur.rowcount or 0
+        self._count("purged", deleted)
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["memory_hits"] + counters["db_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["db_hits"]
+        counters["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        counters["memory_entries"] = len(self._memory)
+        return counters
+
+
+geocode_cache = GeocodeCache(
+    max_entries=settings.geocode_cache_max_entries,
+    ttl_seconds=settings.geocode_cache_ttl_seconds,
+    negative_ttl_seconds=settings.geocode_cache_negative_ttl_seconds,
+)
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any
+
 import requests
 
+from ..clients.http_client import get_async_client
 from ..config import settings
 from ..models import Coordinates
+from ..rate_limit import TokenBucket
+from .gazetteer import gazetteer
+from .geocode_cache import geocode_cache, normalize_query
 
 
 class GeocodingError(RuntimeError):
@@ -14,13 +21,18 @@ class GeocodingError(RuntimeError):
 _CAMPUS_VIEWBOX = "-92.345,38.935,-92.310,38.955"
 _CAMPUS_SUFFIX = ", Columbia, MO"
 
+# Shared by every outbound Nominatim request in this process (usage policy:
+# at most 1 request per second)
+nominatim_bucket = TokenBucket(settings.geocoder_rate_per_second)
 
-def geocode_location(query: str) -> Coordinates:
+
+def _search_params(query: str) -> tuple[dict[str, Any], dict[str, Any] | None]:
     """
-    Geocode a location string to coordinates.
+    Build the Nominatim params for ``query``.
 
-    Short or ambiguous queries are biased toward the University of Missouri
-    campus area by appending ', Columbia, MO' and using a viewbox.
+    Returns the (possibly campus-biased) params plus the unbiased params to
+    retry with when the biased search comes back empty, or None if the query
+    was not biased.
     """
     biased_query = query
     use_viewbox = False
@@ -43,9 +55,64 @@ def geocode_location(query: str) -> Coordinates:
         params["viewbox"] = _CAMPUS_VIEWBOX
         params["bounded"] = 0  # prefer but don't strictly limit
 
+    if biased_query == query:
+        return params, None
+    return params, {"q": query, "format": "json", "limit": 1}
+
+
+def _first_result(query: str, data: list[dict[str, Any]]) -> Coordinates:
+    if not data:
+        raise GeocodingError(f"No results found for '{query}'")
+
+    item = data[0]
+    return Coordinates(latitude=float(item["lat"]), longitude=float(item["lon"]))
+
+
+def _offline(query: str) -> Coordinates | None:
+    """
+    Coordinates from the campus gazetteer for exact name, alias or
+    building-number hits. Fuzzy matches go to Nominatim: "Boone Hospital"
+    resembling a campus name does not make it one.
+    """
+    if not settings.gazetteer_enabled:
+        return None
+    match = gazetteer.lookup(query)
+    if match is None or match.score < 1.0:
+        return None
+    return match.place.coordinates
+
+
+def _cached(query: str, cached) -> Coordinates:
+    if cached.coordinates is None:
+        raise GeocodingError(f"No results found for '{query}'")
+    return cached.coordinates
+
+
+def geocode_location(query: str) -> Coordinates:
+    """
+    Geocode a location string to coordinates.
+
+    Short or ambiguous queries are biased toward the University of Missouri
+    campus area by appending ', Columbia, MO' and using a viewbox. Known
+    campus places are answered from the offline gazetteer. Other results,
+    including "no results", are cached per normalized query; requests that
+    do reach Nominatim are rate limited process-wide.
+    """
+    offline = _offline(query)
+    if offline is not None:
+        return offline
+
+    key = normalize_query(query)
+    if settings.geocode_cache_enabled:
+        cached = geocode_cache.get(key)
+        if cached is not None:
+            return _cached(query, cached)
+
+    params, fallback_params = _search_params(query)
     headers = {
         "User-Agent": settings.geocoder_user_agent,
     }
+    nominatim_bucket.acquire()
     response = requests.get(
         f"{settings.geocoder_base_url}/search",
         params=params,
@@ -56,21 +123,61 @@ def geocode_location(query: str) -> Coordinates:
     data = response.json()
 
     # If biased query fails, try the original query
-    if not data and biased_query != query:
-        params["q"] = query
-        params.pop("viewbox", None)
-        params.pop("bounded", None)
+    if not data and fallback_params is not None:
+        nominatim_bucket.acquire()
         response = requests.get(
             f"{settings.geocoder_base_url}/search",
-            params=params,
+            params=fallback_params,
             headers=headers,
             timeout=10,
         )
         response.raise_for_status()
         data = response.json()
 
-    if not data:
-        raise GeocodingError(f"No results found for '{query}'")
+    return _store(key, query, data)
 
-    item = data[0]
-    return Coordinates(latitude=float(item["lat"]), longitude=float(item["lon"]))
+
+def _store(key: str, query: str, data: list[dict[str, Any]]) -> Coordinates:
+    try:
+        coordinates = _first_result(query, data)
+    except GeocodingError:
+        if settings.geocode_cache_enabled:
+            geocode_cache.put(key, None)
+        raise
+    if settings.geocode_cache_enabled:
+        geocode_cache.put(key, coordinates)
+    return coordinates
+
+
+async def geocode_location_async(query: str) -> Coordinates:
+    """Non-blocking variant of ``geocode_location`` using the shared httpx client."""
+    offline = _offline(query)
+    if offline is not None:
+        return offline
+
+    key = normalize_query(query)
+    if settings.geocode_cache_enabled:
+        cached = await geocode_cache.get_async(key)
+        if cached is not None:
+            return _cached(query, cached)
+
+    params, fallback_params = _search_params(query)
+    headers = {
+        "User-Agent": settings.geocoder_user_agent,
+    }
+    client = get_async_client()
+    url = f"{settings.geocoder_base_url}/search"
+
+    await nominatim_bucket.acquire_async()
+    response = await client.get(url, params=params, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+
+    if not data and fallback_params is not None:
+        await nominatim_bucket.acquire_async()
+        response = await client.get(url, params=fallback_params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+
+    # The cache writes hit Postgres, so keep them off the event loop
+    return await asyncio.to_thread(_store, key, query, data)
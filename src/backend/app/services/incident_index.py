@@ -0,0 +1,326 @@
+"""
+In-memory spatial index over every geocoded incident.
+
+The three incident tables (``crime_incidents``, ``cpd_incidents``,
+``police_calls``) hold tens of thousands of points, so the whole corpus is
+kept in NumPy arrays projected to a local metric plane and bucketed into a
+uniform grid. Route buffer lookups ("incidents within R metres of this
+linestring since D") are then answered in-process instead of by a
+``ST_DWithin`` join per request.
+
+The index loads at startup, picks up new rows incrementally by
+``geocoded_at`` (``created_at`` for ``police_calls``, which are located on
+insert), so rows geocoded after they were inserted still arrive. It is
+rebuilt from scratch every ``INCIDENT_INDEX_REBUILD_SECONDS`` so edits and
+deletions are reflected too. Each load or refresh swaps in a new immutable
+snapshot, so readers never see a half-built index.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ..config import settings
+from ..db import get_conn
+from ..models import Coordinates, Incident, LineString
+from ..utils import normalize_incident_type
+
+logger = logging.getLogger("campus_dispatch")
+
+# Local equirectangular projection centred on campus. Over the few kilometres
+# a route spans, the error against PostGIS geography distances is well under
+# one percent.
+_REF_LAT = 38.9404
+_REF_LON = -92.3277
+_METERS_PER_DEGREE_LAT = 111_320.0
+_METERS_PER_DEGREE_LON = _METERS_PER_DEGREE_LAT * math.cos(math.radians(_REF_LAT))
+
+_INCIDENT_ROWS_QUERY = """
+    SELECT 'crime' AS source, id::text, incident_type, date_occurred, location_name,
+           ST_Y(location_geo::geometry), ST_X(location_geo::geometry),
+           COALESCE(geocoded_at, created_at)
+    FROM crime_incidents
+    WHERE location_geo IS NOT NULL
+      AND date_occurred IS NOT NULL
+      AND (%(since)s::timestamp IS NULL OR COALESCE(geocoded_at, created_at) > %(since)s::timestamp)
+    UNION ALL
+    SELECT 'cpd', offense_id::text, nibrs_description, report_date, nibrs_description,
+           ST_Y(location_geo::geometry), ST_X(location_geo::geometry),
+           COALESCE(geocoded_at, created_at)
+    FROM cpd_incidents
+    WHERE location_geo IS NOT NULL
+      AND report_date IS NOT NULL
+      AND (%(since)s::timestamp IS NULL OR COALESCE(geocoded_at, created_at) > %(since)s::timestamp)
+    UNION ALL
+    SELECT 'call', incident_number::text, incident_type, call_time, description,
+           ST_Y(location_geo::geometry), ST_X(location_geo::geometry), created_at
+    FROM police_calls
+    WHERE location_geo IS NOT NULL
+      AND call_time IS NOT NULL
+      AND (%(since)s::timestamp IS NULL OR created_at > %(since)s::timestamp)
+"""
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def project(lat, lon) -> tuple[np.ndarray, np.ndarray]:
+    """Project WGS84 degrees to local metres (x east, y north)."""
+    x = (np.asarray(lon, dtype=np.float64) - _REF_LON) * _METERS_PER_DEGREE_LON
+    y = (np.asarray(lat, dtype=np.float64) - _REF_LAT) * _METERS_PER_DEGREE_LAT
+    return x, y
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _timestamp(value: datetime) -> float:
+    return (_to_naive_utc(value) - _EPOCH).total_seconds()
+
+
+def point_segment_distances(
+    px: np.ndarray, py: np.ndarray, line_x: np.ndarray, line_y: np.ndarray
+) -> np.ndarray:
+    """Minimum distance from each point to a polyline, in projected metres."""
+    if len(line_x) == 1:
+        return np.hypot(px - line_x[0], py - line_y[0])
+
+    ax, ay = line_x[:-1], line_y[:-1]
+    dx, dy = line_x[1:] - ax, line_y[1:] - ay
+    length_sq = dx * dx + dy * dy
+    length_sq[length_sq == 0] = 1e-12
+
+    # points x segments
+    t = ((px[:, None] - ax) * dx + (py[:, None] - ay) * dy) / length_sq
+    np.clip(t, 0.0, 1.0, out=t)
+    cx = ax + t * dx
+    cy = ay + t * dy
+    return np.hypot(px[:, None] - cx, py[:, None] - cy).min(axis=1)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable index state; replaced wholesale on every refresh."""
+
+    x: np.ndarray
+    y: np.ndarray
+    ts: np.ndarray
+    source: np.ndarray
+    ids: np.ndarray
+    types: np.ndarray
+    dates: np.ndarray
+    descriptions: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    cell_m: float
+    cell_keys: np.ndarray  # sorted unique cell keys
+    cell_starts: np.ndarray  # offsets into ``order`` per key, plus end sentinel
+    order: np.ndarray  # point indices sorted by cell key
+    keys: frozenset
+    max_changed_at: datetime | None
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+def _cell_key(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    # Pack two signed 32-bit cell coordinates into one sortable int64
+    return (ix.astype(np.int64) << 32) | (iy.astype(np.int64) & 0xFFFFFFFF)
+
+
+def _build_snapshot(rows: list[tuple], cell_m: float, max_changed_at: datetime | None) -> _Snapshot:
+    n = len(rows)
+    if n:
+        source, ids, types, dates, descriptions, lat, lon = (list(col) for col in zip(*rows))
+    else:
+        source, ids, types, dates, descriptions, lat, lon = ([] for _ in range(7))
+
+    lat_arr = np.asarray(lat, dtype=np.float64)
+    lon_arr = np.asarray(lon, dtype=np.float64)
+    x, y = project(lat_arr, lon_arr)
+    ts = np.fromiter((_timestamp(d) for d in dates), dtype=np.float64, count=n)
+
+    ix = np.floor(x / cell_m).astype(np.int64)
+    iy = np.floor(y / cell_m).astype(np.int64)
+    keys = _cell_key(ix, iy)
+    order = np.argsort(keys, kind="stable")
+    cell_keys, cell_starts = np.unique(keys[order], return_index=True)
+    cell_starts = np.append(cell_starts, n)
+
+    def _objects(values):
+        arr = np.empty(n, dtype=object)
+        arr[:] = values
+        return arr
+
+    return _Snapshot(
+        x=x,
+        y=y,
+        ts=ts,
+        source=_objects(source),
+        ids=_objects(ids),
+        types=_objects(types),
+        dates=_objects(dates),
+        descriptions=_objects(descriptions),
+        lat=lat_arr,
+        lon=lon_arr,
+        cell_m=cell_m,
+        cell_keys=cell_keys,
+        cell_starts=cell_starts,
+        order=order,
+        keys=frozenset(zip(source, ids)),
+        max_changed_at=max_changed_at,
+    )
+
+
+class IncidentIndex:
+    """Uniform-grid index of incident points with NumPy coordinate/date arrays."""
+
+    def __init__(self, cell_m: float) -> None:
+        self._cell_m = cell_m
+        self._snapshot: _Snapshot | None = None
+        self._rows: list[tuple] = []
+        self._refresh_lock = threading.Lock()
+        self._last_full_load = 0.0
+        self.version = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self) -> int:
+        snapshot = self._snapshot
+        return len(snapshot) if snapshot is not None else 0
+
+    # -- loading -------------------------------------------------------------
+    def _fetch_rows(self, since: datetime | None) -> tuple[list[tuple], datetime | None]:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(_INCIDENT_ROWS_QUERY, {"since": since})
+            fetched = cur.fetchall()
+
+        rows = []
+        max_changed_at = None
+        for source, incident_id, incident_type, date, description, lat, lon, changed_at in fetched:
+            rows.append((source, incident_id, incident_type, date, description, lat, lon))
+            if changed_at is not None and (max_changed_at is None or changed_at > max_changed_at):
+                max_changed_at = changed_at
+        return rows, max_changed_at
+
+    def load(self) -> int:
+        """Rebuild the index from every incident row."""
+        with self._refresh_lock:
+            rows, max_changed_at = self._fetch_rows(None)
+            self._install(rows, max_changed_at)
+            self._last_full_load = time.monotonic()
+            logger.info("Incident index loaded with %d points", len(rows))
+            return len(rows)
+
+    def refresh(self) -> int:
+        """
+        Pull rows geocoded since the last load; falls back to a full rebuild
+        on first use or once the rebuild interval has passed.
+
+        Returns the number of rows added.
+        """
+        snapshot = self._snapshot
+        rebuild_due = (
+            time.monotonic() - self._last_full_load >= settings.incident_index_rebuild_seconds
+        )
+        if snapshot is None or snapshot.max_changed_at is None or rebuild_due:
+            return self.load()
+
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            rows, max_changed_at = self._fetch_rows(snapshot.max_changed_at)
+            rows = [row for row in rows if (row[0], row[1]) not in snapshot.keys]
+            if not rows:
+                return 0
+            self._install(self._rows + rows, max_changed_at or snapshot.max_changed_at)
+            return len(rows)
+
+    def _install(self, rows: list[tuple], max_changed_at: datetime | None) -> None:
+        self._rows = rows
+        self._snapshot = _build_snapshot(rows, self._cell_m, max_changed_at)
+        self.version += 1
+
+    # -- queries -------------------------------------------------------------
+    def _candidates(self, snapshot: _Snapshot, line_x: np.ndarray, line_y: np.ndarray, radius_m: float) -> np.ndarray:
+        """Indices of points in grid cells touched by the buffered route."""
+        cell = snapshot.cell_m
+        reach = int(math.ceil(radius_m / cell))
+        cells = set()
+        # Walk each segment's bounding box, expanded by the radius
+        for i in range(max(len(line_x) - 1, 1)):
+            j = min(i + 1, len(line_x) - 1)
+            x0, x1 = sorted((line_x[i], line_x[j]))
+            y0, y1 = sorted((line_y[i], line_y[j]))
+            for cx in range(int(math.floor(x0 / cell)) - reach, int(math.floor(x1 / cell)) + reach + 1):
+                for cy in range(int(math.floor(y0 / cell)) - reach, int(math.floor(y1 / cell)) + reach + 1):
+                    cells.add((cx, cy))
+        if not cells:
+            return np.empty(0, dtype=np.int64)
+
+        cx, cy = np.array(list(cells), dtype=np.int64).T
+        wanted = _cell_key(cx, cy)
+        pos = np.searchsorted(snapshot.cell_keys, wanted)
+        valid = pos < len(snapshot.cell_keys)
+        pos, wanted = pos[valid], wanted[valid]
+        hits = pos[snapshot.cell_keys[pos] == wanted]
+        if hits.size == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(
+            [snapshot.order[snapshot.cell_starts[h]:snapshot.cell_starts[h + 1]] for h in hits]
+        )
+
+    def query_indices(
+        self, route: LineString, radius_m: float, since: datetime | None = None
+    ) -> tuple[_Snapshot, np.ndarray]:
+        """Snapshot plus indices of incidents within ``radius_m`` of ``route``."""
+        snapshot = self._snapshot
+        if snapshot is None or len(snapshot) == 0 or not route.coordinates:
+            return snapshot, np.empty(0, dtype=np.int64)
+
+        lons, lats = zip(*route.coordinates)
+        line_x, line_y = project(lats, lons)
+        idx = self._candidates(snapshot, line_x, line_y, radius_m)
+        if since is not None and idx.size:
+            idx = idx[snapshot.ts[idx] >= _timestamp(since)]
+        if idx.size == 0:
+            return snapshot, idx
+
+        dist = point_segment_distances(snapshot.x[idx], snapshot.y[idx], line_x, line_y)
+        return snapshot, np.sort(idx[dist <= radius_m])
+
+    def query(self, route: LineString, radius_m: float, since: datetime | None = None) -> list[Incident]:
+        """Incidents within ``radius_m`` of ``route`` dated at or after ``since``."""
+        snapshot, idx = self.query_indices(route, radius_m, since)
+        return [
+            Incident(
+                id=str(snapshot.ids[i]),
+                type=normalize_incident_type(snapshot.types[i]),
+                location=Coordinates(latitude=float(snapshot.lat[i]), longitude=float(snapshot.lon[i])),
+                date=snapshot.dates[i],
+                description=snapshot.descriptions[i] or "",
+                severity="medium",
+            )
+            for i in idx
+        ]
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "ready": snapshot is not None,
+            "points": len(snapshot) if snapshot is not None else 0,
+            "cells": len(snapshot.cell_keys) if snapshot is not None else 0,
+            "version": self.version,
+        }
+
+
+incident_index = IncidentIndex(cell_m=settings.incident_index_cell_m)
@@ -15,27 +15,24 @@ def _fetch_from_db() -> List[Dict]:
     """Load infrastructure features from osm_infrastructure table."""
     try:
         from ..db import get_conn
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT feature_type,
-                   ST_Y(geometry::geometry) as lat,
-                   ST_X(geometry::geometry) as lon,
-                   properties
-            FROM osm_infrastructure
-            WHERE feature_type IN ('traffic_signal', 'crosswalk', 'streetlight_zone')
-            ORDER BY feature_type
-        """)
-        features = []
-        for row in cur.fetchall():
-            features.append({
-                "type": row[0],
-                "lat": row[1],
-                "lon": row[2],
-                "properties": row[3] or {},
-            })
-        cur.close()
-        conn.close()
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT feature_type,
+                       ST_Y(geometry::geometry) as lat,
+                       ST_X(geometry::geometry) as lon,
+                       properties
+                FROM osm_infrastructure
+                WHERE feature_type IN ('traffic_signal', 'crosswalk', 'streetlight_zone')
+                ORDER BY feature_type
+            """)
+            features = []
+            for row in cur.fetchall():
+                features.append({
+                    "type": row[0],
+                    "lat": row[1],
+                    "lon": row[2],
+                    "properties": row[3] or {},
+                })
         return features
     except Exception as e:
         logger.warning(f"Infrastructure DB fetch failed: {e}")
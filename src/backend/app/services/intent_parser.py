@@ -0,0 +1,202 @@
+"""
+Single-pass intent parser for chat messages.
+
+Every keyword class (priority, transportation mode, location category) plus
+the "from"/"to" markers and clock times are alternatives of one compiled
+pattern, so a message is scanned once and all fields fall out of the same
+set of matches. ``/api/dispatch`` runs this on every message before deciding
+whether the LLM needs to be involved, and ``IntentAgent`` uses it for its
+structured extraction.
+
+Keywords match whole words (plural endings allowed), so "rec" no longer
+fires inside "directions" nor "car" inside "scary". The keyword set is
+compiled into a trie-shaped alternation, so each position costs one branch
+walk rather than a test per keyword.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from ..models import TransportationMode
+
+# Common category keywords for detection
+CATEGORY_KEYWORDS = {
+    "dorm": ["dorm", "residence hall", "residence", "housing"],
+    "library": ["library", "libraries"],
+    "dining": ["dining", "food", "cafeteria", "restaurant", "cafe", "eat", "eating"],
+    "academic": ["academic", "classroom", "lecture hall", "department"],
+    "recreation": ["gym", "recreation", "rec", "fitness", "sports"],
+    "parking": ["parking", "garage", "lot"],
+}
+
+# Checked in order: the first class with a keyword in the message wins.
+# Whole-word matching means inflections ("avoiding", "shortcut") need their
+# own entries; only a plural "s"/"es" is implied.
+PRIORITY_KEYWORDS = {
+    "safety": ["safe", "safer", "safest", "safely", "safety", "unsafe",
+               "avoid", "avoiding", "avoided", "secure", "securely"],
+    "speed": ["fast", "faster", "fastest", "quick", "quicker", "quickest", "quickly",
+              "short", "shorter", "shortest", "shortcut", "hurry", "asap"],
+}
+
+MODE_KEYWORDS = {
+    TransportationMode.BIKE: ["bike", "biking", "cycle", "cycling", "bicycle"],
+    TransportationMode.CAR: ["drive", "driving", "car"],
+    TransportationMode.BUS: ["bus", "shuttle", "tiger line", "transit"],
+}
+
+# Keyword classes, indexed by position; within a class, earlier values win
+_CATEGORY, _PRIORITY, _MODE = range(3)
+_CLASS_VALUES = [list(CATEGORY_KEYWORDS), list(PRIORITY_KEYWORDS), list(MODE_KEYWORDS)]
+
+
+def _keyword_table() -> dict[str, list[tuple[int, int]]]:
+    """keyword -> [(class, rank of its value within the class)]"""
+    table: dict[str, list[tuple[int, int]]] = {}
+    for kind, classes in enumerate([CATEGORY_KEYWORDS, PRIORITY_KEYWORDS, MODE_KEYWORDS]):
+        for rank, keywords in enumerate(classes.values()):
+            for keyword in keywords:
+                table.setdefault(keyword, []).append((kind, rank))
+    return table
+
+
+_KEYWORDS = _keyword_table()
+
+
+def _trie_pattern(words) -> str:
+    """
+    Regex for a set of words shaped like a trie (``ca(?:fe(?:teria)?|r)``),
+    so the engine follows one branch per character instead of trying every
+    keyword in turn.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        optional = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+# Alternatives all start at a word boundary; keywords may take a plural ending
+_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?P<to>(?:towards|to)\s+)"
+    r"|(?P<from>from\s+)"
+    r"|(?P<at>at\s+(?=\d))"
+    r"|(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?(?:\s*(?P<meridiem>[ap]m)\b|\b)"
+    rf"|(?P<keyword>{_trie_pattern(_KEYWORDS)})(?:e?s)?\b"
+    r")",
+    flags=re.IGNORECASE,
+)
+
+_ORIGIN = re.compile(r"[A-Za-z][A-Za-z\s']*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ParsedIntent:
+    destination: str
+    origin: str
+    priority: str
+    time: str
+    transportation_mode: TransportationMode
+    category: str | None  # category keyword anywhere in the message
+    destination_category: str | None  # category keyword inside ``destination``
+
+
+def _clock(hour: int, minute: int, meridiem: str) -> str:
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    if meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return "current"
+    return f"{hour:02d}:{minute:02d}"
+
+
+def parse_intent(message: str) -> ParsedIntent:
+    """Extract destination, origin, priority, time, mode and category in one scan."""
+    to_markers: list[tuple[int, int]] = []
+    from_end = None
+    at_starts: list[int] = []
+    time_value = None
+    unranked = len(_KEYWORDS)
+    best = [unranked, unranked, unranked]
+    categories: list[tuple[int, int]] = []
+
+    for match in _PATTERN.finditer(message):
+        group = match.lastgroup
+        if group == "keyword":
+            word = match.group(group).lower()
+            entries = _KEYWORDS.get(word) or _KEYWORDS[_WHITESPACE.sub(" ", word)]
+            for kind, rank in entries:
+                if kind == _CATEGORY:
+                    categories.append((match.start(), rank))
+                if rank < best[kind]:
+                    best[kind] = rank
+        elif group == "to":
+            to_markers.append(match.span())
+        elif group == "from":
+            if from_end is None:
+                from_end = match.end()
+        elif group == "at":
+            at_starts.append(match.start())
+        elif time_value is None:
+            # Any other match is a clock time; only the first counts
+            minute, meridiem = match.group("minute", "meridiem")
+            time_value = _clock(int(match.group("hour")), int(minute or 0), (meridiem or "").lower())
+
+    destination = ""
+    dest_start = dest_end = -1
+    if to_markers:
+        dest_start = to_markers[0][1]
+        dest_end = len(message)
+        for start in at_starts:
+            if start >= dest_start:
+                dest_end = start
+                break
+        destination = message[dest_start:dest_end].strip()
+
+    origin = ""
+    if from_end is not None:
+        # "from <place> to ...": letters only, up to the next "to"
+        for start, _ in to_markers:
+            if start > from_end:
+                if _ORIGIN.fullmatch(message, from_end, start):
+                    origin = message[from_end:start].strip()
+                break
+
+    destination_rank = min(
+        (rank for start, rank in categories if dest_start <= start < dest_end), default=unranked
+    )
+    return ParsedIntent(
+        destination=destination,
+        origin=origin,
+        priority=_value(_PRIORITY, best[_PRIORITY]) or "balanced",
+        time=time_value or "current",
+        transportation_mode=_value(_MODE, best[_MODE]) or TransportationMode.WALK,
+        category=_value(_CATEGORY, best[_CATEGORY]),
+        destination_category=_value(_CATEGORY, destination_rank),
+    )
+
+
+def _value(kind: int, rank: int):
+    values = _CLASS_VALUES[kind]
+    return values[rank] if rank < len(values) else None
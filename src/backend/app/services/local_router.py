@@ -0,0 +1,277 @@
+"""
+Local routing backend over the compiled campus walk graph.
+
+Selected with ``ROUTING_BACKEND=local``. The graph is the compiled CSR
+directory written by ``src/routing/safety_graph.py`` (``LOCAL_GRAPH_PATH``);
+it is memory-mapped once per process, so workers share its pages. When the
+routing package or the graph file is unavailable, ``get_local_graph``
+returns None and callers fall back to OSRM; a missing file is retried every
+``LOCAL_GRAPH_RETRY_SECONDS``. Endpoints further than
+``LOCAL_GRAPH_MAX_SNAP_M`` from any graph node also go to OSRM.
+
+``refresh_local_graph`` runs every ``LOCAL_GRAPH_REFRESH_SECONDS`` and
+re-maps the graph when ``header.json`` changed: ``CSRGraph.save`` writes the
+header last and replaces array files rather than overwriting them, so a
+rebuild or incremental update is picked up without a restart while
+in-flight requests finish on the old mapping.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from ..config import settings
+from ..models import Coordinates, LineString, Route
+from .incident_index import project
+
+logger = logging.getLogger("campus_dispatch")
+
+try:
+    from src.routing.csr_graph import CSRGraph, NoPathError
+except ImportError:  # backend deployed without the routing package
+    CSRGraph = None
+    NoPathError = RuntimeError
+
+# Typical speeds (m/s) for turning distance into duration
+_WALK_SPEED_MPS = 1.4
+
+_graph = None
+_graph_mtime = None  # header.json mtime (ns) of the mapped graph
+_retry_at = 0.0  # time.monotonic() before which a failed load is not retried
+_graph_lock = threading.Lock()
+
+
+def _header_mtime() -> int:
+    return os.stat(os.path.join(settings.local_graph_path, "header.json")).st_mtime_ns
+
+
+def _load_graph() -> bool:
+    """(Re)map the graph from disk; call with ``_graph_lock`` held."""
+    global _graph, _graph_mtime, _retry_at
+    try:
+        # Stat before loading: a save racing with us at worst causes one
+        # extra reload on the next refresh
+        mtime = _header_mtime()
+        graph = CSRGraph.load(settings.local_graph_path)
+        graph.build_snap_index()
+    except (OSError, ValueError) as e:
+        _retry_at = time.monotonic() + settings.local_graph_retry_seconds
+        logger.warning(
+            "Local routing graph unavailable, %s; retrying in %ds: %s",
+            "keeping the mapped one" if _graph is not None else "using OSRM",
+            settings.local_graph_retry_seconds,
+            e,
+        )
+        return False
+    _graph, _graph_mtime = graph, mtime
+    logger.info(
+        "Local routing graph loaded: %d nodes, %d edges (built %s)",
+        graph.node_count,
+        graph.edge_count,
+        graph.header.get("built_at"),
+    )
+    return True
+
+
+def get_local_graph():
+    if _graph is not None or CSRGraph is None or time.monotonic() < _retry_at:
+        return _graph
+    with _graph_lock:
+        if _graph is None and time.monotonic() >= _retry_at:
+            _load_graph()
+    return _graph
+
+
+def refresh_local_graph() -> bool:
+    """Re-map the graph when its header.json changed since it was loaded."""
+    if CSRGraph is None:
+        return False
+    with _graph_lock:
+        try:
+            mtime = _header_mtime()
+        except OSError:
+            return False  # mid-save or removed; keep serving what is mapped
+        if _graph is not None and mtime == _graph_mtime:
+            return False
+        return _load_graph()
+
+
+def _snap_distances(graph, lats, lons, nodes) -> np.ndarray:
+    """Straight-line metres from each point to the node it snapped to."""
+    px, py = project(lats, lons)
+    sx, sy = project(np.asarray(graph.node_lat)[nodes], np.asarray(graph.node_lon)[nodes])
+    return np.hypot(px - sx, py - sy)
+
+
+def _to_route(graph, path: list[int], index: int) -> Route:
+    coords = [(lon, lat) for lat, lon in graph.path_coords(path)]
+    if len(coords) == 1:
+        coords.append(coords[0])
+    distance = graph.path_length(path, "length")
+    return Route(
+        id=f"route_{index + 1}",
+        geometry=LineString(coordinates=coords),
+        distance_meters=distance,
+        duration_seconds=distance / _WALK_SPEED_MPS,
+        waypoints=[
+            Coordinates(latitude=coords[0][1], longitude=coords[0][0]),
+            Coordinates(latitude=coords[-1][1], longitude=coords[-1][0]),
+        ],
+    )
+
+
+def local_routes(
+    graph,
+    origin: Coordinates,
+    destination: Coordinates,
+    alternatives: int,
+    hour: int | None = None,
+) -> list[Route] | None:
+    """
+    Walking routes from the local graph: the shortest path plus, when
+    alternatives are requested, up to that many further routes that trade
+    length for safety (Pareto-optimal, no two overlapping by more than
+    ``LOCAL_ROUTE_MAX_OVERLAP``). ``hour`` selects the graph's time-of-day
+    safety layer. Returns an empty list when the endpoints are not connected,
+    and None when either is more than ``LOCAL_GRAPH_MAX_SNAP_M`` from the
+    graph (off campus), so the caller can use OSRM instead.
+    """
+    lats = [origin.latitude, destination.latitude]
+    lons = [origin.longitude, destination.longitude]
+    nodes = graph.nearest_nodes(lats, lons)
+    snap_m = _snap_distances(graph, lats, lons, nodes)
+    if snap_m.max() > settings.local_graph_max_snap_m:
+        logger.debug("Endpoint %.0f m from the local graph; using OSRM", snap_m.max())
+        return None
+    source, target = nodes.tolist()
+
+    try:
+        if alternatives > 0:
+            paths = graph.pareto_paths(
+                source,
+                target,
+                max_paths=alternatives + 1,
+                max_overlap=settings.local_route_max_overlap,
+                hour=hour,
+            )
+        else:
+            paths = [graph.shortest_path(source, target, weight="length")]
+    except NoPathError:
+        return []
+
+    return [_to_route(graph, path, i) for i, path in enumerate(paths)]
+
+
+def _convex_hull(points: np.ndarray) -> list[list[float]]:
+    """Closed convex hull ring of (lon, lat) points (monotone chain)."""
+    pts = sorted(set(map(tuple, points.tolist())))
+    if len(pts) < 3:
+        return []
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    ring = lower[:-1] + upper[:-1]
+    return [list(p) for p in ring + ring[:1]]
+
+
+def walk_distances(graph, origin: Coordinates, lats, lons, max_length: float) -> np.ndarray:
+    """
+    Walking distance in metres from ``origin`` to each point over the graph,
+    from one shortest-path tree. Includes the straight legs between each
+    point and its nearest node; ``inf`` where the walk exceeds ``max_length``.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    source = graph.nearest_node(origin.latitude, origin.longitude)
+    targets = graph.nearest_nodes(lats, lons)
+    dist = graph.reachable(source, max_length)
+
+    node_lat, node_lon = np.asarray(graph.node_lat), np.asarray(graph.node_lon)
+    ox, oy = project(origin.latitude, origin.longitude)
+    sx, sy = project(node_lat[source], node_lon[source])
+    px, py = project(lats, lons)
+    tx, ty = project(node_lat[targets], node_lon[targets])
+    return np.hypot(ox - sx, oy - sy) + dist[targets] + np.hypot(px - tx, py - ty)
+
+
+def walk_minutes(distance_m):
+    """Walking time for a distance at the speed used for local routes."""
+    return np.asarray(distance_m, dtype=np.float64) / _WALK_SPEED_MPS / 60
+
+
+def reachable_area(
+    graph,
+    origin: Coordinates,
+    minutes: float,
+    max_risk: float | None = None,
+    hour: int | None = None,
+) -> dict:
+    """
+    Area reachable on foot from ``origin`` within ``minutes`` without using
+    edges riskier than ``max_risk``, from one shortest-path tree.
+
+    Returns a GeoJSON FeatureCollection with the reachable street segments
+    (edges cut off at the budget are trimmed) and their convex hull.
+    """
+    budget = minutes * 60 * _WALK_SPEED_MPS
+    source = graph.nearest_node(origin.latitude, origin.longitude)
+    dist = graph.reachable(source, budget, max_risk=max_risk, hour=hour)
+
+    # Every edge leaving a reached node that the walk is allowed to use
+    sources = np.repeat(np.arange(graph.node_count), np.diff(graph.indptr))
+    targets = np.asarray(graph.indices, dtype=np.int64)
+    usable = np.isfinite(dist[sources])
+    if max_risk is not None:
+        usable &= graph.risk_factors(hour) <= max_risk
+    # A two-way street appears once per direction; keep the one walked further
+    edge_ids = np.nonzero(usable)[0]
+    u, v = sources[edge_ids], targets[edge_ids]
+    fraction = np.clip((budget - dist[u]) / np.maximum(graph.length[edge_ids], 1e-9), 0.0, 1.0)
+    pair = np.minimum(u, v) * graph.node_count + np.maximum(u, v)
+    order = np.lexsort((-fraction, pair))
+    keep = order[np.unique(pair[order], return_index=True)[1]]
+    u, v, fraction = u[keep], v[keep], fraction[keep]
+
+    lat, lon = np.asarray(graph.node_lat), np.asarray(graph.node_lon)
+    end_lat = lat[u] + (lat[v] - lat[u]) * fraction
+    end_lon = lon[u] + (lon[v] - lon[u]) * fraction
+    lines = [
+        [[float(a_lon), float(a_lat)], [float(b_lon), float(b_lat)]]
+        for a_lon, a_lat, b_lon, b_lat in zip(lon[u], lat[u], end_lon, end_lat)
+    ]
+    hull = _convex_hull(np.column_stack([np.append(lon[u], end_lon), np.append(lat[u], end_lat)]))
+
+    properties = {
+        "minutes": minutes,
+        "max_risk": max_risk,
+        "hour": hour,
+        "reachable_nodes": int(np.isfinite(dist).sum()),
+    }
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "MultiLineString", "coordinates": lines},
+            "properties": {**properties, "kind": "edges"},
+        }
+    ]
+    if hull:
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [hull]},
+            "properties": {**properties, "kind": "area"},
+        })
+    return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,198 @@
+"""
+In-memory campus location table for category disambiguation.
+
+"Take me to a dorm" needs every location in a category, ordered by distance
+from the user. The active ``campus_locations`` rows, plus the
+``campus_buildings`` names used when a category has no curated rows, are
+held in memory with their coordinates projected to local metres. A category
+lookup is then a slice of precomputed indices and one vectorized distance
+computation, with no database round-trip per chat turn.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..db import get_conn
+from ..models import CampusLocation, Coordinates
+from .incident_index import project
+
+logger = logging.getLogger("campus_dispatch")
+
+# Keyword patterns for matching campus_buildings names when a category has
+# no campus_locations rows (ILIKE syntax, shared with the SQL fallback)
+BUILDING_NAME_KEYWORDS: dict[str, list[str]] = {
+    "dorm": ["%HALL%", "%RESIDENCE%", "%DORM%"],
+    "library": ["%LIBRARY%"],
+    "dining": ["%DINING%", "%CAFE%", "%UNION%", "%STUDENT CENTER%"],
+    "recreation": ["%REC%", "%GYM%", "%FITNESS%"],
+    "parking": ["%PARKING%", "%GARAGE%"],
+    "academic": ["%HALL%", "%SCIENCE%", "%ENGINEERING%"],
+}
+
+_LOCATIONS_QUERY = """
+    SELECT id, name, category, address, building_number,
+           ST_Y(location_geo::geometry) as latitude,
+           ST_X(location_geo::geometry) as longitude,
+           description
+    FROM campus_locations
+    WHERE is_active = TRUE AND location_geo IS NOT NULL
+"""
+
+_BUILDINGS_QUERY = """
+    SELECT id, name, building_number,
+           ST_Y(ST_Centroid(geometry::geometry)) as latitude,
+           ST_X(ST_Centroid(geometry::geometry)) as longitude
+    FROM campus_buildings
+    WHERE name IS NOT NULL AND geometry IS NOT NULL
+"""
+
+_SIGNATURE_QUERY = """
+    SELECT (SELECT COUNT(*) FROM campus_locations), (SELECT MAX(updated_at) FROM campus_locations),
+           (SELECT COUNT(*) FROM campus_buildings), (SELECT MAX(created_at) FROM campus_buildings)
+"""
+
+
+def straight_line_m(origin: Coordinates, lat, lon) -> np.ndarray:
+    """Distances in metres from ``origin`` to each point, in the local projection."""
+    ox, oy = project(origin.latitude, origin.longitude)
+    x, y = project(lat, lon)
+    return np.hypot(x - ox, y - oy)
+
+
+@dataclass(frozen=True)
+class _Table:
+    locations: list[CampusLocation]
+    x: np.ndarray  # local metres
+    y: np.ndarray
+    by_category: dict[str, np.ndarray]  # indices into ``locations``, name order
+
+
+def _matches_building_keywords(name: str, patterns: list[str]) -> bool:
+    upper = name.upper()
+    return any(pattern.strip("%") in upper for pattern in patterns)
+
+
+class LocationIndex:
+    def __init__(self) -> None:
+        self._table: _Table | None = None
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._table is not None
+
+    def load(self, locations: list[CampusLocation], buildings: list[CampusLocation]) -> None:
+        """
+        Install curated ``locations`` and raw ``buildings``. Each category
+        lists its curated rows, or, when it has none, the buildings whose
+        names match ``BUILDING_NAME_KEYWORDS``.
+        """
+        everything = locations + buildings
+        curated: dict[str, list[int]] = {}
+        for i, location in enumerate(locations):
+            curated.setdefault(location.category, []).append(i)
+
+        by_category = {}
+        for category in curated.keys() | BUILDING_NAME_KEYWORDS.keys():
+            members = curated.get(category)
+            if not members:
+                patterns = BUILDING_NAME_KEYWORDS.get(category, [])
+                members = [
+                    len(locations) + i
+                    for i, building in enumerate(buildings)
+                    if _matches_building_keywords(building.name, patterns)
+                ]
+            members.sort(key=lambda i: everything[i].name)
+            by_category[category] = np.asarray(members, dtype=np.int64)
+
+        x, y = project(
+            [loc.coordinates.latitude for loc in everything],
+            [loc.coordinates.longitude for loc in everything],
+        )
+        self._table = _Table(locations=everything, x=x, y=y, by_category=by_category)
+
+    def nearest(
+        self,
+        category: str,
+        origin: Coordinates | None = None,
+        limit: int = 10,
+    ) -> tuple[list[CampusLocation], np.ndarray | None]:
+        """
+        Up to ``limit`` locations in ``category`` with their straight-line
+        distances from ``origin``, nearest first. Without an origin they come
+        back in name order and the distances are None.
+        """
+        table = self._table
+        if table is None:
+            return [], None
+        members = table.by_category.get(category)
+        if members is None or not len(members):
+            return [], None
+        if origin is None:
+            return [table.locations[i] for i in members[:limit].tolist()], None
+
+        ox, oy = project(origin.latitude, origin.longitude)
+        distances = np.hypot(table.x[members] - ox, table.y[members] - oy)
+        if len(members) > limit:
+            top = np.argpartition(distances, limit - 1)[:limit]
+        else:
+            top = np.arange(len(members))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return [table.locations[i] for i in members[top].tolist()], distances[top]
+
+    def refresh(self) -> bool:
+        """Reload when campus_locations or campus_buildings changed since the last load."""
+        with self._lock:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute(_SIGNATURE_QUERY)
+                signature = tuple(cur.fetchone())
+                if signature == self._signature:
+                    return False
+                cur.execute(_LOCATIONS_QUERY)
+                location_rows = cur.fetchall()
+                cur.execute(_BUILDINGS_QUERY)
+                building_rows = cur.fetchall()
+
+            locations = [
+                CampusLocation(
+                    id=r[0], name=r[1], category=r[2], address=r[3],
+                    building_number=r[4],
+                    coordinates=Coordinates(latitude=r[5], longitude=r[6]),
+                    description=r[7],
+                )
+                for r in location_rows
+            ]
+            buildings = [
+                CampusLocation(
+                    id=r[0], name=r[1], category="misc",
+                    building_number=r[2],
+                    coordinates=Coordinates(latitude=r[3], longitude=r[4]),
+                    description="Campus building",
+                )
+                for r in building_rows
+                if r[3] is not None and r[4] is not None
+            ]
+            self.load(locations, buildings)
+            self._signature = signature
+            logger.info(
+                "Location index loaded with %d locations and %d buildings",
+                len(locations),
+                len(buildings),
+            )
+            return True
+
+    def stats(self) -> dict:
+        table = self._table
+        return {
+            "ready": self.ready,
+            "locations": len(table.locations) if table is not None else 0,
+            "categories": len(table.by_category) if table is not None else 0,
+        }
+
+
+location_index = LocationIndex()
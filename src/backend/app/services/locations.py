@@ -2,8 +2,9 @@
 Location service for campus location queries and disambiguation.
 
 Lookup priority:
+  0. in-memory gazetteer (services/gazetteer.py)
   1. campus_locations table (seeded from campus_buildings)
-  2. campus_buildings table (name search via ILIKE)
+  2. campus_buildings table (pg_trgm name search)
   3. Nominatim geocoding (online fallback, biased to Mizzou campus)
 """
 from __future__ import annotations
@@ -11,21 +12,29 @@ from __future__ import annotations
 import logging
 from typing import List, Optional, Tuple
 
+import numpy as np
+
+from ..config import settings
 from ..db import get_db_connection
 from ..models import CampusLocation, LocationCategory, Coordinates
+from ..schemas.agent_schemas import LocationOption
+from .gazetteer import gazetteer
 from .geocoding import geocode_location, GeocodingError
+from .intent_parser import parse_intent
+from .local_router import get_local_graph, walk_distances, walk_minutes
+from .location_index import BUILDING_NAME_KEYWORDS, location_index, straight_line_m
 
 logger = logging.getLogger("campus_dispatch")
 
-# Common category keywords for detection
-CATEGORY_KEYWORDS = {
-    "dorm": ["dorm", "dorms", "residence hall", "residence", "housing"],
-    "library": ["library", "libraries"],
-    "dining": ["dining", "food", "cafeteria", "restaurant", "cafe", "eat"],
-    "academic": ["academic", "classroom", "lecture hall", "department"],
-    "recreation": ["gym", "recreation", "rec", "fitness", "sports"],
-    "parking": ["parking", "garage", "lot"],
-}
+_CATEGORY_VALUES = {category.value for category in LocationCategory}
+
+# Disambiguation: candidates fetched per option before re-ranking by walking
+# distance, and the walk budget as a multiple of the farthest straight line
+_WALK_RERANK_FACTOR = 2
+_WALK_DETOUR_LIMIT = 2.0
+_SNAP_SLACK_M = 200.0
+# Rows ranked by distance when the index is not loaded
+_DB_CANDIDATES = 100
 
 
 def is_category_query(query: str) -> Tuple[bool, Optional[str]]:
@@ -35,16 +44,8 @@ def is_category_query(query: str) -> Tuple[bool, Optional[str]]:
     Returns:
         (is_category, category_name) tuple
     """
-    query_lower = query.lower()
-    
-    # Check for explicit category patterns
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            # Match patterns like "take me to a dorm", "find me food", "where's a library"
-            if keyword in query_lower:
-                return (True, category)
-    
-    return (False, None)
+    category = parse_intent(query).category
+    return (category is not None, category)
 
 
 def get_locations_by_category(category: str, limit: int = 10) -> List[CampusLocation]:
@@ -72,15 +73,69 @@ def get_locations_by_category(category: str, limit: int = 10) -> List[CampusLoca
     return _category_from_campus_buildings(category, limit)
 
 
-# Keyword patterns for searching campus_buildings by name when campus_locations is empty
-_BUILDING_NAME_KEYWORDS: dict[str, list[str]] = {
-    "dorm": ["%HALL%", "%RESIDENCE%", "%DORM%"],
-    "library": ["%LIBRARY%"],
-    "dining": ["%DINING%", "%CAFE%", "%UNION%", "%STUDENT CENTER%"],
-    "recreation": ["%REC%", "%GYM%", "%FITNESS%"],
-    "parking": ["%PARKING%", "%GARAGE%"],
-    "academic": ["%HALL%", "%SCIENCE%", "%ENGINEERING%"],
-}
+def get_category_options(
+    category: str,
+    origin: Optional[Coordinates] = None,
+    limit: int = 10,
+) -> List[LocationOption]:
+    """
+    Disambiguation options for a category, nearest to ``origin`` first.
+
+    Served from the in-memory location index when it is loaded (no database
+    round-trip), otherwise from ``get_locations_by_category``. With an
+    origin, each option carries its straight-line distance and, when the
+    local walk graph is available, a walk-time estimate; options are then
+    ordered by walking distance. Without one they stay in name order.
+    """
+    if location_index.ready:
+        # Over-fetch by straight line; walking distance may reorder them
+        locations, distances = location_index.nearest(
+            category, origin, limit * _WALK_RERANK_FACTOR if origin else limit
+        )
+    else:
+        locations = get_locations_by_category(category, limit=_DB_CANDIDATES if origin else limit)
+        distances = None
+        if origin is not None and locations:
+            distances = straight_line_m(
+                origin,
+                [loc.coordinates.latitude for loc in locations],
+                [loc.coordinates.longitude for loc in locations],
+            )
+
+    minutes = None
+    if distances is not None:
+        order_by = distances
+        graph = get_local_graph()
+        if graph is not None:
+            walk = walk_distances(
+                graph,
+                origin,
+                [loc.coordinates.latitude for loc in locations],
+                [loc.coordinates.longitude for loc in locations],
+                max_length=float(distances.max()) * _WALK_DETOUR_LIMIT + _SNAP_SLACK_M,
+            )
+            # Places beyond the walk budget (inf) go last, by straight line
+            order_by = walk
+            minutes = walk_minutes(walk)
+        order = np.lexsort((distances, order_by))[:limit]
+        locations = [locations[i] for i in order.tolist()]
+        distances = distances[order]
+        minutes = minutes[order] if minutes is not None else None
+
+    return [
+        LocationOption(
+            name=loc.name,
+            address=loc.address,
+            coordinates=loc.coordinates,
+            category=category,
+            distance_meters=round(float(distances[i])) if distances is not None else None,
+            walk_minutes=(
+                round(float(minutes[i]), 1)
+                if minutes is not None and np.isfinite(minutes[i]) else None
+            ),
+        )
+        for i, loc in enumerate(locations)
+    ]
 
 
 def _category_from_campus_locations(category: str, limit: int) -> List[CampusLocation]:
@@ -117,7 +172,7 @@ def _category_from_campus_locations(category: str, limit: int) -> List[CampusLoc
 
 def _category_from_campus_buildings(category: str, limit: int) -> List[CampusLocation]:
     """Fallback: search campus_buildings by name keywords."""
-    patterns = _BUILDING_NAME_KEYWORDS.get(category, [])
+    patterns = BUILDING_NAME_KEYWORDS.get(category, [])
     if not patterns:
         return []
 
@@ -158,24 +213,32 @@ def _category_from_campus_buildings(category: str, limit: int) -> List[CampusLoc
 
 def get_location_by_name(name: str) -> Optional[CampusLocation]:
     """
-    Get a specific location by name with three-tier fallback:
+    Get a specific location by name with four-tier fallback:
+      0. in-memory gazetteer (exact name, alias or building number)
       1. campus_locations table (exact match)
-      2. campus_buildings table (ILIKE fuzzy match)
+      2. campus_buildings table (pg_trgm similarity / ILIKE match)
       3. Nominatim geocoding (online, biased to Mizzou campus)
 
+    Tiers 1 and 2 share one database connection.
+
     Args:
         name: Location name to search for
 
     Returns:
         CampusLocation if found, None otherwise
     """
-    # --- Tier 1: campus_locations table ---
-    result = _search_campus_locations(name)
-    if result:
-        return result
+    # --- Tier 0: gazetteer, no I/O ---
+    match = gazetteer.lookup(name) if settings.gazetteer_enabled else None
+    if match is not None and match.score == 1.0:
+        return _place_as_location(match.place)
 
-    # --- Tier 2: campus_buildings table (broader, ~376 buildings) ---
-    result = _search_campus_buildings(name)
+    # --- Tiers 1 and 2: campus_locations, then campus_buildings ---
+    try:
+        with get_db_connection() as conn:
+            result = _search_campus_locations(conn, name) or _search_campus_buildings(conn, name)
+    except Exception as e:
+        logger.error(f"Location lookup failed for '{name}': {e}")
+        result = None
     if result:
         return result
 
@@ -183,21 +246,32 @@ def get_location_by_name(name: str) -> Optional[CampusLocation]:
     return _geocode_as_location(name)
 
 
-def _search_campus_locations(name: str) -> Optional[CampusLocation]:
+def _place_as_location(place) -> CampusLocation:
+    category = place.category if place.category in _CATEGORY_VALUES else "misc"
+    return CampusLocation(
+        id=0,
+        name=place.name,
+        category=category,
+        building_number=place.building_number,
+        coordinates=place.coordinates,
+        description=f"Campus place ({place.source})",
+    )
+
+
+def _search_campus_locations(conn, name: str) -> Optional[CampusLocation]:
     """Search the curated campus_locations table."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT id, name, category, address, building_number,
-                   ST_Y(location_geo::geometry) as latitude,
-                   ST_X(location_geo::geometry) as longitude,
-                   description
-            FROM campus_locations
-            WHERE LOWER(name) = LOWER(%s) AND is_active = TRUE
-            LIMIT 1
-        """, (name,))
-        row = cursor.fetchone()
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, name, category, address, building_number,
+                       ST_Y(location_geo::geometry) as latitude,
+                       ST_X(location_geo::geometry) as longitude,
+                       description
+                FROM campus_locations
+                WHERE LOWER(name) = LOWER(%s) AND is_active = TRUE
+                LIMIT 1
+            """, (name,))
+            row = cursor.fetchone()
         if row:
             return CampusLocation(
                 id=row[0], name=row[1], category=row[2],
@@ -207,27 +281,46 @@ def _search_campus_locations(name: str) -> Optional[CampusLocation]:
             )
         return None
     except Exception as e:
+        conn.rollback()
         logger.error(f"campus_locations lookup failed for '{name}': {e}")
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 
-def _search_campus_buildings(name: str) -> Optional[CampusLocation]:
+# Trigram-ranked search served by the pg_trgm GIN index
+# (src/db/migrations/location_trigram_search.sql)
+_BUILDING_TRIGRAM_QUERY = """
+    SELECT id, name, building_number,
+           ST_Y(ST_Centroid(geometry::geometry)) as latitude,
+           ST_X(ST_Centroid(geometry::geometry)) as longitude
+    FROM campus_buildings
+    WHERE name ILIKE %(pattern)s OR name %% %(name)s
+    ORDER BY similarity(name, %(name)s) DESC
+    LIMIT 1
+"""
+
+# Used until the pg_trgm migration has been applied
+_BUILDING_ILIKE_QUERY = """
+    SELECT id, name, building_number,
+           ST_Y(ST_Centroid(geometry::geometry)) as latitude,
+           ST_X(ST_Centroid(geometry::geometry)) as longitude
+    FROM campus_buildings
+    WHERE name ILIKE %(pattern)s
+    LIMIT 1
+"""
+
+
+def _search_campus_buildings(conn, name: str) -> Optional[CampusLocation]:
     """Fallback: search the raw campus_buildings table with fuzzy matching."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    params = {"pattern": f"%{name}%", "name": name}
     try:
-        cursor.execute("""
-            SELECT id, name, building_number,
-                   ST_Y(ST_Centroid(geometry::geometry)) as latitude,
-                   ST_X(ST_Centroid(geometry::geometry)) as longitude
-            FROM campus_buildings
-            WHERE LOWER(name) ILIKE LOWER(%s)
-            LIMIT 1
-        """, (f"%{name}%",))
-        row = cursor.fetchone()
+        with conn.cursor() as cursor:
+            try:
+                cursor.execute(_BUILDING_TRIGRAM_QUERY, params)
+            except Exception as e:
+                conn.rollback()
+                logger.debug(f"Trigram search unavailable, using ILIKE: {e}")
+                cursor.execute(_BUILDING_ILIKE_QUERY, params)
+            row = cursor.fetchone()
         if row:
             logger.info(f"Found '{name}' in campus_buildings (fallback tier 2)")
             return CampusLocation(
@@ -238,11 +331,9 @@ def _search_campus_buildings(name: str) -> Optional[CampusLocation]:
             )
         return None
     except Exception as e:
+        conn.rollback()
         logger.error(f"campus_buildings lookup failed for '{name}': {e}")
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 
 def _geocode_as_location(name: str) -> Optional[CampusLocation]:
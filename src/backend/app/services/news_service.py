@@ -2,15 +2,24 @@
 Local Safety News Service.
 
 Fetches RSS feeds from Columbia, MO news sources, classifies articles,
-performs sentiment analysis, and geocodes to campus locations.
+performs sentiment analysis, and geocodes to campus locations. Feeds are
+refreshed by a background job; the endpoints only read ``news_cache``.
 """
 
 import hashlib
 import logging
 import re
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
+import requests
+
+from ..config import settings
+
 logger = logging.getLogger(__name__)
 
 # ─── RSS Feed Sources ─────────────────────────────────────────
@@ -124,64 +133,47 @@ def geocode_article(text: str) -> Optional[Dict]:
     return None
 
 
-def _fetch_rss_articles() -> List[Dict]:
-    """Fetch articles from RSS feeds. Falls back to sample data on failure."""
-    articles = []
-
-    try:
-        import feedparser
-    except ImportError:
-        logger.warning("feedparser not installed. Using fallback articles.")
-        return _create_fallback_articles()
+def _entry_to_article(entry, source: str, known: Dict[str, Dict]) -> Dict:
+    """Classify one feed entry; articles already seen are reused as-is."""
+    title = entry.get("title", "")
+    summary = entry.get("summary", entry.get("description", ""))
+    # Strip HTML tags from summary
+    summary = re.sub(r'<[^>]+>', '', summary).strip()
+    if len(summary) > 200:
+        summary = summary[:200] + "..."
 
-    for feed_info in NEWS_FEEDS:
+    pub_date = ""
+    if hasattr(entry, "published_parsed") and entry.published_parsed:
         try:
-            feed = feedparser.parse(feed_info["url"])
-            for entry in feed.entries[:10]:
-                title = entry.get("title", "")
-                summary = entry.get("summary", entry.get("description", ""))
-                # Strip HTML tags from summary
-                summary = re.sub(r'<[^>]+>', '', summary).strip()
-                if len(summary) > 200:
-                    summary = summary[:200] + "..."
-
-                pub_date = ""
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    try:
-                        pub_date = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%d")
-                    except Exception:
-                        pub_date = entry.get("published", "")
-                elif hasattr(entry, "published"):
-                    pub_date = entry.published
-
-                article_id = hashlib.md5(
-                    f"{title}{pub_date}".encode()
-                ).hexdigest()[:12]
-
-                combined_text = f"{title} {summary}"
-                category = classify_article(combined_text)
-                sentiment = simple_sentiment(combined_text)
-                location = geocode_article(combined_text)
-
-                articles.append({
-                    "id": article_id,
-                    "title": title,
-                    "source": feed_info["name"],
-                    "url": entry.get("link", ""),
-                    "published_date": pub_date,
-                    "summary": summary,
-                    "sentiment_score": sentiment,
-                    "lat": location["lat"] if location else None,
-                    "lon": location["lon"] if location else None,
-                    "categories": category,
-                })
-        except Exception as e:
-            logger.warning(f"Failed to fetch {feed_info['name']}: {e}")
+            pub_date = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%d")
+        except Exception:
+            pub_date = entry.get("published", "")
+    elif hasattr(entry, "published"):
+        pub_date = entry.published
+
+    article_id = hashlib.md5(
+        f"{title}{pub_date}".encode()
+    ).hexdigest()[:12]
+    if article_id in known:
+        return known[article_id]
+
+    combined_text = f"{title} {summary}"
+    category = classify_article(combined_text)
+    sentiment = simple_sentiment(combined_text)
+    location = geocode_article(combined_text)
 
-    if not articles:
-        articles = _create_fallback_articles()
-
-    return articles
+    return {
+        "id": article_id,
+        "title": title,
+        "source": source,
+        "url": entry.get("link", ""),
+        "published_date": pub_date,
+        "summary": summary,
+        "sentiment_score": sentiment,
+        "lat": location["lat"] if location else None,
+        "lon": location["lon"] if location else None,
+        "categories": category,
+    }
 
 
 def _create_fallback_articles() -> List[Dict]:
@@ -250,21 +242,138 @@ def _create_fallback_articles() -> List[Dict]:
     ]
 
 
-# ─── Public API ───────────────────────────────────────────────
+@dataclass
+class _FeedState:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    articles: List[Dict] = field(default_factory=list)
+    fetched_at: Optional[float] = None  # last 200 or 304
+    error: Optional[str] = None
+
+
+class NewsCache:
+    """
+    Classified articles from ``NEWS_FEEDS``, refreshed in the background.
+
+    All feeds are fetched concurrently with a per-request timeout, using
+    ETag / Last-Modified conditional requests, so an unchanged feed costs a
+    304 and a slow or failing one only delays (and ages) itself. A feed that
+    fails keeps serving its last good articles.
+    """
+
+    def __init__(self, feeds: List[Dict], timeout: float) -> None:
+        self._feeds = feeds
+        self._timeout = timeout
+        self._state = {feed["url"]: _FeedState() for feed in feeds}
+        self._articles: List[Dict] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Fetch every feed once; returns whether any feed had new content."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        try:
+            import feedparser
+        except ImportError:
+            logger.warning("feedparser not installed. Using fallback articles.")
+            feedparser = None
+
+        changed = False
+        if feedparser is not None:
+            with ThreadPoolExecutor(max_workers=len(self._feeds)) as pool:
+                changed = any(list(pool.map(lambda feed: self._fetch_feed(feed, feedparser), self._feeds)))
+        articles = [a for feed in self._feeds for a in self._state[feed["url"]].articles]
+        self._articles = articles or _create_fallback_articles()
+        self._loaded = True
+        return changed
+
+    def _fetch_feed(self, feed_info: Dict, feedparser) -> bool:
+        state = self._state[feed_info["url"]]
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        try:
+            response = requests.get(feed_info["url"], headers=headers, timeout=self._timeout)
+            if response.status_code == 304:
+                state.fetched_at = time.time()
+                state.error = None
+                return False
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
+            known = {article["id"]: article for article in state.articles}
+            state.articles = [
+                _entry_to_article(entry, feed_info["name"], known) for entry in feed.entries[:10]
+            ]
+            state.etag = response.headers.get("ETag")
+            state.last_modified = response.headers.get("Last-Modified")
+            state.fetched_at = time.time()
+            state.error = None
+            return True
+        except Exception as e:
+            state.error = str(e)
+            logger.warning(f"Failed to fetch {feed_info['name']}: {e}")
+            return False
+
+    def articles(self) -> List[Dict]:
+        if not self._loaded:
+            # Cold start: wait for (or do) the first fetch, not a second one
+            with self._lock:
+                if not self._loaded:
+                    self._refresh_locked()
+        return self._articles
+
+    def freshness(self) -> Dict:
+        """
+        How old the news is, going by the feed refreshed least recently, so
+        a feed that keeps failing makes the whole cache stale.
+        """
+        fetched = [state.fetched_at for state in self._state.values()]
+        oldest = None if None in fetched else min(fetched, default=None)
+        age = int(time.time() - oldest) if oldest is not None else None
+        return {
+            "updated_at": (
+                datetime.fromtimestamp(oldest, tz=timezone.utc).isoformat()
+                if oldest is not None else None
+            ),
+            "age_seconds": age,
+            "stale": age is None or age > settings.news_stale_seconds,
+        }
+
+    def stats(self) -> Dict:
+        now = time.time()
+        feeds = {}
+        for feed in self._feeds:
+            state = self._state[feed["url"]]
+            feeds[feed["name"]] = {
+                "age_seconds": int(now - state.fetched_at) if state.fetched_at is not None else None,
+                "error": state.error,
+            }
+        return {"loaded": self._loaded, "articles": len(self._articles), "feeds": feeds}
+
+
+news_cache = NewsCache(NEWS_FEEDS, timeout=settings.news_feed_timeout_seconds)
+
 
 def get_news_articles() -> List[Dict]:
-    """Get classified, sentiment-scored news articles."""
-    return _fetch_rss_articles()
+    """Get classified, sentiment-scored news articles from the cache."""
+    return news_cache.articles()
 
 
 def get_news_sentiment() -> Dict:
-    """Get aggregated sentiment statistics."""
-    articles = _fetch_rss_articles()
+    """Get aggregated sentiment statistics and how fresh they are."""
+    articles = news_cache.articles()
+    freshness = news_cache.freshness()
     if not articles:
-        return {"average": 0.0, "total_articles": 0}
+        return {"average": 0.0, "total_articles": 0, **freshness}
 
     scores = [a["sentiment_score"] for a in articles]
     return {
         "average": round(sum(scores) / len(scores), 2),
         "total_articles": len(articles),
+        **freshness,
     }
@@ -1,60 +1,81 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any
+
 import requests
 
+from ..clients.http_client import get_async_client
 from ..config import settings
 from ..models import Coordinates, LineString, Route, TransportationMode
 from ..utils import to_coordinates
+from .local_router import get_local_graph, local_routes
+from .route_cache import route_cache, route_cache_key
 
 
 class OsrmError(RuntimeError):
     pass
 
 
-def generate_routes(
-    origin: Coordinates,
-    destination: Coordinates,
-    mode: TransportationMode = TransportationMode.WALK,
-    alternatives: int | None = None,
-) -> list[Route]:
-    """
-    Generate routes using OSRM routing engine.
-    
-    Args:
-        origin: Starting coordinates
-        destination: Destination coordinates  
-        mode: Transportation mode (foot, bike, car)
-        alternatives: Number of alternative routes (defaults to config)
-        
-    Returns:
-        List of Route objects
-    """
+def _resolve_profile(mode: TransportationMode) -> str:
     # Map TransportationMode to OSRM profile
     # Note: OSRM public demo only supports foot/car/bike
     # BUS mode will be handled separately
     if mode == TransportationMode.BUS:
         mode = TransportationMode.WALK  # Fallback to walking for now
-    
-    mode_profile = mode.value  # "foot", "bike", or "car"
-    
+
+    return mode.value  # "foot", "bike", or "car"
+
+
+def _resolve_alternatives(alternatives: int | None) -> int:
+    max_alts = settings.max_route_alternatives
+    if alternatives is not None:
+        max_alts = max(0, min(int(alternatives), settings.max_route_alternatives))
+    return max_alts
+
+
+def _try_local(
+    origin: Coordinates,
+    destination: Coordinates,
+    profile: str,
+    max_alts: int,
+    hour: int | None = None,
+) -> list[Route] | None:
+    """Routes from the local graph backend, or None to use OSRM instead."""
+    if settings.routing_backend != "local" or profile != TransportationMode.WALK.value:
+        return None
+    graph = get_local_graph()
+    if graph is None:
+        return None
+    routes = local_routes(graph, origin, destination, max_alts, hour)
+    if routes is None:
+        return None
+    if not routes:
+        raise OsrmError("No routes available")
+    return routes
+
+
+def _build_request(
+    origin: Coordinates,
+    destination: Coordinates,
+    mode_profile: str,
+    max_alts: int,
+) -> tuple[str, dict[str, Any]]:
     base = settings.osrm_base_url.rstrip("/")
     url = (
         f"{base}/route/v1/{mode_profile}/"
         f"{origin.longitude},{origin.latitude};"
         f"{destination.longitude},{destination.latitude}"
     )
-    max_alts = settings.max_route_alternatives
-    if alternatives is not None:
-        max_alts = max(0, min(int(alternatives), settings.max_route_alternatives))
-
     params = {
         "alternatives": max_alts,
         "steps": "true",
         "geometries": "geojson",
     }
-    response = requests.get(url, params=params, timeout=10)
-    response.raise_for_status()
-    payload = response.json()
+    return url, params
+
+
+def _parse_routes(payload: dict[str, Any]) -> list[Route]:
     if payload.get("code") != "Ok":
         raise OsrmError(payload.get("message", "OSRM failed"))
 
@@ -80,3 +101,80 @@ def generate_routes(
     if not routes:
         raise OsrmError("No routes available")
     return routes
+
+
+def generate_routes(
+    origin: Coordinates,
+    destination: Coordinates,
+    mode: TransportationMode = TransportationMode.WALK,
+    alternatives: int | None = None,
+    use_cache: bool = True,
+    hour: int | None = None,
+) -> list[Route]:
+    """
+    Generate routes using OSRM routing engine, or the compiled local graph
+    for walking routes when ``ROUTING_BACKEND=local``.
+
+    Args:
+        origin: Starting coordinates
+        destination: Destination coordinates
+        mode: Transportation mode (foot, bike, car)
+        alternatives: Number of alternative routes (defaults to config)
+        use_cache: Read through the route cache (writes happen either way)
+        hour: Hour of the trip; picks the local graph's safety layer
+
+    Returns:
+        List of Route objects
+    """
+    profile = _resolve_profile(mode)
+    max_alts = _resolve_alternatives(alternatives)
+    routes = _try_local(origin, destination, profile, max_alts, hour)
+    if routes is not None:
+        return routes
+
+    key = route_cache_key(origin, destination, profile, max_alts)
+    if use_cache and settings.route_cache_enabled:
+        cached = route_cache.get(key)
+        if cached:
+            return cached
+
+    url, params = _build_request(origin, destination, profile, max_alts)
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    routes = _parse_routes(response.json())
+
+    if settings.route_cache_enabled:
+        route_cache.put(key, routes)
+    return routes
+
+
+async def generate_routes_async(
+    origin: Coordinates,
+    destination: Coordinates,
+    mode: TransportationMode = TransportationMode.WALK,
+    alternatives: int | None = None,
+    use_cache: bool = True,
+    hour: int | None = None,
+) -> list[Route]:
+    """Non-blocking variant of ``generate_routes`` using the shared httpx client."""
+    profile = _resolve_profile(mode)
+    max_alts = _resolve_alternatives(alternatives)
+    if settings.routing_backend == "local":
+        routes = await asyncio.to_thread(_try_local, origin, destination, profile, max_alts, hour)
+        if routes is not None:
+            return routes
+
+    key = route_cache_key(origin, destination, profile, max_alts)
+    if use_cache and settings.route_cache_enabled:
+        cached = await route_cache.get_async(key)
+        if cached:
+            return cached
+
+    url, params = _build_request(origin, destination, profile, max_alts)
+    response = await get_async_client().get(url, params=params)
+    response.raise_for_status()
+    routes = _parse_routes(response.json())
+
+    if settings.route_cache_enabled:
+        await route_cache.put_async(key, routes)
+    return routes
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Iterable
 
-from ..db import get_conn
+from ..config import settings
+from ..db import PREPARE_HOT_QUERIES, get_async_conn, get_conn
 from ..models import Coordinates, Incident, LineString
 from ..utils import linestring_to_wkt, normalize_incident_type
+from .incident_index import incident_index
 
 
 def is_within_campus(point: Coordinates) -> bool:
@@ -27,8 +30,11 @@ def is_within_campus(point: Coordinates) -> bool:
 
 def fetch_incidents(route: LineString, radius_m: int, days_back: int) -> list[Incident]:
 
-    wkt = linestring_to_wkt(route)
     cutoff = datetime.utcnow() - timedelta(days=days_back)
+    if _incident_index_ready():
+        return incident_index.query(route, radius_m, since=cutoff)
+
+    wkt = linestring_to_wkt(route)
 
     query = """
         WITH route AS (
@@ -89,6 +95,7 @@ def fetch_incidents(route: LineString, radius_m: int, days_back: int) -> list[In
                         cutoff,
                         radius_m,
                     ),
+                    prepare=PREPARE_HOT_QUERIES,
                 )
                 rows = cur.fetchall()
                 
@@ -127,7 +134,7 @@ def fetch_traffic_stop_count(route: LineString, radius_m: int, days_back: int) -
 
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(query, (wkt, cutoff, radius_m))
+            cur.execute(query, (wkt, cutoff, radius_m), prepare=PREPARE_HOT_QUERIES)
             return int(cur.fetchone()[0])
 
 
@@ -142,15 +149,199 @@ def fetch_emergency_phones(route: LineString, radius_m: int) -> list[Coordinates
                ST_X(location_geo::geometry) AS lon
         FROM safety_assets, route
         WHERE location_geo IS NOT NULL
-          AND asset_type ILIKE 'Emergency Phone%'
+          AND asset_type ILIKE 'Emergency Phone%%'
           AND ST_DWithin(location_geo, route.geom, %s)
     """
 
     phones: list[Coordinates] = []
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute(query, (wkt, radius_m))
+            cur.execute(query, (wkt, radius_m), prepare=PREPARE_HOT_QUERIES)
             for row in cur.fetchall():
                 lat, lon = row
                 phones.append(Coordinates(latitude=lat, longitude=lon))
     return phones
+
+
+@dataclass
+class RouteSafetyData:
+    incidents: list[Incident] = field(default_factory=list)
+    traffic_stops: int = 0
+    emergency_phones: list[Coordinates] = field(default_factory=list)
+
+
+# One statement for every candidate route. The WKT strings arrive as a single
+# text[] parameter, so each geometry is parsed once and the rows coming back
+# are tagged with the 1-based ordinal of the route they belong to.
+_ROUTES_CTE = """
+    WITH routes AS (
+        SELECT r.ord::int AS route_idx,
+               ST_GeogFromText(r.wkt) AS geom
+        FROM unnest(%(wkts)s::text[]) WITH ORDINALITY AS r(wkt, ord)
+    )
+"""
+
+_INCIDENT_ROWS = """
+    SELECT routes.route_idx, 'incident' AS kind,
+           c.id::text, c.incident_type, c.date_occurred, c.location_name,
+           ST_Y(c.location_geo::geometry), ST_X(c.location_geo::geometry),
+           NULL::bigint
+    FROM routes
+    JOIN crime_incidents c
+      ON ST_DWithin(c.location_geo, routes.geom, %(radius_m)s)
+    WHERE c.date_occurred IS NOT NULL
+      AND c.date_occurred >= %(incident_cutoff)s
+    UNION ALL
+    SELECT routes.route_idx, 'incident',
+           p.offense_id::text, p.nibrs_description, p.report_date, p.nibrs_description,
+           ST_Y(p.location_geo::geometry), ST_X(p.location_geo::geometry),
+           NULL
+    FROM routes
+    JOIN cpd_incidents p
+      ON ST_DWithin(p.location_geo, routes.geom, %(radius_m)s)
+    WHERE p.report_date IS NOT NULL
+      AND p.report_date >= %(incident_cutoff)s
+    UNION ALL
+    SELECT routes.route_idx, 'incident',
+           pc.incident_number::text, pc.incident_type, pc.call_time, pc.description,
+           ST_Y(pc.location_geo::geometry), ST_X(pc.location_geo::geometry),
+           NULL
+    FROM routes
+    JOIN police_calls pc
+      ON ST_DWithin(pc.location_geo, routes.geom, %(radius_m)s)
+    WHERE pc.call_time >= %(incident_cutoff)s
+    UNION ALL
+"""
+
+_TRAFFIC_AND_PHONE_ROWS = """
+    SELECT routes.route_idx, 'traffic' AS kind,
+           NULL::text, NULL::text, NULL::timestamp, NULL::text, NULL::float8, NULL::float8,
+           COUNT(t.id)
+    FROM routes
+    LEFT JOIN traffic_stops t
+      ON t.stop_date >= %(traffic_cutoff)s
+     AND ST_DWithin(t.location_geo, routes.geom, %(radius_m)s)
+    GROUP BY routes.route_idx
+    UNION ALL
+    SELECT routes.route_idx, 'phone',
+           NULL, NULL, NULL, NULL,
+           ST_Y(s.location_geo::geometry), ST_X(s.location_geo::geometry),
+           NULL
+    FROM routes
+    JOIN safety_assets s
+      ON ST_DWithin(s.location_geo, routes.geom, %(phone_radius_m)s)
+    WHERE s.asset_type ILIKE 'Emergency Phone%%'
+"""
+
+_ROUTE_SAFETY_BATCH_QUERY = _ROUTES_CTE + _INCIDENT_ROWS + _TRAFFIC_AND_PHONE_ROWS
+
+# Used while the in-memory incident index is loaded; incidents come from it.
+_ROUTE_SAFETY_BATCH_QUERY_NO_INCIDENTS = _ROUTES_CTE + _TRAFFIC_AND_PHONE_ROWS
+
+
+def _route_safety_params(
+    routes: list[LineString],
+    radius_m: int,
+    phone_radius_m: int,
+    days_back: int,
+    traffic_days_back: int,
+) -> dict:
+    now = datetime.utcnow()
+    return {
+        "wkts": [linestring_to_wkt(route) for route in routes],
+        "radius_m": radius_m,
+        "phone_radius_m": phone_radius_m,
+        "incident_cutoff": now - timedelta(days=days_back),
+        "traffic_cutoff": now - timedelta(days=traffic_days_back),
+    }
+
+
+def _incident_index_ready() -> bool:
+    return settings.incident_index_enabled and incident_index.ready
+
+
+def _fill_incidents_from_index(
+    results: list[RouteSafetyData],
+    routes: list[LineString],
+    radius_m: int,
+    cutoff: datetime,
+) -> None:
+    for data, route in zip(results, routes):
+        data.incidents = incident_index.query(route, radius_m, since=cutoff)
+
+
+def _group_route_safety_rows(rows: Iterable[tuple], route_count: int) -> list[RouteSafetyData]:
+    results = [RouteSafetyData() for _ in range(route_count)]
+    for row in rows:
+        route_idx, kind, incident_id, incident_type, date, description, lat, lon, count = row
+        data = results[route_idx - 1]
+        if kind == "incident":
+            data.incidents.append(
+                Incident(
+                    id=str(incident_id),
+                    type=normalize_incident_type(incident_type),
+                    location=Coordinates(latitude=lat, longitude=lon),
+                    date=date,
+                    description=description or "",
+                    severity="medium",
+                )
+            )
+        elif kind == "traffic":
+            data.traffic_stops = int(count or 0)
+        elif kind == "phone":
+            data.emergency_phones.append(Coordinates(latitude=lat, longitude=lon))
+    return results
+
+
+def fetch_route_safety_batch(
+    routes: list[LineString],
+    radius_m: int,
+    phone_radius_m: int,
+    days_back: int,
+    traffic_days_back: int,
+) -> list[RouteSafetyData]:
+    """
+    Fetch incidents, traffic-stop counts and emergency phones for every route
+    in a single statement on a single connection.
+
+    Results are returned in the same order as ``routes`` and carry the same
+    values the per-route ``fetch_*`` helpers would return.
+    """
+    if not routes:
+        return []
+
+    params = _route_safety_params(routes, radius_m, phone_radius_m, days_back, traffic_days_back)
+    use_index = _incident_index_ready()
+    query = _ROUTE_SAFETY_BATCH_QUERY_NO_INCIDENTS if use_index else _ROUTE_SAFETY_BATCH_QUERY
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params, prepare=PREPARE_HOT_QUERIES)
+            rows = cur.fetchall()
+    results = _group_route_safety_rows(rows, len(routes))
+    if use_index:
+        _fill_incidents_from_index(results, routes, radius_m, params["incident_cutoff"])
+    return results
+
+
+async def fetch_route_safety_batch_async(
+    routes: list[LineString],
+    radius_m: int,
+    phone_radius_m: int,
+    days_back: int,
+    traffic_days_back: int,
+) -> list[RouteSafetyData]:
+    """Async variant of ``fetch_route_safety_batch`` on a pooled async connection."""
+    if not routes:
+        return []
+
+    params = _route_safety_params(routes, radius_m, phone_radius_m, days_back, traffic_days_back)
+    use_index = _incident_index_ready()
+    query = _ROUTE_SAFETY_BATCH_QUERY_NO_INCIDENTS if use_index else _ROUTE_SAFETY_BATCH_QUERY
+    async with get_async_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, params, prepare=PREPARE_HOT_QUERIES)
+            rows = await cur.fetchall()
+    results = _group_route_safety_rows(rows, len(routes))
+    if use_index:
+        _fill_incidents_from_index(results, routes, radius_m, params["incident_cutoff"])
+    return results
@@ -11,36 +11,51 @@ class RankedInput:
     analysis: SafetyAnalysis
 
 
+PRIORITIES = ("safety", "speed", "balanced")
+
+
 def rank_routes(
     routes: list[Route],
     analyses: list[SafetyAnalysis],
     priority: str,
     current_hour: int,
 ) -> list[int]:
-    pairs = list(zip(routes, analyses, strict=True))
+    if len(routes) != len(analyses):
+        raise ValueError("routes and analyses must have the same length")
 
     if current_hour >= 22 or current_hour < 6:
         if priority != "speed":
             priority = "safety"
 
+    indices = range(len(routes))
     if priority == "safety":
-        ordered = sorted(pairs, key=lambda pair: pair[1].risk_score)
-    elif priority == "speed":
-        ordered = sorted(pairs, key=lambda pair: pair[0].duration_seconds)
-    else:
-        risks = [pair[1].risk_score for pair in pairs]
-        durations = [pair[0].duration_seconds for pair in pairs]
-        max_risk = max(risks) or 1
-        max_duration = max(durations) or 1
-
-        def score(pair):
-            normalized_risk = pair[1].risk_score / max_risk
-            normalized_duration = pair[0].duration_seconds / max_duration
-            return (normalized_risk * 0.6) + (normalized_duration * 0.4)
-
-        ordered = sorted(pairs, key=score)
-
-    return [routes.index(pair[0]) for pair in ordered]
+        return sorted(indices, key=lambda i: analyses[i].risk_score)
+    if priority == "speed":
+        return sorted(indices, key=lambda i: routes[i].duration_seconds)
+
+    risks = [analysis.risk_score for analysis in analyses]
+    durations = [route.duration_seconds for route in routes]
+    max_risk = max(risks) or 1
+    max_duration = max(durations) or 1
+
+    def score(i):
+        normalized_risk = risks[i] / max_risk
+        normalized_duration = durations[i] / max_duration
+        return (normalized_risk * 0.6) + (normalized_duration * 0.4)
+
+    return sorted(indices, key=score)
+
+
+def rank_routes_all(
+    routes: list[Route],
+    analyses: list[SafetyAnalysis],
+    current_hour: int,
+) -> dict[str, list[int]]:
+    """Rank one set of analysed routes under every priority."""
+    return {
+        priority: rank_routes(routes, analyses, priority, current_hour)
+        for priority in PRIORITIES
+    }
 
 
 def build_ranked_routes(
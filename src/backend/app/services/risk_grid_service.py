@@ -6,9 +6,16 @@ based on crime data, severity weights, and time-of-day distribution.
 """
 
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List
 
+import numpy as np
+
+from ..config import settings
+
 logger = logging.getLogger(__name__)
 
 # Campus bounds (Columbia, MO)
@@ -36,58 +43,54 @@ def _fetch_incidents_from_db() -> List[Dict]:
     """Fetch all incidents from all crime tables."""
     try:
         from ..db import get_conn
-        conn = get_conn()
-        cur = conn.cursor()
-
-        # Union across all crime tables
-        cur.execute("""
-            SELECT lat, lon, severity, hour FROM (
-                SELECT
-                    ST_Y(location_geo::geometry) as lat,
-                    ST_X(location_geo::geometry) as lon,
-                    CASE
-                        WHEN incident_type ILIKE '%%assault%%' OR incident_type ILIKE '%%robbery%%' THEN 'high'
-                        WHEN incident_type ILIKE '%%theft%%' OR incident_type ILIKE '%%burglary%%' THEN 'medium'
-                        ELSE 'low'
-                    END as severity,
-                    EXTRACT(HOUR FROM date_occurred) as hour
-                FROM crime_incidents
-                WHERE location_geo IS NOT NULL
-
-                UNION ALL
-
-                SELECT
-                    ST_Y(location_geo::geometry) as lat,
-                    ST_X(location_geo::geometry) as lon,
-                    CASE
-                        WHEN nibrs_description ILIKE '%%assault%%' OR nibrs_description ILIKE '%%robbery%%' THEN 'high'
-                        WHEN nibrs_description ILIKE '%%theft%%' OR nibrs_description ILIKE '%%larceny%%' THEN 'medium'
-                        ELSE 'low'
-                    END as severity,
-                    EXTRACT(HOUR FROM report_date) as hour
-                FROM cpd_incidents
-                WHERE location_geo IS NOT NULL
-
-                UNION ALL
-
-                SELECT
-                    ST_Y(location_geo::geometry) as lat,
-                    ST_X(location_geo::geometry) as lon,
-                    'low' as severity,
-                    EXTRACT(HOUR FROM call_time) as hour
-                FROM police_calls
-                WHERE location_geo IS NOT NULL
-            ) AS all_incidents
-        """)
-
-        incidents = []
-        for row in cur.fetchall():
-            incidents.append({
-                "lat": row[0], "lon": row[1],
-                "severity": row[2], "hour": int(row[3]) if row[3] is not None else 12,
-            })
-        cur.close()
-        conn.close()
+        with get_conn() as conn, conn.cursor() as cur:
+            # Union across all crime tables
+            cur.execute("""
+                SELECT lat, lon, severity, hour FROM (
+                    SELECT
+                        ST_Y(location_geo::geometry) as lat,
+                        ST_X(location_geo::geometry) as lon,
+                        CASE
+                            WHEN incident_type ILIKE '%%assault%%' OR incident_type ILIKE '%%robbery%%' THEN 'high'
+                            WHEN incident_type ILIKE '%%theft%%' OR incident_type ILIKE '%%burglary%%' THEN 'medium'
+                            ELSE 'low'
+                        END as severity,
+                        EXTRACT(HOUR FROM date_occurred) as hour
+                    FROM crime_incidents
+                    WHERE location_geo IS NOT NULL
+
+                    UNION ALL
+
+                    SELECT
+                        ST_Y(location_geo::geometry) as lat,
+                        ST_X(location_geo::geometry) as lon,
+                        CASE
+                            WHEN nibrs_description ILIKE '%%assault%%' OR nibrs_description ILIKE '%%robbery%%' THEN 'high'
+                            WHEN nibrs_description ILIKE '%%theft%%' OR nibrs_description ILIKE '%%larceny%%' THEN 'medium'
+                            ELSE 'low'
+                        END as severity,
+                        EXTRACT(HOUR FROM report_date) as hour
+                    FROM cpd_incidents
+                    WHERE location_geo IS NOT NULL
+
+                    UNION ALL
+
+                    SELECT
+                        ST_Y(location_geo::geometry) as lat,
+                        ST_X(location_geo::geometry) as lon,
+                        'low' as severity,
+                        EXTRACT(HOUR FROM call_time) as hour
+                    FROM police_calls
+                    WHERE location_geo IS NOT NULL
+                ) AS all_incidents
+            """)
+
+            incidents = []
+            for row in cur.fetchall():
+                incidents.append({
+                    "lat": row[0], "lon": row[1],
+                    "severity": row[2], "hour": int(row[3]) if row[3] is not None else 12,
+                })
         return incidents
     except Exception as e:
         logger.warning(f"DB incident fetch for risk grid failed: {e}")
@@ -114,6 +117,113 @@ FALLBACK_INCIDENTS = [
 ]
 
 
+def _cell_edges(lo: float, hi: float) -> np.ndarray:
+    # Same float accumulation the original per-cell loop used, so cell
+    # boundaries (and therefore bin membership) are unchanged.
+    edges = []
+    value = lo
+    while value < hi:
+        edges.append(value)
+        value += GRID_SIZE
+    edges.append(value)
+    return np.array(edges)
+
+
+def _hour_boost(hours: np.ndarray) -> np.ndarray:
+    """(len(hours), 24) temporal boost of an incident hour for each query hour."""
+    diff = np.abs(np.arange(24)[None, :] - np.asarray(hours)[:, None])
+    diff = np.where(diff > 12, 24 - diff, diff)
+    return 1.0 + (diff <= 3)
+
+
+@dataclass(frozen=True)
+class RiskCube:
+    """Severity-weighted incident sums binned by hour and grid cell."""
+
+    lat_edges: np.ndarray
+    lon_edges: np.ndarray
+    by_incident_hour: np.ndarray  # (24 incident hours, lat cells, lon cells)
+    cube: np.ndarray  # (24 query hours, lat cells, lon cells)
+    source_version: int
+    built_at: float
+
+    def scores_for_hour(self, hour: int) -> np.ndarray:
+        if 0 <= hour < 24:
+            return self.cube[hour]
+        return np.tensordot(_hour_boost([hour])[0], self.by_incident_hour, axes=1)
+
+
+def build_risk_cube(incidents: List[Dict], source_version: int = 0) -> RiskCube:
+    """Bin incidents into a 24-hour risk cube with vectorized histogramming."""
+    lat_edges = _cell_edges(MIN_LAT, MAX_LAT)
+    lon_edges = _cell_edges(MIN_LON, MAX_LON)
+    n_lat, n_lon = len(lat_edges) - 1, len(lon_edges) - 1
+
+    lat = np.array([inc["lat"] for inc in incidents], dtype=np.float64)
+    lon = np.array([inc["lon"] for inc in incidents], dtype=np.float64)
+    hour = np.array([inc["hour"] for inc in incidents], dtype=np.int64) % 24
+    weight = np.array(
+        [SEVERITY_WEIGHTS.get(inc["severity"], 1.0) for inc in incidents], dtype=np.float64
+    )
+
+    # Half-open cells [edge, edge + GRID_SIZE); anything outside is dropped
+    lat_idx = np.searchsorted(lat_edges, lat, side="right") - 1
+    lon_idx = np.searchsorted(lon_edges, lon, side="right") - 1
+    inside = (lat_idx >= 0) & (lat_idx < n_lat) & (lon_idx >= 0) & (lon_idx < n_lon)
+
+    flat = (hour[inside] * n_lat + lat_idx[inside]) * n_lon + lon_idx[inside]
+    by_incident_hour = np.bincount(
+        flat, weights=weight[inside], minlength=24 * n_lat * n_lon
+    ).reshape(24, n_lat, n_lon)
+
+    # cube[h] = sum over incident hours of boost(h, incident hour) * sums
+    cube = np.tensordot(_hour_boost(np.arange(24)), by_incident_hour, axes=1)
+
+    return RiskCube(
+        lat_edges=lat_edges,
+        lon_edges=lon_edges,
+        by_incident_hour=by_incident_hour,
+        cube=cube,
+        source_version=source_version,
+        built_at=time.monotonic(),
+    )
+
+
+_cube: RiskCube | None = None
+_cube_lock = threading.Lock()
+
+
+def _data_version() -> int:
+    # The incident index bumps its version on every load/refresh that adds
+    # rows; use that as the signal to rebuild.
+    from .incident_index import incident_index
+    return incident_index.version
+
+
+def get_risk_cube() -> RiskCube:
+    """Cached risk cube, rebuilt when incident data changes or the TTL lapses."""
+    global _cube
+    version = _data_version()
+
+    def _fresh(cube):
+        return (
+            cube is not None
+            and cube.source_version == version
+            and time.monotonic() - cube.built_at < settings.risk_grid_ttl_seconds
+        )
+
+    if _fresh(_cube):
+        return _cube
+    with _cube_lock:
+        if _fresh(_cube):
+            return _cube
+        incidents = _fetch_incidents_from_db()
+        if not incidents:
+            incidents = FALLBACK_INCIDENTS
+        _cube = build_risk_cube(incidents, source_version=version)
+        return _cube
+
+
 def generate_risk_grid(hour: int = None) -> Dict:
     """
     Generate a GeoJSON FeatureCollection of risk cells.
@@ -127,47 +237,31 @@ def generate_risk_grid(hour: int = None) -> Dict:
     if hour is None:
         hour = datetime.now().hour
 
-    incidents = _fetch_incidents_from_db()
-    if not incidents:
-        incidents = FALLBACK_INCIDENTS
-
+    cube = get_risk_cube()
+    scores = cube.scores_for_hour(hour)
     hour_mult = HOUR_RISK_MULTIPLIER.get(hour, 1.0)
+    max_weight = max(SEVERITY_WEIGHTS.values())
 
-    # Generate grid cells
+    # Row-major nonzero keeps the original lat-then-lon feature order
     features = []
-    lat = MIN_LAT
-    while lat < MAX_LAT:
-        lon = MIN_LON
-        while lon < MAX_LON:
-            # Count incidents in this cell
-            cell_score = 0.0
-            for inc in incidents:
-                if lat <= inc["lat"] < lat + GRID_SIZE and lon <= inc["lon"] < lon + GRID_SIZE:
-                    weight = SEVERITY_WEIGHTS.get(inc["severity"], 1.0)
-                    # Boost if incident happened around similar hour
-                    hour_diff = abs(inc["hour"] - hour)
-                    if hour_diff > 12:
-                        hour_diff = 24 - hour_diff
-                    temporal_boost = 1.0 + (1.0 if hour_diff <= 3 else 0.0)
-                    cell_score += weight * temporal_boost
-
-            if cell_score > 0:
-                # Normalize to 0-1 range (cap at 10)
-                normalized = min(cell_score * hour_mult / 10.0, 1.0)
-                features.append({
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [lon + GRID_SIZE / 2, lat + GRID_SIZE / 2],
-                    },
-                    "properties": {
-                        "risk_score": round(normalized, 3),
-                        "incident_count": int(cell_score / max(SEVERITY_WEIGHTS.values())),
-                    },
-                })
-
-            lon += GRID_SIZE
-        lat += GRID_SIZE
+    for i, j in zip(*np.nonzero(scores > 0)):
+        cell_score = float(scores[i, j])
+        # Normalize to 0-1 range (cap at 10)
+        normalized = min(cell_score * hour_mult / 10.0, 1.0)
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [
+                    float(cube.lon_edges[j]) + GRID_SIZE / 2,
+                    float(cube.lat_edges[i]) + GRID_SIZE / 2,
+                ],
+            },
+            "properties": {
+                "risk_score": round(normalized, 3),
+                "incident_count": int(cell_score / max_weight),
+            },
+        })
 
     return {
         "type": "FeatureCollection",
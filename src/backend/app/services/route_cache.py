@@ -0,0 +1,207 @@
+"""
+Two-tier cache for OSRM route alternatives.
+
+Tier 1 is an in-process LRU with TTL; tier 2 is the Postgres ``route_cache``
+table, shared by every worker and surviving restarts. Keys snap origin and
+destination to a metric grid (``ROUTE_CACHE_GRID_M``) and include the OSRM
+profile and alternative count, so nearby requests for the same trip share
+one entry.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import threading
+
+from ..cache import LRUCache
+from ..config import settings
+from ..db import get_conn
+from ..models import Coordinates, LineString, Route
+from ..utils import linestring_to_wkt, to_coordinates
+
+logger = logging.getLogger("campus_dispatch")
+
+_METERS_PER_DEGREE_LAT = 111_320.0
+
+
+def _snap(point: Coordinates, grid_m: float) -> tuple[float, float]:
+    lat_step = grid_m / _METERS_PER_DEGREE_LAT
+    lat = round(point.latitude / lat_step) * lat_step
+    lon_step = grid_m / (_METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    lon = round(point.longitude / lon_step) * lon_step
+    return round(lat, 6), round(lon, 6)
+
+
+def route_cache_key(
+    origin: Coordinates,
+    destination: Coordinates,
+    profile: str,
+    alternatives: int,
+    grid_m: float | None = None,
+) -> tuple[float, float, float, float, str, int]:
+    grid = grid_m if grid_m is not None else settings.route_cache_grid_m
+    origin_lat, origin_lon = _snap(origin, grid)
+    dest_lat, dest_lon = _snap(destination, grid)
+    return origin_lat, origin_lon, dest_lat, dest_lon, profile, alternatives
+
+
+def _memory_key(key: tuple) -> str:
+    return "route:" + ":".join(str(part) for part in key)
+
+
+class RouteCache:
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._memory = LRUCache(max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "db_errors": 0,
+            "purged": 0,
+        }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    # -- lookups -----------------------------------------------------------
+    def get(self, key: tuple) -> list[Route] | None:
+        routes = self._memory.get(_memory_key(key))
+        if routes is not None:
+            self._count("memory_hits")
+            return routes
+
+        routes = self._db_get(key)
+        if routes:
+            self._count("db_hits")
+            self._memory.set(_memory_key(key), routes, self._ttl_seconds)
+            return routes
+
+        self._count("misses")
+        return None
+
+    async def get_async(self, key: tuple) -> list[Route] | None:
+        routes = self._memory.get(_memory_key(key))
+        if routes is not None:
+            self._count("memory_hits")
+            return routes
+        routes = await asyncio.to_thread(self.get, key)
+        return routes
+
+    def put(self, key: tuple, routes: list[Route]) -> None:
+        self._memory.set(_memory_key(key), routes, self._ttl_seconds)
+        self._db_put(key, routes)
+        self._count("stores")
+
+    async def put_async(self, key: tuple, routes: list[Route]) -> None:
+        await asyncio.to_thread(self.put, key, routes)
+
+    # -- persistent tier ---------------------------------------------------
+    def _db_get(self, key: tuple) -> list[Route] | None:
+        origin_lat, origin_lon, dest_lat, dest_lon, profile, alternatives = key
+        try:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT route_index,
+                           ST_AsGeoJSON(route_geometry::geometry),
+                           distance_meters,
+                           duration_seconds
+                    FROM route_cache
+                    WHERE origin_lat = %s::numeric AND origin_lon = %s::numeric
+                      AND dest_lat = %s::numeric AND dest_lon = %s::numeric
+                      AND transportation_mode = %s
+                      AND alternatives = %s
+                      AND expires_at > NOW()
+                    ORDER BY route_index
+                    """,
+                    (origin_lat, origin_lon, dest_lat, dest_lon, profile, alternatives),
+                )
+                rows = cur.fetchall()
+        except Exception as e:
+            self._count("db_errors")
+            logger.warning(f"Route cache lookup failed: {e}")
+            return None
+
+        routes = []
+        for route_index, geojson, distance, duration in rows:
+            geometry = json.loads(geojson) if isinstance(geojson, str) else geojson
+            line = LineString(coordinates=[tuple(p) for p in geometry["coordinates"]])
+            routes.append(
+                Route(
+                    id=f"route_{route_index + 1}",
+                    geometry=line,
+                    distance_meters=float(distance),
+                    duration_seconds=float(duration),
+                    waypoints=[to_coordinates(line.coordinates[0]), to_coordinates(line.coordinates[-1])],
+                )
+            )
+        return routes or None
+
+    def _db_put(self, key: tuple, routes: list[Route]) -> None:
+        origin_lat, origin_lon, dest_lat, dest_lon, profile, alternatives = key
+        try:
+            with get_conn() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """
+                    DELETE FROM route_cache
+                    WHERE origin_lat = %s::numeric AND origin_lon = %s::numeric
+                      AND dest_lat = %s::numeric AND dest_lon = %s::numeric
+                      AND transportation_mode = %s
+                      AND alternatives = %s
+                    """,
+                    (origin_lat, origin_lon, dest_lat, dest_lon, profile, alternatives),
+                )
+                cur.executemany(
+                    """
+                    INSERT INTO route_cache (
+                        origin_lat, origin_lon, dest_lat, dest_lon,
+                        transportation_mode, alternatives, route_index,
+                        route_geometry, distance_meters, duration_seconds, expires_at
+                    )
+                    VALUES (
+                        %s, %s, %s, %s, %s, %s, %s, ST_GeogFromText(%s), %s, %s,
+                        NOW() + make_interval(secs => %s)
+                    )
+                    """,
+                    [
+                        (
+                            origin_lat, origin_lon, dest_lat, dest_lon,
+                            profile, alternatives, index,
+                            linestring_to_wkt(route.geometry),
+                            route.distance_meters, route.duration_seconds, self._ttl_seconds,
+                        )
+                        for index, route in enumerate(routes)
+                    ],
+                )
+        except Exception as e:
+            self._count("db_errors")
+            logger.warning(f"Route cache store failed: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the persistent tier."""
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM route_cache WHERE expires_at <= NOW()")
+            deleted = cur.rowcount or 0
+        self._count("purged", deleted)
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["memory_hits"] + counters["db_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["db_hits"]
+        counters["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        counters["memory_entries"] = len(self._memory)
+        return counters
+
+
+route_cache = RouteCache(
+    max_entries=settings.route_cache_max_entries,
+    ttl_seconds=settings.route_cache_ttl_seconds,
+)
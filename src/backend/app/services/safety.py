@@ -1,36 +1,62 @@
 from __future__ import annotations
 
 from collections import Counter
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+
+import numpy as np
 
 from ..models import Incident, SafetyAnalysis, SafetyTip
 from ..utils import risk_level_label
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US_PER_DAY = 86_400_000_000
+
+MAX_DENSITY = 0.08  # tune as needed
+
+
+def _epoch_us(value: datetime) -> int:
+    # Naive timestamps are treated as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def to_epoch_us(values: Iterable[datetime]) -> np.ndarray:
+    """Integer microseconds since the epoch, so day arithmetic stays exact."""
+    return np.fromiter((_epoch_us(v) for v in values), dtype=np.int64)
+
+
+def temporal_weights(incident_us: np.ndarray, current_us: np.ndarray) -> np.ndarray:
+    """
+    Recency weight of every incident at every evaluation time.
+
+    Returns an array shaped ``current_us.shape + incident_us.shape``. Whole
+    days are floored like ``timedelta.days``: 5 within 30 days, 2 within 90,
+    otherwise 1.
+    """
+    days_ago = (np.asarray(current_us)[..., None] - incident_us) // _US_PER_DAY
+    return np.where(days_ago <= 30, 5.0, np.where(days_ago <= 90, 2.0, 1.0))
+
+
+def night_multipliers(hours: Sequence[int]) -> np.ndarray:
+    hours = np.asarray(hours)
+    return np.where((hours >= 22) | (hours < 6), 2.0, 1.0)
+
 
 def calculate_base_score(incidents: list[Incident]) -> float:
     return len(incidents) * 10
 
 
 def apply_temporal_weight(incidents: list[Incident], current_time: datetime) -> float:
-    from datetime import timezone
-    weighted_score = 0.0
-    for incident in incidents:
-        inc_date = incident.date
-        ct = current_time
-        # Ensure both are timezone-aware (UTC)
-        if ct.tzinfo is None:
-            ct = ct.replace(tzinfo=timezone.utc)
-        if inc_date.tzinfo is None:
-            inc_date = inc_date.replace(tzinfo=timezone.utc)
-        days_ago = (ct - inc_date).days
-        if days_ago <= 30:
-            weight = 5.0
-        elif days_ago <= 90:
-            weight = 2.0
-        else:
-            weight = 1.0
-        weighted_score += 10 * weight
-    return weighted_score
+    if not incidents:
+        return 0.0
+    weights = temporal_weights(
+        to_epoch_us(incident.date for incident in incidents),
+        np.int64(_epoch_us(current_time)),
+    )
+    return float(10 * weights.sum())
 
 
 def apply_time_multiplier(score: float, current_time: datetime) -> float:
@@ -137,6 +163,123 @@ def build_positives(emergency_phones: int, incidents: list[Incident], patrol: st
     return positives
 
 
+def score_routes(
+    incident_us: np.ndarray,
+    route_ids: np.ndarray,
+    route_lengths_m: Sequence[float],
+    emergency_phones: Sequence[int],
+    lighting_quality: Sequence[str],
+    patrol_frequency: Sequence[str],
+    current_times: Sequence[datetime],
+) -> np.ndarray:
+    """
+    Risk scores for every route at every departure time in one pass.
+
+    ``incident_us`` holds the dates of all routes' incidents as epoch
+    microseconds and ``route_ids`` the index of the route each belongs to.
+    Returns a ``(len(current_times), len(route_lengths_m))`` array of the
+    rounded 0-100 scores ``analyze_route_safety`` reports.
+    """
+    route_count = len(route_lengths_m)
+    current_us = to_epoch_us(current_times)
+
+    # (times, incidents) -> (times, routes)
+    weights = 10 * temporal_weights(incident_us, current_us)
+    membership = np.zeros((len(incident_us), route_count))
+    membership[np.arange(len(incident_us)), route_ids] = 1.0
+    weighted = (weights @ membership) * night_multipliers([t.hour for t in current_times])[:, None]
+
+    density = weighted / np.maximum(np.asarray(route_lengths_m, dtype=np.float64), 1)
+    risk = density / MAX_DENSITY * 100
+
+    # Infrastructure as percentage modifiers
+    modifier = np.ones(route_count)
+    modifier[np.asarray(patrol_frequency) == "high"] *= 0.8
+    modifier[np.asarray(emergency_phones) > 0] *= 0.9
+    modifier[np.asarray(lighting_quality) == "poor"] *= 1.15
+
+    return np.round(np.minimum(risk * modifier, 100))
+
+
+def edge_risk_scores(
+    excess_risk_m: Sequence[float],
+    patrol_frequency: Sequence[str],
+    current_time: datetime,
+    full_scale_m: float,
+) -> np.ndarray:
+    """
+    0-100 risk scores from summed SafetyGraph edge risk, for ranking routes
+    on the same scale as ``score_routes``.
+
+    ``excess_risk_m`` is each route's risk-weighted length above a neutral
+    walk (``EdgeRiskScore.excess_risk_m``); ``full_scale_m`` of it scores
+    100. The night and patrol modifiers match ``score_routes``; emergency
+    phones are already in the edge factors (SafetyGraph's asset reduction).
+    """
+    risk = np.maximum(np.asarray(excess_risk_m, dtype=np.float64), 0) / full_scale_m * 100
+    risk = risk * night_multipliers([current_time.hour])[0]
+    risk[np.asarray(patrol_frequency) == "high"] *= 0.8
+    return np.round(np.minimum(risk, 100))
+
+
+def analyze_routes_safety(
+    incidents: Sequence[list[Incident]],
+    emergency_phones: Sequence[int],
+    lighting_quality: Sequence[str],
+    patrol_frequency: Sequence[str],
+    user_mode: str,
+    current_times: Sequence[datetime],
+    route_lengths_m: Sequence[float],
+) -> list[list[SafetyAnalysis]]:
+    """
+    Batched ``analyze_route_safety``: one entry per departure time, each
+    holding one analysis per route in input order.
+    """
+    route_ids = np.repeat(np.arange(len(incidents)), [len(found) for found in incidents])
+    incident_us = to_epoch_us(incident.date for found in incidents for incident in found)
+    scores = score_routes(
+        incident_us,
+        route_ids,
+        route_lengths_m,
+        emergency_phones,
+        lighting_quality,
+        patrol_frequency,
+        current_times,
+    )
+
+    # Everything except the score is independent of the departure time
+    per_route = []
+    for found, phones, lighting, patrol in zip(incidents, emergency_phones, lighting_quality, patrol_frequency):
+        contributing = []
+        if found:
+            contributing.append(f"{len(found)} incidents within radius")
+        if phones:
+            contributing.append(f"{phones} emergency phones nearby")
+        if lighting == "moderate":
+            contributing.append("Lighting data not available; assuming moderate")
+        per_route.append(
+            {
+                "incident_count": len(found),
+                "recent_incidents": found,
+                "emergency_phones": phones,
+                "lighting_quality": lighting,
+                "patrol_frequency": patrol,
+                "actionable_tips": generate_context_aware_tips(found, user_mode),
+                "concerns": build_concerns(found, lighting, patrol),
+                "positives": build_positives(phones, found, patrol),
+                "contributing_factors": contributing,
+            }
+        )
+
+    return [
+        [
+            SafetyAnalysis(risk_score=int(risk), risk_level=risk_level_label(risk), **fields)
+            for risk, fields in zip(row, per_route)
+        ]
+        for row in scores
+    ]
+
+
 def analyze_route_safety(
     incidents: list[Incident],
     emergency_phones: int,
@@ -146,70 +289,12 @@ def analyze_route_safety(
     current_time: datetime,
     route_length_m: float = 1.0,  # must be passed in by caller
 ) -> SafetyAnalysis:
-    # Step 1: Compute weighted incidents
-    from datetime import timezone
-    def compute_weighted_incidents(incidents, time_mult):
-        total = 0.0
-        for i in incidents:
-            ct = current_time
-            inc_date = i.date
-            # Ensure both are timezone-aware (UTC)
-            if ct.tzinfo is None:
-                ct = ct.replace(tzinfo=timezone.utc)
-            if inc_date.tzinfo is None:
-                inc_date = inc_date.replace(tzinfo=timezone.utc)
-            days_ago = (ct - inc_date).days
-            if days_ago <= 30:
-                temporal = 5
-            elif days_ago <= 90:
-                temporal = 2
-            else:
-                temporal = 1
-            total += 10 * temporal * time_mult
-        return total
-
-    hour = current_time.hour
-    is_night = hour >= 22 or hour < 6
-    time_mult = 2 if is_night else 1
-    weighted_incidents = compute_weighted_incidents(incidents, time_mult)
-    # Step 2: Density
-    density = weighted_incidents / max(route_length_m, 1)
-    # Step 3: Normalize
-    MAX_DENSITY = 0.08  # tune as needed
-    normalized = density / MAX_DENSITY
-    risk = normalized * 100
-
-    # Step 4: Infrastructure as percentage modifiers
-    if patrol_frequency == "high":
-        risk *= 0.8
-    if emergency_phones > 0:
-        risk *= 0.9
-    if lighting_quality == "poor":
-        risk *= 1.15
-
-    risk = round(min(risk, 100))
-
-    concerns = build_concerns(incidents, lighting_quality, patrol_frequency)
-    positives = build_positives(emergency_phones, incidents, patrol_frequency)
-
-    contributing = []
-    if incidents:
-        contributing.append(f"{len(incidents)} incidents within radius")
-    if emergency_phones:
-        contributing.append(f"{emergency_phones} emergency phones nearby")
-    if lighting_quality == "moderate":
-        contributing.append("Lighting data not available; assuming moderate")
-
-    return SafetyAnalysis(
-        risk_score=risk,
-        risk_level=risk_level_label(risk),
-        incident_count=len(incidents),
-        recent_incidents=incidents,
-        emergency_phones=emergency_phones,
-        lighting_quality=lighting_quality,
-        patrol_frequency=patrol_frequency,
-        actionable_tips=generate_context_aware_tips(incidents, user_mode),
-        concerns=concerns,
-        positives=positives,
-        contributing_factors=contributing,
-    )
+    return analyze_routes_safety(
+        [incidents],
+        [emergency_phones],
+        [lighting_quality],
+        [patrol_frequency],
+        user_mode,
+        [current_time],
+        [route_length_m],
+    )[0][0]
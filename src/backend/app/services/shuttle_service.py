@@ -34,25 +34,22 @@ def _get_routes_from_db() -> List[Dict]:
     """Load shuttle routes from PostGIS database."""
     try:
         from ..db import get_conn
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT route_id, route_name, color,
-                   ST_AsGeoJSON(geometry)::json as geojson
-            FROM shuttle_routes
-            WHERE is_active = TRUE
-            ORDER BY route_id
-        """)
-        routes = []
-        for row in cur.fetchall():
-            routes.append({
-                "route_id": row[0],
-                "name": row[1],
-                "color": row[2] or "#3b82f6",
-                "geometry": row[3],
-            })
-        cur.close()
-        conn.close()
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT route_id, route_name, color,
+                       ST_AsGeoJSON(geometry)::json as geojson
+                FROM shuttle_routes
+                WHERE is_active = TRUE
+                ORDER BY route_id
+            """)
+            routes = []
+            for row in cur.fetchall():
+                routes.append({
+                    "route_id": row[0],
+                    "name": row[1],
+                    "color": row[2] or "#3b82f6",
+                    "geometry": row[3],
+                })
         return routes
     except Exception as e:
         logger.warning(f"DB route fetch failed: {e}")
@@ -63,25 +60,22 @@ def _get_stops_from_db() -> List[Dict]:
     """Load shuttle stops from PostGIS database."""
     try:
         from ..db import get_conn
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT stop_id, stop_name,
-                   ST_Y(location_geo::geometry) as lat,
-                   ST_X(location_geo::geometry) as lon
-            FROM shuttle_stops
-            ORDER BY stop_name
-        """)
-        stops = []
-        for row in cur.fetchall():
-            stops.append({
-                "stop_id": row[0],
-                "name": row[1],
-                "lat": row[2],
-                "lon": row[3],
-            })
-        cur.close()
-        conn.close()
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT stop_id, stop_name,
+                       ST_Y(location_geo::geometry) as lat,
+                       ST_X(location_geo::geometry) as lon
+                FROM shuttle_stops
+                ORDER BY stop_name
+            """)
+            stops = []
+            for row in cur.fetchall():
+                stops.append({
+                    "stop_id": row[0],
+                    "name": row[1],
+                    "lat": row[2],
+                    "lon": row[3],
+                })
         return stops
     except Exception as e:
         logger.warning(f"DB stops fetch failed: {e}")
@@ -0,0 +1,17 @@
+-- Edge Risk Table
+-- Per-edge risk factors computed by SafetyGraph for the walk network.
+-- The API loads this table into memory and map-matches OSRM routes onto it.
+
+CREATE TABLE IF NOT EXISTS edge_risk (
+    u BIGINT NOT NULL,
+    v BIGINT NOT NULL,
+    key INTEGER NOT NULL DEFAULT 0,
+    length_m DOUBLE PRECISION NOT NULL,
+    risk_factor DOUBLE PRECISION NOT NULL,
+    safety_score DOUBLE PRECISION NOT NULL,
+    geometry GEOGRAPHY(LINESTRING, 4326) NOT NULL,
+    built_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (u, v, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_edge_risk_geometry ON edge_risk USING GIST(geometry);
@@ -0,0 +1,13 @@
+-- Geocode Cache
+-- Persistent cache of Nominatim forward-geocoding results, shared by every
+-- API worker. Rows with NULL coordinates record "no results".
+
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    query_key TEXT PRIMARY KEY,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_geocode_expires ON geocode_cache(expires_at);
@@ -0,0 +1,35 @@
+-- Incident geocoded_at
+-- Incidents are often inserted without coordinates and geocoded later.
+-- SafetyGraph's incremental update folds in rows by the time they gained a
+-- location, so a row geocoded after the last build is not missed.
+
+ALTER TABLE crime_incidents ADD COLUMN IF NOT EXISTS geocoded_at TIMESTAMP;
+ALTER TABLE cpd_incidents ADD COLUMN IF NOT EXISTS geocoded_at TIMESTAMP;
+
+UPDATE crime_incidents SET geocoded_at = created_at WHERE location_geo IS NOT NULL AND geocoded_at IS NULL;
+UPDATE cpd_incidents SET geocoded_at = created_at WHERE location_geo IS NOT NULL AND geocoded_at IS NULL;
+
+-- Stamped once, when a row first gets a location; moving an already
+-- geocoded point keeps its original stamp
+CREATE OR REPLACE FUNCTION set_incident_geocoded_at() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.location_geo IS NOT NULL
+       AND (TG_OP = 'INSERT' OR OLD.location_geo IS NULL) THEN
+        NEW.geocoded_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_crime_geocoded_at ON crime_incidents;
+CREATE TRIGGER trg_crime_geocoded_at
+    BEFORE INSERT OR UPDATE OF location_geo ON crime_incidents
+    FOR EACH ROW EXECUTE FUNCTION set_incident_geocoded_at();
+
+DROP TRIGGER IF EXISTS trg_cpd_geocoded_at ON cpd_incidents;
+CREATE TRIGGER trg_cpd_geocoded_at
+    BEFORE INSERT OR UPDATE OF location_geo ON cpd_incidents
+    FOR EACH ROW EXECUTE FUNCTION set_incident_geocoded_at();
+
+CREATE INDEX IF NOT EXISTS idx_crime_geocoded_at ON crime_incidents(geocoded_at);
+CREATE INDEX IF NOT EXISTS idx_cpd_geocoded_at ON cpd_incidents(geocoded_at);
@@ -0,0 +1,15 @@
+-- Location Trigram Search
+-- Indexes behind the name lookups in services/locations.py, which otherwise
+-- scan campus_locations and campus_buildings on every request.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Exact, case-insensitive match on curated locations
+CREATE INDEX IF NOT EXISTS idx_campus_locations_lower_name
+    ON campus_locations (LOWER(name));
+
+-- ILIKE '%...%' and similarity (%) searches
+CREATE INDEX IF NOT EXISTS idx_campus_locations_name_trgm
+    ON campus_locations USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_campus_buildings_name_trgm
+    ON campus_buildings USING GIN (name gin_trgm_ops);
@@ -0,0 +1,15 @@
+-- Route cache keys
+-- Extends route_cache so the backend can store every OSRM alternative for a
+-- snapped origin/destination pair, per profile and alternative count.
+
+ALTER TABLE route_cache ADD COLUMN IF NOT EXISTS transportation_mode VARCHAR(10) NOT NULL DEFAULT 'foot';
+ALTER TABLE route_cache ADD COLUMN IF NOT EXISTS alternatives INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE route_cache ADD COLUMN IF NOT EXISTS route_index INTEGER NOT NULL DEFAULT 0;
+
+-- OSRM returns fractional distances and durations
+ALTER TABLE route_cache ALTER COLUMN distance_meters TYPE DOUBLE PRECISION;
+ALTER TABLE route_cache ALTER COLUMN duration_seconds TYPE DOUBLE PRECISION;
+
+CREATE INDEX IF NOT EXISTS idx_route_lookup ON route_cache(
+    origin_lat, origin_lon, dest_lat, dest_lon, transportation_mode, alternatives
+);
@@ -24,7 +24,8 @@ CREATE TABLE IF NOT EXISTS crime_incidents (
     date_reported TIMESTAMP,
     disposition VARCHAR(100),
     domestic_violence BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    geocoded_at TIMESTAMP -- When location_geo was first set (trigger below)
 );
 
 -- Index for spatial queries coverage (e.g., "find crimes within 500m")
@@ -58,12 +59,35 @@ CREATE TABLE IF NOT EXISTS cpd_incidents (
     full_address VARCHAR(255),
     location_geo GEOGRAPHY(POINT, 4326),
     case_status VARCHAR(50),
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    geocoded_at TIMESTAMP -- When location_geo was first set (trigger below)
 );
 
 CREATE INDEX IF NOT EXISTS idx_cpd_location ON cpd_incidents USING GIST(location_geo);
 CREATE INDEX IF NOT EXISTS idx_cpd_date ON cpd_incidents(report_date);
 
+-- geocoded_at is SafetyGraph's incremental-update watermark: rows count
+-- from the moment they first get a location, not from insertion
+CREATE OR REPLACE FUNCTION set_incident_geocoded_at() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.location_geo IS NOT NULL
+       AND (TG_OP = 'INSERT' OR OLD.location_geo IS NULL) THEN
+        NEW.geocoded_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_crime_geocoded_at
+    BEFORE INSERT OR UPDATE OF location_geo ON crime_incidents
+    FOR EACH ROW EXECUTE FUNCTION set_incident_geocoded_at();
+CREATE TRIGGER trg_cpd_geocoded_at
+    BEFORE INSERT OR UPDATE OF location_geo ON cpd_incidents
+    FOR EACH ROW EXECUTE FUNCTION set_incident_geocoded_at();
+
+CREATE INDEX IF NOT EXISTS idx_crime_geocoded_at ON crime_incidents(geocoded_at);
+CREATE INDEX IF NOT EXISTS idx_cpd_geocoded_at ON cpd_incidents(geocoded_at);
+
 
 -- 4. Traffic Stops Table (from CPD Data)
 -- Stores vehicle stop data for patrol pattern analysis.
@@ -132,6 +156,10 @@ CREATE TABLE IF NOT EXISTS campus_buildings (
 CREATE INDEX IF NOT EXISTS idx_campus_boundary ON campus_boundary USING GIST(geometry);
 CREATE INDEX IF NOT EXISTS idx_campus_buildings ON campus_buildings USING GIST(geometry);
 
+-- Fuzzy name search (services/locations.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_campus_buildings_name_trgm ON campus_buildings USING GIN (name gin_trgm_ops);
+
 
 -- 9. Safety Assets Table (from MU_Features_new)
 -- Stores locations of Emergency Phones, Accessible Entrances, etc.
@@ -183,12 +211,49 @@ CREATE TABLE IF NOT EXISTS route_cache (
     origin_lon DECIMAL(11, 8) NOT NULL,
     dest_lat DECIMAL(10, 8) NOT NULL,
     dest_lon DECIMAL(11, 8) NOT NULL,
+    transportation_mode VARCHAR(10) NOT NULL DEFAULT 'foot',
+    alternatives INTEGER NOT NULL DEFAULT 0,
+    route_index INTEGER NOT NULL DEFAULT 0,
     route_geometry GEOGRAPHY(LINESTRING, 4326) NOT NULL,
-    distance_meters INTEGER NOT NULL,
-    duration_seconds INTEGER NOT NULL,
+    distance_meters DOUBLE PRECISION NOT NULL,
+    duration_seconds DOUBLE PRECISION NOT NULL,
     created_at TIMESTAMP DEFAULT NOW(),
     expires_at TIMESTAMP NOT NULL
 );
 
 CREATE INDEX IF NOT EXISTS idx_route_origin ON route_cache(origin_lat, origin_lon);
+CREATE INDEX IF NOT EXISTS idx_route_lookup ON route_cache(
+    origin_lat, origin_lon, dest_lat, dest_lon, transportation_mode, alternatives
+);
 CREATE INDEX IF NOT EXISTS idx_route_expires ON route_cache(expires_at);
+
+
+-- 13. Edge Risk Table (written by src/routing/safety_graph.py)
+-- Per-edge risk of the walk network, used to score OSRM route geometries.
+CREATE TABLE IF NOT EXISTS edge_risk (
+    u BIGINT NOT NULL,
+    v BIGINT NOT NULL,
+    key INTEGER NOT NULL DEFAULT 0,
+    length_m DOUBLE PRECISION NOT NULL,
+    risk_factor DOUBLE PRECISION NOT NULL,
+    safety_score DOUBLE PRECISION NOT NULL,
+    geometry GEOGRAPHY(LINESTRING, 4326) NOT NULL,
+    built_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (u, v, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_edge_risk_geometry ON edge_risk USING GIST(geometry);
+
+
+-- 14. Geocode Cache
+-- Nominatim results keyed on the normalized query. Rows with NULL
+-- coordinates record "no results" (negative cache, shorter TTL).
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    query_key TEXT PRIMARY KEY,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_geocode_expires ON geocode_cache(expires_at);
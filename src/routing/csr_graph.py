@@ -0,0 +1,651 @@
+"""
+Compiled CSR form of the campus walk network.
+
+The networkx MultiDiGraph built by SafetyGraph is flattened into NumPy
+arrays: node coordinates, a forward adjacency (indptr/indices) and a reverse
+adjacency for backward searches, plus per-edge ``length`` and
+``safety_score`` weights. Time-of-day safety layers (one float16 row of
+edge weights per ``HOUR_BUCKETS`` entry) let a search pick the weights for
+the hour it is routing for without rebuilding anything. Searches index the
+arrays through memoryviews, which are nearly as fast as Python lists
+without copying anything, so the graph can stay memory-mapped.
+
+On disk the graph is a directory of ``.npy`` files plus ``header.json``
+(format name, version, counts, dtypes and shapes). ``load`` maps the arrays
+read-only, so startup is near-instant and every worker on a host shares one
+copy through the page cache.
+
+Only NumPy is needed at runtime; networkx/osmnx are only used by
+``from_networkx`` when compiling. When SciPy is installed, point snapping
+goes through a KD-tree over the node coordinates, and with pyproj it uses the
+graph's own projection; without them it falls back to a vectorized scan.
+"""
+import heapq
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: brute-force snapping without SciPy
+    cKDTree = None
+
+try:
+    from pyproj import CRS, Transformer
+except ImportError:  # optional: equirectangular snapping without pyproj
+    CRS = Transformer = None
+
+GRAPH_BIN_PATH = "campus_network.csr"
+
+FORMAT_NAME = "campus-csr"
+FORMAT_VERSION = 1
+
+# Arrays persisted per graph, with their on-disk dtypes
+_ARRAYS = {
+    "node_ids": np.int64,
+    "node_lat": np.float64,
+    "node_lon": np.float64,
+    "node_x": np.float64,
+    "node_y": np.float64,
+    "indptr": np.int64,
+    "indices": np.int32,
+    "length": np.float64,
+    "safety": np.float64,
+    "rev_indptr": np.int64,
+    "rev_indices": np.int32,
+    "rev_edges": np.int64,
+}
+
+# Optional arrays; graphs compiled before they existed simply lack them
+_OPTIONAL_ARRAYS = {
+    "hourly": np.float16,
+}
+
+WEIGHTS = ("length", "safety")
+
+# (name, first hour, end hour, crime multiplier) per time-of-day layer,
+# matching risk_grid_service.HOUR_RISK_MULTIPLIER
+HOUR_BUCKETS = (
+    ("day", 6, 18, 1.0),
+    ("evening", 18, 21, 1.5),
+    ("night", 21, 6, 2.0),
+)
+
+# Local equirectangular projection for graphs without projected coordinates
+_METERS_PER_DEGREE_LAT = 111_320.0
+
+# Points per distance-matrix block when snapping without a KD-tree
+_SNAP_CHUNK = 256
+
+# Length/safety trade-offs swept by pareto_paths, and the cost multiplier
+# applied to already-used edges when the sweep finds too few distinct routes
+_PARETO_LAMBDAS = (0.0, 1.0, 0.5, 0.25, 0.75)
+_PARETO_PENALTY = 1.5
+
+
+class NoPathError(RuntimeError):
+    pass
+
+
+def hour_bucket(hour):
+    """Index into HOUR_BUCKETS for an hour of the day."""
+    hour %= 24
+    for i, (_, start, end, _) in enumerate(HOUR_BUCKETS):
+        if (start <= hour < end) if start < end else (hour >= start or hour < end):
+            return i
+    raise ValueError(f"No hour bucket covers hour {hour}")
+
+
+def hourly_safety(length, risk_factor, asset_factor):
+    """
+    (len(HOUR_BUCKETS), edges) float16 safety weights. The crime part of each
+    edge's risk factor (risk_factor / asset_factor) is scaled by the bucket's
+    multiplier, so edges without nearby crime weigh the same at any hour and
+    the day layer equals the static ``safety_score``.
+    """
+    length = np.asarray(length, dtype=np.float64)
+    asset_factor = np.asarray(asset_factor, dtype=np.float64)
+    penalty = np.asarray(risk_factor, dtype=np.float64) / asset_factor
+    multiplier = np.array([bucket[3] for bucket in HOUR_BUCKETS])[:, None]
+    weights = length * asset_factor * (1.0 + (penalty - 1.0) * multiplier)
+    return np.minimum(weights, np.finfo(np.float16).max).astype(np.float16)
+
+
+class CSRGraph:
+    def __init__(
+        self,
+        node_ids,
+        node_lat,
+        node_lon,
+        node_x,
+        node_y,
+        indptr,
+        indices,
+        length,
+        safety,
+        rev_indptr=None,
+        rev_indices=None,
+        rev_edges=None,
+        hourly=None,
+        header=None,
+    ):
+        # np.asarray keeps memory-mapped arrays mapped when dtypes already match
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.node_lat = np.asarray(node_lat, dtype=np.float64)
+        self.node_lon = np.asarray(node_lon, dtype=np.float64)
+        self.node_x = np.asarray(node_x, dtype=np.float64)
+        self.node_y = np.asarray(node_y, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.length = np.asarray(length, dtype=np.float64)
+        self.safety = np.asarray(safety, dtype=np.float64)
+        if rev_indptr is None:
+            self._build_reverse()
+        else:
+            self.rev_indptr = np.asarray(rev_indptr, dtype=np.int64)
+            self.rev_indices = np.asarray(rev_indices, dtype=np.int32)
+            self.rev_edges = np.asarray(rev_edges, dtype=np.int64)
+        self.hourly = np.asarray(hourly, dtype=np.float16) if hourly is not None else None
+        self.header = header or {}
+        self._views = None
+        self._layer_views = {}
+        self._heuristic_scale = {}
+        self._id_order = None
+        self._snap = None
+
+    # -- construction --------------------------------------------------------
+    @classmethod
+    def from_networkx(cls, graph):
+        """Compile an osmnx MultiDiGraph with ``length``/``safety_score`` edges."""
+        nodes = list(graph.nodes)
+        position = {node: i for i, node in enumerate(nodes)}
+        data = [graph.nodes[node] for node in nodes]
+
+        if all("lat" in d and "lon" in d for d in data):
+            # Projected graph: x/y are metres, original lon/lat kept by osmnx
+            node_lat = [d["lat"] for d in data]
+            node_lon = [d["lon"] for d in data]
+            node_x = [d["x"] for d in data]
+            node_y = [d["y"] for d in data]
+        else:
+            node_lat = [d["y"] for d in data]
+            node_lon = [d["x"] for d in data]
+            node_x, node_y = _local_xy(np.array(node_lat), np.array(node_lon))
+
+        sources, targets, lengths, safeties, risks, assets = [], [], [], [], [], []
+        for u, v, d in graph.edges(data=True):
+            length = float(d.get("length", 1.0))
+            safety = float(d.get("safety_score", length))
+            risk = float(d.get("risk_factor", safety / max(length, 1e-9)))
+            sources.append(position[u])
+            targets.append(position[v])
+            lengths.append(length)
+            safeties.append(safety)
+            risks.append(risk)
+            # Graphs built before asset_factor was stored: a factor below 1
+            # can only come from an asset
+            assets.append(float(d.get("asset_factor", min(risk, 1.0))))
+
+        return cls.from_edges(
+            node_ids=nodes,
+            node_lat=node_lat,
+            node_lon=node_lon,
+            node_x=node_x,
+            node_y=node_y,
+            sources=sources,
+            targets=targets,
+            length=lengths,
+            safety=safeties,
+            hourly=hourly_safety(lengths, risks, assets),
+        )
+
+    @classmethod
+    def from_edges(
+        cls, node_ids, node_lat, node_lon, node_x, node_y, sources, targets, length, safety, hourly=None
+    ):
+        """
+        Build from an edge list given as parallel arrays of node positions.
+        ``hourly`` optionally holds one row of safety weights per hour bucket.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.add.at(indptr, sources + 1, 1)
+        return cls(
+            node_ids=node_ids,
+            node_lat=node_lat,
+            node_lon=node_lon,
+            node_x=node_x,
+            node_y=node_y,
+            indptr=np.cumsum(indptr),
+            indices=np.asarray(targets)[order],
+            length=np.asarray(length, dtype=np.float64)[order],
+            safety=np.asarray(safety, dtype=np.float64)[order],
+            hourly=np.asarray(hourly)[:, order] if hourly is not None else None,
+        )
+
+    def _build_reverse(self):
+        # Reverse CSR over the same edge ids, for the backward search
+        sources = np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        rev_indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.add.at(rev_indptr, self.indices.astype(np.int64) + 1, 1)
+        self.rev_indptr = np.cumsum(rev_indptr)
+        self.rev_indices = sources[order].astype(np.int32)
+        self.rev_edges = order.astype(np.int64)
+
+    @property
+    def node_count(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.indices)
+
+    # -- persistence ---------------------------------------------------------
+    def save(self, path=GRAPH_BIN_PATH, **metadata):
+        """Write ``header.json`` plus one ``.npy`` per array into ``path``."""
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, "header.json")
+        if os.path.exists(header_path):
+            os.remove(header_path)
+
+        arrays = {}
+        names = dict(_ARRAYS)
+        names.update({name: dtype for name, dtype in _OPTIONAL_ARRAYS.items() if getattr(self, name) is not None})
+        for name, dtype in names.items():
+            array = np.ascontiguousarray(getattr(self, name), dtype=dtype)
+            # Replace rather than overwrite: workers still mapping the old
+            # file keep reading the old inode
+            tmp = os.path.join(path, f"{name}.tmp.npy")
+            np.save(tmp, array)
+            os.replace(tmp, os.path.join(path, f"{name}.npy"))
+            arrays[name] = {"dtype": np.dtype(dtype).str, "shape": list(array.shape)}
+
+        header = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "node_count": self.node_count,
+            "edge_count": self.edge_count,
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "hour_buckets": [list(bucket) for bucket in HOUR_BUCKETS] if self.hourly is not None else [],
+            "arrays": arrays,
+            **metadata,
+        }
+        # Header last, so a reader never sees it next to half-written arrays
+        tmp = os.path.join(path, "header.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp, header_path)
+        self.header = header
+
+    @classmethod
+    def load(cls, path=GRAPH_BIN_PATH, mmap=True):
+        """
+        Open a graph written by ``save``. Arrays are memory-mapped read-only
+        unless ``mmap`` is False. Raises ValueError on a format or version
+        mismatch.
+        """
+        with open(os.path.join(path, "header.json")) as f:
+            header = json.load(f)
+        if header.get("format") != FORMAT_NAME or header.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported graph format {header.get('format')} v{header.get('version')} in {path}"
+            )
+
+        arrays = {}
+        names = dict(_ARRAYS)
+        names.update({name: dtype for name, dtype in _OPTIONAL_ARRAYS.items() if name in header["arrays"]})
+        for name, dtype in names.items():
+            array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            spec = header["arrays"][name]
+            if array.dtype != np.dtype(dtype) or list(array.shape) != spec["shape"]:
+                raise ValueError(f"Graph array {name} in {path} does not match its header")
+            arrays[name] = array
+        return cls(header=header, **arrays)
+
+    # -- lookups -------------------------------------------------------------
+    def build_snap_index(self):
+        """
+        Build (once) the projection and spatial index used for snapping.
+
+        Projected graphs with a ``crs`` in their header are snapped in that
+        CRS through a cached pyproj transformer; anything else uses a fixed
+        equirectangular projection around the graph's mean latitude.
+        """
+        if self._snap is not None:
+            return self._snap
+
+        crs = self.header.get("crs")
+        if Transformer is not None and crs and crs != "None" and CRS.from_user_input(crs).is_projected:
+            transformer = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+
+            def project(lat, lon):
+                return transformer.transform(lon, lat)
+
+            points = np.column_stack([self.node_x, self.node_y])
+        else:
+            ref_lat = float(np.mean(self.node_lat)) if self.node_count else 0.0
+            kx = _METERS_PER_DEGREE_LAT * math.cos(math.radians(ref_lat))
+
+            def project(lat, lon):
+                return lon * kx, lat * _METERS_PER_DEGREE_LAT
+
+            points = np.column_stack(project(np.asarray(self.node_lat), np.asarray(self.node_lon)))
+
+        tree = cKDTree(points) if cKDTree is not None and self.node_count else None
+        self._snap = (project, points, tree)
+        return self._snap
+
+    def nearest_nodes(self, lats, lons):
+        """Indices of the nodes closest to each WGS84 point, in one call."""
+        project, points, tree = self.build_snap_index()
+        x, y = project(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        queries = np.column_stack([np.atleast_1d(x), np.atleast_1d(y)])
+        if tree is not None:
+            return tree.query(queries)[1].astype(np.int64)
+
+        result = np.empty(len(queries), dtype=np.int64)
+        for start in range(0, len(queries), _SNAP_CHUNK):
+            block = queries[start:start + _SNAP_CHUNK]
+            d2 = (
+                (block[:, None, 0] - points[None, :, 0]) ** 2
+                + (block[:, None, 1] - points[None, :, 1]) ** 2
+            )
+            result[start:start + len(block)] = np.argmin(d2, axis=1)
+        return result
+
+    def nearest_node(self, lat, lon):
+        """Index of the node closest to a WGS84 point."""
+        return int(self.nearest_nodes([lat], [lon])[0])
+
+    def node_index(self, node_id):
+        """Position of an original (OSM) node id."""
+        if self._id_order is None:
+            self._id_order = np.argsort(self.node_ids, kind="stable")
+        pos = int(np.searchsorted(self.node_ids, node_id, sorter=self._id_order))
+        if pos >= self.node_count or self.node_ids[self._id_order[pos]] != node_id:
+            raise KeyError(node_id)
+        return int(self._id_order[pos])
+
+    def path_coords(self, path):
+        """[(lat, lon), ...] for a node-index path."""
+        return [(float(self.node_lat[i]), float(self.node_lon[i])) for i in path]
+
+    def path_length(self, path, weight="length", hour=None):
+        """Total weight along a node-index path, taking the cheapest parallel edge."""
+        weights = self._weights(weight, hour)
+        total = 0.0
+        for u, v in zip(path, path[1:]):
+            start, end = self.indptr[u], self.indptr[u + 1]
+            mask = self.indices[start:end] == v
+            total += float(weights[start:end][mask].min())
+        return total
+
+    # -- search --------------------------------------------------------------
+    def _weights(self, weight, hour=None):
+        if weight not in WEIGHTS:
+            raise ValueError(f"Unknown weight '{weight}', expected one of {WEIGHTS}")
+        if weight == "length":
+            return self.length
+        if hour is not None and self.hourly is not None:
+            return self.hourly[hour_bucket(hour)]
+        return self.safety
+
+    def risk_factors(self, hour=None):
+        """Per-edge risk factor: safety weight over length."""
+        safety = np.asarray(self._weights("safety", hour), dtype=np.float64)
+        return safety / np.maximum(self.length, 1e-9)
+
+    def _weight_view(self, weight, hour=None):
+        if weight == "safety" and hour is not None and self.hourly is not None:
+            bucket = hour_bucket(hour)
+            view = self._layer_views.get(bucket)
+            if view is None:
+                # memoryview cannot index float16; widen one layer on first use
+                view = memoryview(self.hourly[bucket].astype(np.float64))
+                self._layer_views[bucket] = view
+            return view
+        self._weights(weight)
+        return self._as_views()[weight]
+
+    def _as_views(self):
+        # Indexing a memoryview yields plain Python numbers, close to list
+        # speed in the heapq loops, and never copies a mapped array
+        if self._views is None:
+            self._views = {
+                "indptr": memoryview(self.indptr),
+                "indices": memoryview(self.indices),
+                "rev_indptr": memoryview(self.rev_indptr),
+                "rev_indices": memoryview(self.rev_indices),
+                "rev_edges": memoryview(self.rev_edges),
+                "length": memoryview(self.length),
+                "safety": memoryview(self.safety),
+                "x": memoryview(self.node_x),
+                "y": memoryview(self.node_y),
+            }
+        return self._views
+
+    def shortest_path(self, source, target, weight="safety", method="bidirectional", hour=None):
+        """
+        Node-index path from ``source`` to ``target`` minimising ``weight``.
+
+        ``method`` is "bidirectional" (bidirectional Dijkstra) or "astar"
+        (A* with a straight-line heuristic scaled to stay admissible).
+        With ``hour`` the safety weight comes from that hour's layer, when
+        the graph has them. Raises NoPathError when the target is unreachable.
+        """
+        if source == target:
+            return [source]
+        if method == "astar":
+            return self._astar(source, target, weight, hour)
+        return self._bidirectional_dijkstra(source, target, self._weight_view(weight, hour))
+
+    def pareto_paths(self, source, target, max_paths=3, max_overlap=0.8, hour=None):
+        """
+        Up to ``max_paths`` node-index paths that are Pareto-optimal over
+        (length, safety weight), shortest first.
+
+        Paths come from a sweep of weighted sums of the two criteria, then
+        penalty iterations that make already-used edges costlier. A candidate
+        is kept only if no kept path dominates it and it shares at most
+        ``max_overlap`` of its length with each of them. Raises NoPathError
+        when the target is unreachable.
+        """
+        length = self.length
+        safety = np.asarray(self._weights("safety", hour), dtype=np.float64)
+        # Normalise so a lambda of 0.5 weighs both criteria evenly
+        scale = float(length.sum() / max(safety.sum(), 1e-9)) if self.edge_count else 1.0
+
+        kept = []  # (path, edges, length, safety)
+
+        def consider(path, edges):
+            cost = (float(length[edges].sum()), float(safety[edges].sum()))
+            for _, other_edges, other_len, other_safety in kept:
+                if other_len <= cost[0] and other_safety <= cost[1]:
+                    return False
+                shared = np.intersect1d(edges, other_edges)
+                if float(length[shared].sum()) > max_overlap * min(cost[0], other_len):
+                    return False
+            # Drop earlier paths the newcomer dominates
+            kept[:] = [k for k in kept if not (cost[0] <= k[2] and cost[1] <= k[3])]
+            kept.append((path, edges, *cost))
+            return True
+
+        combined = {lam: (1.0 - lam) * length + lam * scale * safety for lam in _PARETO_LAMBDAS}
+        for lam in _PARETO_LAMBDAS:
+            if len(kept) >= max_paths:
+                break
+            path = self._bidirectional_dijkstra(source, target, memoryview(combined[lam]))
+            consider(path, self._path_edges(path, combined[lam]))
+
+        weights = combined[0.5].copy()
+        for _ in range(2 * max_paths):
+            if len(kept) >= max_paths:
+                break
+            for _, edges, _, _ in kept:
+                weights[edges] *= _PARETO_PENALTY
+            path = self._bidirectional_dijkstra(source, target, memoryview(weights))
+            consider(path, self._path_edges(path, combined[0.5]))
+
+        return [path for path, _, _, _ in sorted(kept, key=lambda k: k[2])]
+
+    def reachable(self, source, max_length, max_risk=None, hour=None):
+        """
+        One-to-all walking distances from ``source``, up to ``max_length``.
+
+        Edges whose risk factor (safety weight / length, from the hour's
+        layer when given) exceeds ``max_risk`` are never traversed. Returns
+        an array of path lengths per node, ``inf`` where unreachable.
+        """
+        g = self._as_views()
+        indptr, indices, w = g["indptr"], g["indices"], g["length"]
+        if max_risk is not None:
+            allowed = memoryview((self.risk_factors(hour) <= max_risk).astype(np.uint8))
+        else:
+            allowed = None
+
+        dist = {source: 0.0}
+        settled = set()
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            for e in range(indptr[u], indptr[u + 1]):
+                if allowed is not None and not allowed[e]:
+                    continue
+                nd = d + w[e]
+                v = indices[e]
+                if nd <= max_length and nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+
+        result = np.full(self.node_count, np.inf)
+        result[list(dist)] = list(dist.values())
+        return result
+
+    def _path_edges(self, path, weights):
+        """Edge ids along a node-index path, taking the cheapest parallel edge."""
+        edges = []
+        for u, v in zip(path, path[1:]):
+            start = self.indptr[u]
+            candidates = np.nonzero(self.indices[start:self.indptr[u + 1]] == v)[0] + start
+            edges.append(int(candidates[np.argmin(weights[candidates])]))
+        return np.array(edges, dtype=np.int64)
+
+    def _bidirectional_dijkstra(self, source, target, w):
+        if source == target:
+            return [source]
+        g = self._as_views()
+        indptr, indices = g["indptr"], g["indices"]
+        rev_indptr, rev_indices, rev_edges = g["rev_indptr"], g["rev_indices"], g["rev_edges"]
+
+        dist = ({source: 0.0}, {target: 0.0})
+        pred = ({source: -1}, {target: -1})
+        settled = (set(), set())
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meet = math.inf, -1
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+
+            my_dist, my_pred, other_dist = dist[side], pred[side], dist[1 - side]
+            if side == 0:
+                neighbours = (
+                    (indices[e], w[e]) for e in range(indptr[u], indptr[u + 1])
+                )
+            else:
+                neighbours = (
+                    (rev_indices[e], w[rev_edges[e]]) for e in range(rev_indptr[u], rev_indptr[u + 1])
+                )
+            for v, cost in neighbours:
+                nd = d + cost
+                if nd < my_dist.get(v, math.inf):
+                    my_dist[v] = nd
+                    my_pred[v] = u
+                    heapq.heappush(heaps[side], (nd, v))
+                if v in other_dist and nd + other_dist[v] < best:
+                    best = nd + other_dist[v]
+                    meet = v
+
+        if meet < 0:
+            raise NoPathError(f"No path from node {source} to node {target}")
+
+        forward = []
+        node = meet
+        while node != -1:
+            forward.append(node)
+            node = pred[0][node]
+        forward.reverse()
+        node = pred[1][meet]
+        while node != -1:
+            forward.append(node)
+            node = pred[1][node]
+        return forward
+
+    def _astar(self, source, target, weight, hour=None):
+        g = self._as_views()
+        w = self._weight_view(weight, hour)
+        indptr, indices, xs, ys = g["indptr"], g["indices"], g["x"], g["y"]
+
+        # Edge lengths follow the street geometry, so they are never shorter
+        # than the straight line; scaling by the smallest weight/length ratio
+        # keeps the heuristic admissible for the safety weight too.
+        key = (weight, hour_bucket(hour) if hour is not None and self.hourly is not None else None)
+        scale = self._heuristic_scale.get(key)
+        if scale is None:
+            ratio = self._weights(weight, hour) / np.maximum(self.length, 1e-9)
+            scale = min(1.0, float(ratio.min())) if self.edge_count else 1.0
+            self._heuristic_scale[key] = scale
+        tx, ty = xs[target], ys[target]
+
+        def h(node):
+            return scale * math.hypot(xs[node] - tx, ys[node] - ty)
+
+        dist = {source: 0.0}
+        pred = {source: -1}
+        closed = set()
+        heap = [(h(source), source)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u == target:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            d = dist[u]
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nd = d + w[e]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd + h(v), v))
+        else:
+            raise NoPathError(f"No path from node {source} to node {target}")
+
+        path = []
+        node = target
+        while node != -1:
+            path.append(node)
+            node = pred[node]
+        path.reverse()
+        return path
+
+
+def _local_xy(lat, lon):
+    ref_lat = float(np.mean(lat)) if len(lat) else 0.0
+    x = lon * _METERS_PER_DEGREE_LAT * math.cos(math.radians(ref_lat))
+    y = lat * _METERS_PER_DEGREE_LAT
+    return x, y
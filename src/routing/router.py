@@ -1,10 +1,23 @@
 
-import osmnx as ox
-import networkx as nx
-import pickle
+import os
+from datetime import datetime
+
+from src.routing.csr_graph import CSRGraph, GRAPH_BIN_PATH, NoPathError
 
 class Router:
-    def __init__(self, graph_path="campus_network.graphml"):
+    def __init__(self, graph_path="campus_network.graphml", binary_path=GRAPH_BIN_PATH):
+        self.graph = None
+        if binary_path and os.path.exists(os.path.join(binary_path, "header.json")):
+            # Memory-mapped, read-only: near-instant and shared across workers
+            print(f"Mapping compiled graph from {binary_path}...")
+            self.csr = CSRGraph.load(binary_path)
+            print(f"Graph mapped ({self.csr.node_count} nodes, {self.csr.edge_count} edges).")
+            self.csr.build_snap_index()
+            return
+
+        # osmnx is only needed to parse GraphML when no compiled graph exists
+        import osmnx as ox
+
         print(f"Loading graph from {graph_path}...")
         self.graph = ox.load_graphml(graph_path)
         print("Graph loaded.")
@@ -18,53 +31,42 @@ class Router:
             if 'risk_factor' in data:
                 data['risk_factor'] = float(data['risk_factor'])
 
-    def get_route(self, origin_coords, dest_coords, mode='safe'):
+        # Searches run on the compiled CSR arrays rather than networkx
+        self.csr = CSRGraph.from_networkx(self.graph)
+        self.csr.build_snap_index()
+
+    def snap(self, points):
+        """Nearest graph node ids for a sequence of (lat, lon) points."""
+        if len(points) == 0:
+            return []
+        lats, lons = zip(*points)
+        return [int(self.csr.node_ids[i]) for i in self.csr.nearest_nodes(lats, lons)]
+
+    def get_route(self, origin_coords, dest_coords, mode='safe', when=None):
         """
         Calculates route between (lat, lon) tuples.
         mode: 'shortest' (distance) or 'safe' (safety_score)
+        when: datetime of the trip (default now); 'safe' routes use the
+        safety layer for its hour
         """
-        # Project input (lat/lon) to graph CRS (meters)
-        # Graph CRS is stored as string 'EPSG:32615' or similar.
-        graph_crs = self.graph.graph['crs']
-        
-        # Create GeoDataFrame with WGS84 points
-        import geopandas as gpd
-        from shapely.geometry import Point
-        
-        # Geometry: Point(lon, lat)
-        points = gpd.GeoDataFrame(
-            geometry=[Point(origin_coords[1], origin_coords[0]), Point(dest_coords[1], dest_coords[0])], 
-            crs="EPSG:4326"
-        )
-        
-        # Project
-        points_proj = points.to_crs(graph_crs)
-        
-        orig_x = points_proj.geometry.iloc[0].x
-        orig_y = points_proj.geometry.iloc[0].y
-        dest_x = points_proj.geometry.iloc[1].x
-        dest_y = points_proj.geometry.iloc[1].y
+        weight = 'length' if mode == 'shortest' else 'safety'
+        hour = (when or datetime.now()).hour
+
+        # Nearest graph nodes to the (lat, lon) inputs, snapped together
+        source, target = self.csr.nearest_nodes(
+            [origin_coords[0], dest_coords[0]], [origin_coords[1], dest_coords[1]]
+        ).tolist()
 
-        # Find nearest nodes
-        orig_node = ox.distance.nearest_nodes(self.graph, orig_x, orig_y)
-        dest_node = ox.distance.nearest_nodes(self.graph, dest_x, dest_y)
-        
-        weight = 'length' if mode == 'shortest' else 'safety_score'
-        
         try:
-            route = nx.shortest_path(self.graph, orig_node, dest_node, weight=weight)
-            return route
-        except nx.NetworkXNoPath:
+            path = self.csr.shortest_path(source, target, weight=weight, hour=hour)
+            return [int(self.csr.node_ids[i]) for i in path]
+        except NoPathError:
             print("No path found.")
             return None
 
     def route_to_coords(self, route):
         """Converts node IDs to [(lat, lon), ...]"""
-        coords = []
-        for node in route:
-            pt = self.graph.nodes[node]
-            coords.append((pt['y'], pt['x']))
-        return coords
+        return self.csr.path_coords([self.csr.node_index(node) for node in route])
 
 if __name__ == "__main__":
     # Test
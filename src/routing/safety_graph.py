@@ -1,5 +1,9 @@
 
 import os
+import glob
+import json
+import argparse
+from datetime import datetime, timezone
 import osmnx as ox
 import networkx as nx
 import pandas as pd
@@ -11,12 +15,43 @@ import numpy as np
 import pickle
 from dotenv import load_dotenv
 
+from src.routing.csr_graph import CSRGraph, GRAPH_BIN_PATH
+
 load_dotenv()
 
 # Configuration
 DB_CONN = os.getenv("DATABASE_URL")
 PLACE_NAME = "Columbia, Missouri, USA"
 GRAPH_PATH = "campus_network.graphml"
+# Build state (how far into the crime tables the weights reach) and the
+# incremental weight deltas applied on top of GRAPH_PATH
+STATE_PATH = "campus_network.state.json"
+DELTA_DIR = "campus_network.deltas"
+
+# Edge sampling for crime/asset proximity: one point per SAMPLE_SPACING_M
+SAMPLE_SPACING_M = 50
+MAX_SAMPLES_PER_EDGE = 20
+
+ASSET_RADIUS_M = 50
+CRIME_RADIUS_M = 100
+
+# Incremental updates page on geocoded_at (set by a trigger when a row first
+# gets a location; src/db/migrations/incident_geocoded_at.sql), since most
+# incidents are inserted first and geocoded later
+CRIMES_QUERY = """
+    SELECT incident_type, ST_X(location_geo::geometry) as lon, ST_Y(location_geo::geometry) as lat, geocoded_at
+    FROM crime_incidents WHERE location_geo IS NOT NULL AND (%(since)s::timestamp IS NULL OR geocoded_at > %(since)s::timestamp)
+    UNION ALL
+    SELECT nibrs_description as incident_type, ST_X(location_geo::geometry) as lon, ST_Y(location_geo::geometry) as lat, geocoded_at
+    FROM cpd_incidents WHERE location_geo IS NOT NULL AND (%(since)s::timestamp IS NULL OR geocoded_at > %(since)s::timestamp)
+"""
+
+
+def risk_factors(asset_factor, crime_count):
+    """Edge safety factor from the asset reduction and nearby crime count."""
+    # simple: 1.2 base + 0.05 * count
+    penalty = 1.2 + 0.05 * np.minimum(crime_count, 10)
+    return np.where(crime_count > 0, asset_factor * penalty, asset_factor)
 
 class SafetyGraph:
     def __init__(self, db_conn=DB_CONN):
@@ -47,14 +82,7 @@ class SafetyGraph:
         
         # 2. Crimes (MUPD + CPD) -> Negative weight (increase in cost)
         # Recent crimes (last year?) maybe weight by recency. For MVP, just all.
-        crimes_query = """
-            SELECT incident_type, ST_X(location_geo::geometry) as lon, ST_Y(location_geo::geometry) as lat 
-            FROM crime_incidents WHERE location_geo IS NOT NULL
-            UNION ALL
-            SELECT nibrs_description as incident_type, ST_X(location_geo::geometry) as lon, ST_Y(location_geo::geometry) as lat 
-            FROM cpd_incidents WHERE location_geo IS NOT NULL
-        """
-        self.df_crimes = pd.read_sql(crimes_query, self.engine)
+        self.df_crimes = self._read_crimes(since=None)
         
         # Convert to GeoDataFrames and project to match Graph (UTM)
         # Assuming Data is WGS84 (4326)
@@ -78,82 +106,301 @@ class SafetyGraph:
             
         print(f"Loaded {len(self.gdf_assets)} assets and {len(self.gdf_crimes)} crimes.")
 
+    def _read_crimes(self, since):
+        df = pd.read_sql(CRIMES_QUERY, self.engine, params={"since": since})
+        # Rows without geocoded_at predate the trigger; they only matter to
+        # full builds
+        geocoded = df["geocoded_at"].dropna()
+        if not geocoded.empty:
+            self.crimes_through = geocoded.max().to_pydatetime()
+        else:
+            self.crimes_through = since or datetime.now()
+        return df
+
+    def _project_points(self, df):
+        """Projected (x, y) array of a lon/lat DataFrame in the graph CRS."""
+        gdf = gpd.GeoDataFrame(
+            df,
+            geometry=gpd.points_from_xy(df.lon, df.lat),
+            crs="EPSG:4326"
+        ).to_crs(self.graph.graph['crs'])
+        return np.column_stack([gdf.geometry.x, gdf.geometry.y])
+
+    def _edge_sample_points(self, edges):
+        """
+        Sample points along every edge in projected metres.
+
+        Short edges get their midpoint only (the original behaviour); longer
+        ones one point per SAMPLE_SPACING_M, up to MAX_SAMPLES_PER_EDGE.
+        Returns (points, edge_of_point).
+        """
+        nodes = self.graph.nodes
+        ux = np.array([nodes[u]['x'] for u, _, _, _ in edges], dtype=float)
+        uy = np.array([nodes[u]['y'] for u, _, _, _ in edges], dtype=float)
+        vx = np.array([nodes[v]['x'] for _, v, _, _ in edges], dtype=float)
+        vy = np.array([nodes[v]['y'] for _, v, _, _ in edges], dtype=float)
+        lengths = np.array([float(d.get('length', 1.0)) for _, _, _, d in edges])
+
+        samples = np.clip(np.ceil(lengths / SAMPLE_SPACING_M), 1, MAX_SAMPLES_PER_EDGE).astype(int)
+        edge_of_point = np.repeat(np.arange(len(edges)), samples)
+        # Evenly spaced fractions (i + 0.5) / n along each edge; n = 1 is the midpoint
+        first = np.repeat(np.cumsum(samples) - samples, samples)
+        frac = (np.arange(len(edge_of_point)) - first + 0.5) / samples[edge_of_point]
+
+        px = ux[edge_of_point] + frac * (vx - ux)[edge_of_point]
+        py = uy[edge_of_point] + frac * (vy - uy)[edge_of_point]
+        return np.column_stack([px, py]), edge_of_point
+
     def calculate_risk_scores(self):
         """
-        Iterates over edges.
+        Sets 'safety_score' and 'risk_factor' on every edge.
         Adjusts 'safety_weight' based on proximity to assets (-) and crimes (+).
         Base weight is length (meters).
+
+        All edge sample points go to each BallTree in one batched query, and
+        the factors are computed with array operations.
         """
         print("Calculating risk scores...")
-        
+
         # Weights
         # Asset benefit: reduce effective distance by 20% if within 50m
         # Crime penalty: increase effective distance by 50% if within 100m
-        
-        # Build Spatial Indices for fast lookup
-        asset_tree = None
-        crime_tree = None
-        
+        edges = list(self.graph.edges(keys=True, data=True))
+        if not edges:
+            print("Graph has no edges.")
+            return
+
+        points, edge_of_point = self._edge_sample_points(edges)
+        n_edges = len(edges)
+        asset_factor = np.ones(n_edges)
+        count_crimes = np.zeros(n_edges, dtype=np.int64)
+
+        # Check Assets (<50m) - flat reduction if any sample is near an asset
         if not self.gdf_assets.empty:
-            asset_coords = np.array(list(zip(self.gdf_assets.geometry.x, self.gdf_assets.geometry.y)))
+            asset_coords = np.column_stack([self.gdf_assets.geometry.x, self.gdf_assets.geometry.y])
             asset_tree = BallTree(asset_coords, metric='euclidean')
-            
+            near_asset = asset_tree.query_radius(points, r=ASSET_RADIUS_M, count_only=True) > 0
+            has_asset = np.zeros(n_edges, dtype=bool)
+            has_asset[edge_of_point[near_asset]] = True
+            asset_factor[has_asset] = 0.8
+
+        # Check Crimes (<100m) - distinct crimes near any sample of the edge
         if not self.gdf_crimes.empty:
-            crime_coords = np.array(list(zip(self.gdf_crimes.geometry.x, self.gdf_crimes.geometry.y)))
+            crime_coords = np.column_stack([self.gdf_crimes.geometry.x, self.gdf_crimes.geometry.y])
             crime_tree = BallTree(crime_coords, metric='euclidean')
-            
-        # Iterate Edges
-        # ox edges are (u, v, key, data)
-        for u, v, k, data in self.graph.edges(keys=True, data=True):
-            length = data.get('length', 1.0)
-            
-            # Use midpoint of edge for proximity check
-            # Nodes u, v have 'x', 'y' in projected crs
-            pt_u = self.graph.nodes[u]
-            pt_v = self.graph.nodes[v]
-            mid_x = (pt_u['x'] + pt_v['x']) / 2
-            mid_y = (pt_u['y'] + pt_v['y']) / 2
-            
-            # --- Safety Factor ---
-            safety_factor = 1.0
-            
-            # Check Assets (<50m)
-            if asset_tree:
-                count_assets = asset_tree.query_radius([[mid_x, mid_y]], r=50, count_only=True)[0]
-                if count_assets > 0:
-                    safety_factor *= 0.8 # 20% reduction per asset type? Or flat? Let's do flat for now.
-            
-            # Check Crimes (<100m)
-            if crime_tree:
-                count_crimes = crime_tree.query_radius([[mid_x, mid_y]], r=100, count_only=True)[0]
-                # Scale penalty by count?
-                if count_crimes > 0:
-                    # Logarithmic penalty? Or Linear?
-                    # simple: 1.2 base + 0.05 * count
-                    penalty = 1.2 + (0.05 * min(count_crimes, 10))
-                    safety_factor *= penalty
-            
-            # Calculate final weighted length
-            # If safety_factor < 1 (safer), length decreases (preferred)
-            # If safety_factor > 1 (risky), length increases (avoided)
-            weighted_len = float(length * safety_factor)
-            
-            data['safety_score'] = weighted_len
-            data['risk_factor'] = float(safety_factor) # For debugging/viz
-            
-        print("Risk scores calculated.")
+            hits = crime_tree.query_radius(points, r=CRIME_RADIUS_M)
+            hit_counts = np.fromiter((len(h) for h in hits), dtype=np.int64, count=len(hits))
+            if hit_counts.sum():
+                hit_edges = np.repeat(edge_of_point, hit_counts)
+                hit_crimes = np.concatenate(hits).astype(np.int64)
+                # A crime near several samples of one edge counts once
+                pairs = np.unique(hit_edges * len(crime_coords) + hit_crimes)
+                count_crimes = np.bincount(pairs // len(crime_coords), minlength=n_edges)
+
+        # If safety_factor < 1 (safer), length decreases (preferred)
+        # If safety_factor > 1 (risky), length increases (avoided)
+        safety_factor = risk_factors(asset_factor, count_crimes)
+        lengths = np.array([float(d.get('length', 1.0)) for _, _, _, d in edges])
+        weighted_len = lengths * safety_factor
+        for (u, v, k, data), score, factor, assets, crimes in zip(
+            edges, weighted_len.tolist(), safety_factor.tolist(), asset_factor.tolist(), count_crimes.tolist()
+        ):
+            data['safety_score'] = score
+            data['risk_factor'] = factor # For debugging/viz
+            # Kept so update_incremental can adjust the factor later
+            data['asset_factor'] = assets
+            data['crime_count'] = crimes
+
+        print(f"Risk scores calculated for {n_edges} edges from {len(points)} sample points.")
+
+    def save_edge_risk(self):
+        """
+        Persist per-edge risk to the edge_risk table so the API can score
+        OSRM geometries without rebuilding the graph.
+        Geometries are stored in WGS84; the graph itself stays projected.
+        """
+        print("Saving edge risk table...")
+        _, gdf_edges = ox.graph_to_gdfs(self.graph)
+        gdf_edges = gdf_edges.to_crs("EPSG:4326")
+
+        rows = []
+        for (u, v, k), edge in gdf_edges.iterrows():
+            rows.append({
+                "u": int(u),
+                "v": int(v),
+                "k": int(k),
+                "length_m": float(edge.get("length", 1.0)),
+                "risk_factor": float(edge.get("risk_factor", 1.0)),
+                "safety_score": float(edge.get("safety_score", edge.get("length", 1.0))),
+                "wkt": edge.geometry.wkt,
+            })
+
+        with self.engine.begin() as conn:
+            conn.execute(text("TRUNCATE edge_risk"))
+            conn.execute(
+                text("""
+                    INSERT INTO edge_risk (u, v, key, length_m, risk_factor, safety_score, geometry)
+                    VALUES (:u, :v, :k, :length_m, :risk_factor, :safety_score, ST_GeogFromText(:wkt))
+                """),
+                rows,
+            )
+        print(f"Saved {len(rows)} edges to edge_risk.")
 
     def save_graph(self, filename=GRAPH_PATH):
-        # Save as GraphML (standard)
+        # Save as GraphML (standard); save_compiled writes the binary form
         ox.save_graphml(self.graph, filepath=filename)
         print(f"Graph saved to {filename}")
         
+    def save_compiled(self, path=GRAPH_BIN_PATH):
+        # Memory-mappable CSR arrays for Router and the API's local backend
+        CSRGraph.from_networkx(self.graph).save(path, crs=str(self.graph.graph.get('crs')))
+        print(f"Compiled graph saved to {path}")
+
+    def load_graph(self, filename=GRAPH_PATH, delta_dir=DELTA_DIR):
+        """Loads a saved graph and replays any incremental weight deltas."""
+        print(f"Loading graph from {filename}...")
+        self.graph = ox.load_graphml(filename)
+        for u, v, k, data in self.graph.edges(keys=True, data=True):
+            for attr in ('length', 'safety_score', 'risk_factor', 'asset_factor'):
+                if attr in data:
+                    data[attr] = float(data[attr])
+            if 'crime_count' in data:
+                data['crime_count'] = int(float(data['crime_count']))
+
+        deltas = sorted(glob.glob(os.path.join(delta_dir, "*.npz")))
+        for path in deltas:
+            with np.load(path) as delta:
+                for u, v, k, count, score, factor in zip(
+                    delta['u'].tolist(), delta['v'].tolist(), delta['k'].tolist(),
+                    delta['crime_count'].tolist(), delta['safety_score'].tolist(), delta['risk_factor'].tolist(),
+                ):
+                    data = self.graph.edges[u, v, k]
+                    data['crime_count'] = count
+                    data['safety_score'] = score
+                    data['risk_factor'] = factor
+        print(f"Graph loaded with {len(deltas)} deltas applied.")
+
+    def _write_state(self, mode, state_path=STATE_PATH):
+        state = {
+            "crimes_through": self.crimes_through.isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "mode": mode,
+        }
+        with open(state_path, "w") as f:
+            json.dump(state, f, indent=2)
+
+    def _save_delta(self, edges, delta_dir=DELTA_DIR):
+        os.makedirs(delta_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(delta_dir, f"{stamp}.npz")
+        np.savez(
+            path,
+            u=np.array([u for u, _, _, _ in edges], dtype=np.int64),
+            v=np.array([v for _, v, _, _ in edges], dtype=np.int64),
+            k=np.array([k for _, _, k, _ in edges], dtype=np.int64),
+            crime_count=np.array([d['crime_count'] for _, _, _, d in edges], dtype=np.int64),
+            safety_score=np.array([d['safety_score'] for _, _, _, d in edges]),
+            risk_factor=np.array([d['risk_factor'] for _, _, _, d in edges]),
+        )
+        return path
+
+    def _update_edge_risk_rows(self, edges):
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("""
+                    UPDATE edge_risk
+                    SET risk_factor = :risk_factor, safety_score = :safety_score, built_at = NOW()
+                    WHERE u = :u AND v = :v AND key = :k
+                """),
+                [
+                    {
+                        "u": int(u), "v": int(v), "k": int(k),
+                        "risk_factor": float(d['risk_factor']),
+                        "safety_score": float(d['safety_score']),
+                    }
+                    for u, v, k, d in edges
+                ],
+            )
+
+    def update_incremental(self, state_path=STATE_PATH):
+        """
+        Folds incidents geocoded since the last build into the edge weights.
+
+        Only edges with a sample point within CRIME_RADIUS_M of a new crime
+        are touched. Their crime counts, risk factors and safety scores are
+        written as a delta file, to the compiled graph and to edge_risk.
+        Returns the number of edges updated.
+        """
+        if not os.path.exists(state_path):
+            print("No build state found; run a full rebuild first.")
+            return 0
+        with open(state_path) as f:
+            since = datetime.fromisoformat(json.load(f)["crimes_through"])
+
+        self.load_graph()
+        edges = list(self.graph.edges(keys=True, data=True))
+        if edges and 'crime_count' not in edges[0][3]:
+            print("Graph predates incremental updates; run a full rebuild first.")
+            return 0
+
+        df_new = self._read_crimes(since=since)
+        if df_new.empty:
+            print(f"No new crimes since {since.isoformat()}.")
+            return 0
+        crime_coords = self._project_points(df_new)
+
+        # Index the edge samples; there are only a few dozen new crimes to query
+        points, edge_of_point = self._edge_sample_points(edges)
+        sample_tree = BallTree(points, metric='euclidean')
+        hits = sample_tree.query_radius(crime_coords, r=CRIME_RADIUS_M)
+        pairs = np.concatenate([
+            np.unique(edge_of_point[h]).astype(np.int64) * len(crime_coords) + crime
+            for crime, h in enumerate(hits)
+        ])
+        added = np.bincount(pairs // len(crime_coords), minlength=len(edges))
+        touched = np.nonzero(added)[0]
+
+        changed = []
+        for i in touched.tolist():
+            u, v, k, data = edges[i]
+            data['crime_count'] = int(data['crime_count']) + int(added[i])
+            factor = float(risk_factors(float(data.get('asset_factor', 1.0)), data['crime_count']))
+            data['risk_factor'] = factor
+            data['safety_score'] = float(data.get('length', 1.0)) * factor
+            changed.append((u, v, k, data))
+
+        if changed:
+            path = self._save_delta(changed)
+            print(f"Delta with {len(changed)} edges written to {path}")
+            self.save_compiled()
+            self._update_edge_risk_rows(changed)
+        self._write_state("incremental", state_path)
+        print(f"{len(df_new)} new crimes touched {len(changed)} edges.")
+        return len(changed)
+
     def run(self):
         self.build_graph()
         self.load_safety_data()
         self.calculate_risk_scores()
         self.save_graph()
+        self.save_compiled()
+        self.save_edge_risk()
+        # A full build supersedes every earlier delta
+        for path in glob.glob(os.path.join(DELTA_DIR, "*.npz")):
+            os.remove(path)
+        self._write_state("full")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the campus safety graph.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fold in incidents added since the last build",
+    )
+    args = parser.parse_args()
+
     sg = SafetyGraph()
-    sg.run()
+    if args.incremental:
+        sg.update_incremental()
+    else:
+        sg.run()
@@ -10,7 +10,8 @@ import asyncio
 from unittest.mock import patch
 from src.backend.app.agents.coordinator_agent import CoordinatorAgent
 from src.backend.app.agents.intent_agent import IntentAgent
-from src.backend.app.models import Coordinates
+from src.backend.app.models import Coordinates, TransportationMode
+from src.backend.app.services.intent_parser import parse_intent
 
 @pytest.mark.asyncio
 async def test_intent_agent():
@@ -26,6 +27,27 @@ async def test_intent_agent():
         assert result["time"] == "23:00"
         assert result["destination_coords"]["latitude"] == 38.9483
 
+def test_intent_parser_single_pass():
+    intent = parse_intent("Safest bike route from Memorial Union to the rec center at 7:30pm")
+    assert intent.origin == "Memorial Union"
+    assert intent.destination == "the rec center"
+    assert intent.priority == "safety"
+    assert intent.time == "19:30"
+    assert intent.transportation_mode == TransportationMode.BIKE
+    assert intent.category == intent.destination_category == "recreation"
+
+    # Keywords match whole words only
+    plain = parse_intent("directions to Lafferre Hall, it's scary")
+    assert plain.category is None and plain.transportation_mode == TransportationMode.WALK
+    assert plain.time == "current" and plain.priority == "balanced"
+    assert parse_intent("find me food").destination_category is None
+
+    # Inflected priority words the substring matcher used to catch
+    assert parse_intent("route to Jesse Hall avoiding dark alleys").priority == "safety"
+    assert parse_intent("I avoided Hitt St last night, go to the union").priority == "safety"
+    assert parse_intent("any shortcut to Lafferre Hall?").priority == "speed"
+    assert parse_intent("in a hurry, take me to Ellis Library").priority == "speed"
+
 @pytest.mark.asyncio
 async def test_coordinator_pipeline():
     # Mocking components to verify orchestration logic
@@ -0,0 +1,75 @@
+import dataclasses
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src.backend.app import main
+from src.backend.app.models import Coordinates
+from src.backend.app.services.geocoding import GeocodingError
+
+_KNOWN = {
+    "Ellis Library": Coordinates(latitude=38.9446, longitude=-92.3264),
+    "Jesse Hall": Coordinates(latitude=38.9441, longitude=-92.3267),
+}
+
+
+async def _geocode(name: str) -> Coordinates:
+    if name == "Nowhere":
+        raise GeocodingError("No results found for 'Nowhere'")
+    if name == "Timeout Tower":
+        raise httpx.ConnectTimeout("timed out")
+    return _KNOWN[name]
+
+
+def _post_batch(requests: list[dict]) -> list[dict]:
+    client = TestClient(main.app)
+    response = client.post("/api/routes/batch", json={"requests": requests})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    return sorted(lines, key=lambda line: line["index"])
+
+
+def test_batch_geocodes_each_name_once_and_reports_errors_per_item():
+    requests = [
+        {"origin": "Ellis Library", "destination": "Jesse Hall"},
+        {"origin": "Ellis Library", "destination": "Jesse Hall", "priority": "speed"},
+        {"origin": "Nowhere", "destination": "Jesse Hall"},
+        {"origin": "Timeout Tower", "destination": {"latitude": 38.94, "longitude": -92.33}},
+    ]
+    geocode = AsyncMock(side_effect=_geocode)
+    candidates = AsyncMock(return_value={})
+
+    with patch.object(main, "geocode_location_async", geocode), \
+            patch.object(main, "_generate_route_candidates", candidates), \
+            patch.object(main, "_rank_pipeline_candidates", return_value={}), \
+            patch.object(main, "_routes_response", side_effect=lambda request, result: {"priority": request.priority}):
+        lines = _post_batch(requests)
+
+    assert sorted(call.args[0] for call in geocode.await_args_list) == [
+        "Ellis Library", "Jesse Hall", "Nowhere", "Timeout Tower",
+    ]
+    # The two requests differing only in priority share one candidate set
+    candidates.assert_awaited_once()
+    assert [line["status"] for line in lines] == [200, 200, 400, 502]
+    assert [line["response"]["priority"] for line in lines[:2]] == ["safety", "speed"]
+    assert "Nowhere" in lines[2]["error"]
+    assert lines[3]["error"].startswith("Geocoding service error")
+
+
+def test_batch_rejects_more_than_max_pairs():
+    limited = dataclasses.replace(main.settings, batch_route_max_pairs=2)
+    pair = {"origin": "Ellis Library", "destination": "Jesse Hall"}
+
+    with patch.object(main, "settings", limited), \
+            patch.object(main, "geocode_location_async") as geocode:
+        response = TestClient(main.app).post("/api/routes/batch", json={"requests": [pair] * 3})
+
+    assert response.status_code == 400
+    assert "At most 2" in response.json()["detail"]
+    geocode.assert_not_called()
@@ -0,0 +1,27 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.services.building_index import BuildingIndex, reverse_cache_key
+
+
+def test_building_index_point_in_polygon_and_nearest():
+    def square(lon, lat, half=0.0002):
+        return {
+            "type": "Polygon",
+            "coordinates": [[
+                [lon - half, lat - half], [lon + half, lat - half],
+                [lon + half, lat + half], [lon - half, lat + half], [lon - half, lat - half],
+            ]],
+        }
+
+    index = BuildingIndex(nearest_m=50)
+    index.load([("Jesse Hall", square(-92.3268, 38.9438)), ("Ellis Library", square(-92.3264, 38.9446))])
+
+    assert index.lookup(38.9438, -92.3268) == "Jesse Hall"
+    # ~30 m east of Ellis's edge, nothing contains it
+    assert index.lookup(38.9446, -92.3258) == "Ellis Library"
+    assert index.lookup(38.9600, -92.3000) is None
+    assert reverse_cache_key(38.94380, -92.32680) == reverse_cache_key(38.94381, -92.32681)
@@ -0,0 +1,96 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.cache import LRUCache
+from src.backend.app.services import geocoding
+from src.backend.app.models import Coordinates, LineString, Route
+from src.backend.app.services.route_cache import RouteCache, route_cache_key
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, 60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_route_cache_key_snaps_nearby_points_together():
+    origin = Coordinates(latitude=38.94000, longitude=-92.32770)
+    nearby = Coordinates(latitude=38.94002, longitude=-92.32772)
+    destination = Coordinates(latitude=38.94620, longitude=-92.33050)
+
+    key = route_cache_key(origin, destination, "foot", 3, grid_m=25)
+    assert key == route_cache_key(nearby, destination, "foot", 3, grid_m=25)
+    assert key != route_cache_key(origin, destination, "bike", 3, grid_m=25)
+
+
+def test_route_cache_serves_memory_hits_without_db():
+    cache = RouteCache(max_entries=8, ttl_seconds=60)
+    route = Route(
+        id="route_1",
+        geometry=LineString(coordinates=[(-92.33, 38.94), (-92.32, 38.95)]),
+        distance_meters=1200.0,
+        duration_seconds=900.0,
+        waypoints=[
+            Coordinates(latitude=38.94, longitude=-92.33),
+            Coordinates(latitude=38.95, longitude=-92.32),
+        ],
+    )
+    key = route_cache_key(
+        Coordinates(latitude=38.94, longitude=-92.33),
+        Coordinates(latitude=38.95, longitude=-92.32),
+        "foot",
+        3,
+    )
+
+    with patch("src.backend.app.services.route_cache.get_conn") as get_conn:
+        cache.put(key, [route])
+        assert cache.get(key) == [route]
+        # Only the write reached the database
+        assert get_conn.call_count == 1
+
+    cursor = get_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    query, rows = cursor.executemany.call_args.args
+    assert "NOW() + make_interval(secs => %s)" in query
+    assert rows[0][-1] == 60
+
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_geocoder_caches_hits_and_misses():
+    def nominatim(url, params, **kwargs):
+        response = MagicMock()
+        response.json.return_value = [] if "Nowhere" in params["q"] else [{"lat": "38.9417", "lon": "-92.3267"}]
+        return response
+
+    cache = geocoding.geocode_cache.__class__(max_entries=8, ttl_seconds=60, negative_ttl_seconds=60)
+    with patch.object(geocoding, "geocode_cache", cache), \
+            patch("src.backend.app.services.geocode_cache.get_conn") as get_conn, \
+            patch.object(geocoding, "nominatim_bucket", MagicMock()) as bucket, \
+            patch.object(geocoding.requests, "get", side_effect=nominatim) as http_get:
+        get_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value.fetchone.return_value = None
+        first = geocoding.geocode_location("Memorial Union")
+        assert geocoding.geocode_location("  memorial   union ") == first
+        for _ in range(2):
+            try:
+                geocoding.geocode_location("Nowhere")
+            except geocoding.GeocodingError:
+                pass
+
+    # One request for the hit, biased + unbiased retry for the miss, once each
+    assert http_get.call_count == 3
+    assert bucket.acquire.call_count == 3
+    assert cache.stats()["negative_stores"] == 1
+    # Expiry is computed on the database clock from the TTL, not sent as a timestamp
+    cursor = get_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    stores = [call.args for call in cursor.execute.call_args_list if "INSERT" in call.args[0]]
+    assert all("NOW() + make_interval(secs => %s)" in query for query, _ in stores)
+    assert [params[-1] for _, params in stores] == [60, 60]
@@ -0,0 +1,222 @@
+import os
+import sys
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+import numpy as np
+
+from src.backend.app.models import Coordinates, TransportationMode
+from src.backend.app.services import local_router, osrm
+from src.routing import csr_graph
+from src.routing.csr_graph import CSRGraph, hourly_safety
+
+
+def _grid_graph():
+    # 0 - 1 - 2
+    # |       |
+    # 3 ----- 4     top row is short but risky, bottom row is longer but safe
+    lat = [38.9410, 38.9410, 38.9410, 38.9400, 38.9400]
+    lon = [-92.3300, -92.3290, -92.3280, -92.3300, -92.3280]
+    edges = [(0, 1, 90, 300), (1, 2, 90, 300), (0, 3, 110, 110), (3, 4, 180, 180), (4, 2, 110, 110)]
+    sources, targets, length, safety = [], [], [], []
+    for u, v, l, s in edges:
+        sources += [u, v]
+        targets += [v, u]
+        length += [l, l]
+        safety += [s, s]
+    return CSRGraph.from_edges(
+        node_ids=[10, 11, 12, 13, 14],
+        node_lat=lat,
+        node_lon=lon,
+        node_x=[0, 90, 180, 0, 180],
+        node_y=[110, 110, 110, 0, 0],
+        sources=sources,
+        targets=targets,
+        length=length,
+        safety=safety,
+    )
+
+
+def test_weights_select_different_paths():
+    graph = _grid_graph()
+    for method in ("bidirectional", "astar"):
+        assert graph.shortest_path(0, 2, weight="length", method=method) == [0, 1, 2]
+        assert graph.shortest_path(0, 2, weight="safety", method=method) == [0, 3, 4, 2]
+
+
+def test_local_backend_serves_walking_routes():
+    graph = _grid_graph()
+    origin = Coordinates(latitude=38.9411, longitude=-92.3301)
+    destination = Coordinates(latitude=38.9411, longitude=-92.3279)
+
+    with patch.object(osrm, "settings", replace(osrm.settings, routing_backend="local")), \
+            patch.object(osrm, "get_local_graph", return_value=graph), \
+            patch.object(osrm.requests, "get") as http_get:
+        routes = osrm.generate_routes(origin, destination, TransportationMode.WALK, alternatives=1)
+
+    http_get.assert_not_called()
+    assert [route.distance_meters for route in routes] == [180, 400]
+
+
+def test_off_graph_endpoints_fall_back_to_osrm():
+    graph = _grid_graph()
+    origin = Coordinates(latitude=38.9411, longitude=-92.3301)
+    downtown = Coordinates(latitude=38.9517, longitude=-92.3341)  # ~1.2 km from the graph
+    response = MagicMock()
+    response.json.return_value = {
+        "code": "Ok",
+        "routes": [{
+            "geometry": {"coordinates": [[-92.3301, 38.9411], [-92.3341, 38.9517]]},
+            "distance": 1300.0,
+            "duration": 930.0,
+        }],
+    }
+    local = replace(osrm.settings, routing_backend="local", local_graph_max_snap_m=250)
+
+    with patch.object(osrm, "settings", local), \
+            patch.object(local_router, "settings", local), \
+            patch.object(osrm, "get_local_graph", return_value=graph), \
+            patch.object(osrm.requests, "get", return_value=response) as http_get:
+        routes = osrm.generate_routes(origin, downtown, TransportationMode.WALK, alternatives=0, use_cache=False)
+
+    http_get.assert_called_once()
+    assert [route.distance_meters for route in routes] == [1300.0]
+
+
+def test_missing_graph_is_retried_after_backoff():
+    graph = _grid_graph()
+    clock = MagicMock(return_value=1000.0)
+    backoff = replace(local_router.settings, local_graph_retry_seconds=60)
+
+    with patch.object(local_router, "_graph", None), \
+            patch.object(local_router, "_retry_at", 0.0), \
+            patch.object(local_router, "settings", backoff), \
+            patch.object(local_router.time, "monotonic", clock), \
+            patch.object(local_router, "_header_mtime", return_value=1), \
+            patch.object(local_router.CSRGraph, "load", side_effect=[OSError("missing"), graph]) as load:
+        assert local_router.get_local_graph() is None
+        clock.return_value = 1059.0
+        assert local_router.get_local_graph() is None
+        assert load.call_count == 1
+        clock.return_value = 1060.0
+        assert local_router.get_local_graph() is graph
+        assert local_router.get_local_graph() is graph
+        assert load.call_count == 2
+
+
+def test_refresh_remaps_a_rewritten_graph(tmp_path):
+    path = str(tmp_path / "graph.csr")
+    _grid_graph().save(path)
+    configured = replace(local_router.settings, local_graph_path=path)
+
+    with patch.object(local_router, "_graph", None), \
+            patch.object(local_router, "_graph_mtime", None), \
+            patch.object(local_router, "settings", configured):
+        assert local_router.refresh_local_graph() is True
+        first = local_router.get_local_graph()
+        assert local_router.refresh_local_graph() is False
+
+        # An incremental update rewrites the arrays, then the header
+        rebuilt = _grid_graph()
+        rebuilt.safety[:] = 1.0
+        rebuilt.save(path)
+        header = os.path.join(path, "header.json")
+        os.utime(header, ns=(os.stat(header).st_atime_ns, os.stat(header).st_mtime_ns + 1_000_000))
+
+        assert local_router.refresh_local_graph() is True
+        second = local_router.get_local_graph()
+        assert second is not first
+        assert second.shortest_path(0, 2, weight="safety") == [0, 1, 2]
+        # Requests holding the old mapping still read the old arrays
+        assert first.shortest_path(0, 2, weight="safety") == [0, 3, 4, 2]
+
+
+def test_saved_graph_is_memory_mapped(tmp_path):
+    graph = _grid_graph()
+    graph.save(str(tmp_path / "graph.csr"))
+
+    loaded = CSRGraph.load(str(tmp_path / "graph.csr"))
+    assert isinstance(loaded.indices.base, np.memmap)
+    assert not loaded.length.flags.writeable
+    assert loaded.header["node_count"] == 5
+    assert loaded.shortest_path(0, 2, weight="safety") == [0, 3, 4, 2]
+    assert loaded.node_index(14) == 4
+
+
+def test_night_layer_avoids_crime_edges(tmp_path):
+    # Same topology; the top row's penalty is all crime, which counts double at night
+    base = _grid_graph()
+    sources = np.repeat(np.arange(base.node_count), np.diff(base.indptr))
+    risk = np.where(base.length == 90, 1.8, 1.0)
+    graph = CSRGraph.from_edges(
+        node_ids=base.node_ids,
+        node_lat=base.node_lat,
+        node_lon=base.node_lon,
+        node_x=base.node_x,
+        node_y=base.node_y,
+        sources=sources,
+        targets=base.indices,
+        length=base.length,
+        safety=base.length * risk,
+        hourly=hourly_safety(base.length, risk, np.ones_like(risk)),
+    )
+    graph.save(str(tmp_path / "graph.csr"))
+    loaded = CSRGraph.load(str(tmp_path / "graph.csr"))
+
+    assert loaded.hourly.dtype == np.float16
+    assert loaded.shortest_path(0, 2, weight="safety", hour=12) == [0, 1, 2]
+    for method in ("bidirectional", "astar"):
+        assert loaded.shortest_path(0, 2, weight="safety", hour=23, method=method) == [0, 3, 4, 2]
+
+
+def test_batch_snap_matches_brute_force():
+    rng = np.random.default_rng(0)
+    n = 500
+    lat = 38.94 + rng.uniform(-0.01, 0.01, n)
+    lon = -92.33 + rng.uniform(-0.01, 0.01, n)
+    graph = CSRGraph.from_edges(
+        node_ids=np.arange(n),
+        node_lat=lat,
+        node_lon=lon,
+        node_x=np.zeros(n),
+        node_y=np.zeros(n),
+        sources=[0],
+        targets=[1],
+        length=[1.0],
+        safety=[1.0],
+    )
+    q_lat = 38.94 + rng.uniform(-0.01, 0.01, 2000)
+    q_lon = -92.33 + rng.uniform(-0.01, 0.01, 2000)
+
+    snapped = graph.nearest_nodes(q_lat, q_lon)
+    with patch.object(csr_graph, "cKDTree", None):
+        brute = CSRGraph.from_edges(graph.node_ids, lat, lon, np.zeros(n), np.zeros(n), [0], [1], [1.0], [1.0])
+        assert np.array_equal(brute.nearest_nodes(q_lat, q_lon), snapped)
+    assert graph.nearest_node(q_lat[0], q_lon[0]) == snapped[0]
+
+
+def test_pareto_paths_are_distinct_trade_offs():
+    graph = _grid_graph()
+    # Shortest (risky) and safest (long) survive; nothing dominates either
+    assert graph.pareto_paths(0, 2, max_paths=3) == [[0, 1, 2], [0, 3, 4, 2]]
+    assert graph.pareto_paths(0, 2, max_paths=1) == [[0, 1, 2]]
+
+
+def test_reachability_respects_budget_and_risk():
+    graph = _grid_graph()
+    dist = graph.reachable(0, 200)
+    assert dist[1] == 90 and dist[2] == 180 and dist[3] == 110 and np.isinf(dist[4])
+
+    # The top row's risk factor is 300/90; capping it forces the bottom row
+    safe = graph.reachable(0, 500, max_risk=1.5)
+    assert np.isinf(safe[1]) and safe[2] == 400
+
+    area = local_router.reachable_area(
+        graph, Coordinates(latitude=38.9410, longitude=-92.3300), minutes=200 / 60 / 1.4
+    )
+    kinds = [feature["properties"]["kind"] for feature in area["features"]]
+    assert kinds == ["edges", "area"]
+    assert area["features"][0]["properties"]["reachable_nodes"] == 4
@@ -0,0 +1,109 @@
+import asyncio
+import dataclasses
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app import main
+from src.backend.app.models import Coordinates, LineString, Route
+from src.backend.app.services import queries
+from src.backend.app.services.edge_risk import EdgeRiskTable
+from src.backend.app.services.incident_index import project
+from src.backend.app.services.safety import edge_risk_scores
+
+
+def test_route_is_matched_onto_nearby_edges():
+    table = EdgeRiskTable(match_m=25)
+    table.load([
+        # Two east-west edges along the same street, then one far north
+        (1.5, [(-92.3300, 38.9400), (-92.3250, 38.9400)]),
+        (0.8, [(-92.3250, 38.9400), (-92.3200, 38.9400)]),
+        (3.0, [(-92.3300, 38.9500), (-92.3200, 38.9500)]),
+    ])
+
+    # Runs ~5 m north of the street, so only the first two edges match. OSRM
+    # reports the straight run as one segment; it still matches both edges
+    route = LineString(coordinates=[(-92.3300, 38.94005), (-92.3200, 38.94005)])
+    score = table.score(route)
+
+    half_m = float(project(38.94, -92.3250)[0] - project(38.94, -92.3300)[0])
+    assert score.edge_count == 2
+    assert score.matched_fraction == 1.0
+    assert abs(score.matched_m - 2 * half_m) < 1e-6
+    # Summed, so a longer walk along the same streets accumulates more risk;
+    # the piece straddling the junction goes wholly to one edge (<= 25 m)
+    assert abs(score.risk_m - (1.5 + 0.8) * half_m) < 25 * (1.5 - 0.8)
+    assert abs(score.excess_risk_m - 0.3 * half_m) < 25 * (1.5 - 0.8)
+
+    shorter = table.score(LineString(coordinates=[(-92.3300, 38.94005), (-92.3250, 38.94005)]))
+    assert shorter.edge_count == 1
+    assert abs(shorter.risk_m - 1.5 * half_m) < 1e-3
+
+
+def test_edge_risk_scores_share_the_incident_score_scale():
+    noon = datetime(2026, 3, 2, 12, 0)
+    midnight = datetime(2026, 3, 2, 23, 30)
+
+    scores = edge_risk_scores([250.0, -40.0, 250.0, 900.0], ["low", "low", "high", "low"], noon, 500)
+    assert scores.tolist() == [50.0, 0.0, 40.0, 100.0]
+    assert edge_risk_scores([100.0], ["moderate"], midnight, 500).tolist() == [40.0]
+
+
+def test_unmatched_route_is_neutral():
+    table = EdgeRiskTable(match_m=25)
+    table.load([(2.0, [(-92.3300, 38.9400), (-92.3200, 38.9400)])])
+
+    route = LineString(coordinates=[(-92.3300, 38.9450), (-92.3200, 38.9450)])
+    score = table.score(route)
+    assert score.matched_fraction == 0.0
+    assert score.risk_m == 0.0 and score.excess_risk_m == 0.0
+
+
+def _async_conn(rows):
+    cursor = MagicMock()
+    cursor.execute = AsyncMock()
+    cursor.fetchall = AsyncMock(return_value=rows)
+    cursor.__aenter__.return_value = cursor
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    conn.__aenter__.return_value = conn
+    return conn, cursor
+
+
+def test_edge_scored_routes_keep_their_incidents_without_the_index():
+    table = EdgeRiskTable(match_m=25)
+    table.load([(1.5, [(-92.3300, 38.9400), (-92.3200, 38.9400)])])
+    line = LineString(coordinates=[(-92.3300, 38.94005), (-92.3200, 38.94005)])
+    route = Route(
+        id="route_1", geometry=line, distance_meters=866.0, duration_seconds=620.0,
+        waypoints=[Coordinates(latitude=38.94005, longitude=-92.33), Coordinates(latitude=38.94005, longitude=-92.32)],
+    )
+    rows = [
+        (1, "incident", "17", "assault", datetime(2026, 3, 1), "Tiger Ave", 38.9401, -92.325, None),
+        (1, "traffic", None, None, None, None, None, None, 0),
+    ]
+    conn, cursor = _async_conn(rows)
+    no_index = dataclasses.replace(main.settings, incident_index_enabled=False, edge_risk_enabled=True)
+
+    with patch.object(main, "settings", no_index), \
+            patch.object(queries, "settings", no_index), \
+            patch.object(main, "edge_risk_table", table), \
+            patch.object(main, "generate_routes_async", AsyncMock(return_value=[route])), \
+            patch.object(queries, "get_async_conn", return_value=conn):
+        candidates = asyncio.run(main._generate_route_candidates(
+            route.waypoints[0], route.waypoints[1], "student", "2026-03-02T14:00:00",
+        ))
+
+    # The incident join still ran, so concerns, tips and the map keep them
+    assert "crime_incidents" in cursor.execute.await_args.args[0]
+    analysis = candidates["analyses"][0]
+    assert analysis.incident_count == 1
+    assert [incident.id for incident in candidates["incidents"]] == ["17"]
+    assert "No recent incidents in the area" not in analysis.positives
+    # ...while the score comes from edge risk
+    excess = table.score(line).excess_risk_m
+    assert analysis.edge_risk_m is not None
+    assert analysis.risk_score == round(min(excess / no_index.edge_risk_full_scale_m * 100, 100))
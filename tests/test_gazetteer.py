@@ -0,0 +1,87 @@
+import dataclasses
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.services import geocoding
+from src.backend.app.services.gazetteer import Gazetteer, Place
+from src.backend.app.models import Coordinates
+
+
+def test_gazetteer_answers_campus_places_offline():
+    places = [
+        Place("Ellis Library", 38.9446, -92.3264, "library", "campus_locations", "12"),
+        Place("Memorial Union", 38.9465, -92.3275, "dining", "campus_locations"),
+        Place("Hitt St & University Ave", 38.9430, -92.3260, "transit", "shuttle_stops"),
+    ]
+    index = Gazetteer(min_similarity=0.5)
+    index.load(places)
+
+    assert index.lookup("ellis library, Columbia MO").place is places[0]
+    assert index.lookup("Building 12").place is places[0]
+    assert index.lookup("the union").place is places[1]
+    assert index.lookup("hitt street and university avenue").score == 1.0
+    typo = index.lookup("elis libary")
+    assert typo.place is places[0] and typo.score < 1.0
+    assert index.lookup("Walmart Supercenter") is None
+
+    with patch.object(geocoding, "gazetteer", index), \
+            patch.object(geocoding.requests, "get") as http_get:
+        assert geocoding.geocode_location("Ellis Library") == places[0].coordinates
+    http_get.assert_not_called()
+
+
+def test_gazetteer_suggest_ranks_prefixes_and_proximity():
+    places = [
+        Place("Ellis Library", 38.9446, -92.3264, "library", "campus_locations"),
+        Place("Engineering Building East", 38.9461, -92.3301, "academic", "campus_buildings"),
+        Place("Memorial Union", 38.9465, -92.3275, "dining", "campus_locations"),
+        Place("Memorial Stadium", 38.9359, -92.3331, "recreation", "campus_buildings"),
+        Place("Ellis Library", 38.9447, -92.3263, "misc", "campus_buildings"),
+    ]
+    index = Gazetteer(min_similarity=0.5)
+    index.load(places)
+
+    # Whole-name prefixes, then word prefixes; duplicates across tables collapse
+    assert [s.place.name for s in index.suggest("e")] == ["Ellis Library", "Engineering Building East"]
+    assert [s.place.name for s in index.suggest("lib")] == ["Ellis Library"]
+    assert index.suggest("memorial")[0].distance_m is None
+
+    near_stadium = Coordinates(latitude=38.9360, longitude=-92.3330)
+    ranked = index.suggest("memorial", origin=near_stadium)
+    assert [s.place.name for s in ranked] == ["Memorial Stadium", "Memorial Union"]
+    assert ranked[0].distance_m < ranked[1].distance_m
+    # Typos fall back to trigram similarity
+    assert index.suggest("memorail union")[0].place.name == "Memorial Union"
+
+
+def test_gazetteer_leaves_off_campus_queries_to_nominatim():
+    places = [
+        Place("Jesse Hall", 38.9441, -92.3267, "academic", "campus_buildings"),
+        Place("Boone Hall", 38.9430, -92.3240, "dorm", "campus_locations"),
+        Place("Hearnes Center Arena", 38.9344, -92.3317, "recreation", "campus_buildings"),
+        Place("Broadway & Hitt St", 38.9510, -92.3260, "transit", "transit_stops"),
+        Place("Rollins Street Garage", 38.9410, -92.3290, "parking", "campus_buildings"),
+    ]
+    index = Gazetteer(min_similarity=0.3)
+    index.load(places)
+    elsewhere = Coordinates(latitude=38.6270, longitude=-90.1994)
+    response = MagicMock()
+    response.json.return_value = [{"lat": str(elsewhere.latitude), "lon": str(elsewhere.longitude)}]
+    no_cache = dataclasses.replace(geocoding.settings, geocode_cache_enabled=False)
+
+    with patch.object(geocoding, "gazetteer", index), \
+            patch.object(geocoding, "settings", no_cache), \
+            patch.object(geocoding, "nominatim_bucket", MagicMock()), \
+            patch.object(geocoding.requests, "get", return_value=response) as http_get:
+        for query in ["Boone Hospital", "Mizzou Arena", "123 Broadway", "Broadway Diner",
+                      "Rollins Field", "Jesse Hall, St. Louis"]:
+            http_get.reset_mock()
+            assert geocoding.geocode_location(query) == elsewhere, query
+            http_get.assert_called_once()
+
+        http_get.reset_mock()
+        assert geocoding.geocode_location("Jesse Hall, Columbia, MO") == places[0].coordinates
+        http_get.assert_not_called()
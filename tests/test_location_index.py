@@ -0,0 +1,54 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.models import CampusLocation, Coordinates
+from src.backend.app.services import locations
+from src.backend.app.services.location_index import LocationIndex
+from src.routing.csr_graph import CSRGraph
+
+
+def test_category_options_rank_nearest_first():
+    def location(id, name, category, lat, lon):
+        return CampusLocation(
+            id=id, name=name, category=category, coordinates=Coordinates(latitude=lat, longitude=lon)
+        )
+
+    index = LocationIndex()
+    index.load(
+        [
+            location(1, "Hatch Hall", "dorm", 38.9400, -92.3290),  # ~87 m east, across a creek
+            location(2, "Gillett Hall", "dorm", 38.9410, -92.3300),  # ~111 m north
+            location(3, "Ellis Library", "library", 38.9446, -92.3264),
+        ],
+        [location(4, "Hulston Hall Parking Garage", "misc", 38.9470, -92.3300)],
+    )
+    origin = Coordinates(latitude=38.9400, longitude=-92.3300)
+
+    assert [loc.name for loc in index.nearest("dorm")[0]] == ["Gillett Hall", "Hatch Hall"]
+    nearest, distances = index.nearest("dorm", origin)
+    assert [loc.name for loc in nearest] == ["Hatch Hall", "Gillett Hall"]
+    assert round(distances[0]) == 87
+    # No curated parking rows: buildings matched by name stand in
+    assert [loc.name for loc in index.nearest("parking")[0]] == ["Hulston Hall Parking Garage"]
+
+    # Walking, the creek makes Hatch the farther of the two
+    graph = CSRGraph.from_edges(
+        node_ids=[0, 1, 2],
+        node_lat=[38.9400, 38.9400, 38.9410],
+        node_lon=[-92.3300, -92.3290, -92.3300],
+        node_x=[0, 0, 0],
+        node_y=[0, 0, 0],
+        sources=[0, 1, 0, 2],
+        targets=[1, 0, 2, 0],
+        length=[400, 400, 111, 111],
+        safety=[400, 400, 111, 111],
+    )
+    with patch.object(locations, "location_index", index), \
+            patch.object(locations, "get_local_graph", return_value=graph):
+        options = locations.get_category_options("dorm", origin)
+    assert [option.name for option in options] == ["Gillett Hall", "Hatch Hall"]
+    assert options[1].distance_meters == 87
+    assert options[1].walk_minutes == round(400 / 1.4 / 60, 1)
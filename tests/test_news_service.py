@@ -0,0 +1,46 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.services import news_service
+
+
+def test_news_cache_uses_conditional_requests():
+    rss = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>KOMU</title>
+        <item><title>Assault reported near Tiger Avenue</title><description>Police investigating</description></item>
+        </channel></rss>"""
+    ok = MagicMock(status_code=200, content=rss, headers={"ETag": '"v1"'})
+    cache = news_service.NewsCache([{"url": "https://example.test/rss", "name": "KOMU 8"}], timeout=1)
+
+    with patch.object(news_service.requests, "get", return_value=ok) as http_get:
+        assert cache.refresh() is True
+        assert [a["categories"] for a in cache.articles()] == ["crime"]
+
+        http_get.return_value = MagicMock(status_code=304)
+        assert cache.refresh() is False
+    assert http_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    # Unchanged feed keeps its articles and counts as fresh
+    assert cache.articles()[0]["title"] == "Assault reported near Tiger Avenue"
+    assert cache.freshness()["stale"] is False
+
+    with patch.object(news_service.requests, "get", side_effect=TimeoutError("slow feed")):
+        cache.refresh()
+    assert len(cache.articles()) == 1
+    assert cache.stats()["feeds"]["KOMU 8"]["error"] == "slow feed"
+
+
+def test_news_cache_falls_back_to_sample_articles_when_every_feed_fails():
+    feeds = [
+        {"url": "https://example.test/a", "name": "KOMU 8"},
+        {"url": "https://example.test/b", "name": "ABC 17 (KMIZ)"},
+    ]
+    cache = news_service.NewsCache(feeds, timeout=1)
+
+    with patch.object(news_service.requests, "get", side_effect=ConnectionError("offline")):
+        articles = cache.articles()
+
+    assert [a["id"] for a in articles] == [a["id"] for a in news_service._create_fallback_articles()]
+    assert cache.stats()["loaded"] is True
+    assert cache.freshness()["stale"] is True
@@ -0,0 +1,101 @@
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.models import LineString
+from src.backend.app.services.queries import fetch_route_safety_batch
+
+
+def _mock_conn(rows):
+    cursor = MagicMock()
+    cursor.fetchall.return_value = rows
+    cursor.__enter__.return_value = cursor
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    conn.__enter__.return_value = conn
+    return conn, cursor
+
+
+def test_route_safety_batch_groups_rows_by_route():
+    routes = [
+        LineString(coordinates=[(-92.33, 38.94), (-92.32, 38.95)]),
+        LineString(coordinates=[(-92.34, 38.94), (-92.32, 38.95)]),
+    ]
+    rows = [
+        (1, "incident", "17", "larceny", datetime(2026, 1, 2), None, 38.94, -92.33, None),
+        (2, "incident", "18", "assault", datetime(2026, 1, 3), "Tiger Ave", 38.945, -92.335, None),
+        (1, "traffic", None, None, None, None, None, None, 7),
+        (2, "traffic", None, None, None, None, None, None, 0),
+        (2, "phone", None, None, None, None, 38.946, -92.331, None),
+    ]
+    conn, cursor = _mock_conn(rows)
+
+    with patch("src.backend.app.services.queries.get_conn", return_value=conn):
+        result = fetch_route_safety_batch(
+            routes, radius_m=500, phone_radius_m=100, days_back=30, traffic_days_back=90
+        )
+
+    assert cursor.execute.call_count == 1
+    params = cursor.execute.call_args[0][1]
+    assert len(params["wkts"]) == 2
+    assert [len(r.incidents) for r in result] == [1, 1]
+    assert result[0].incidents[0].type == "Larceny"
+    assert result[0].traffic_stops == 7
+    assert result[1].emergency_phones[0].latitude == 38.946
+
+
+def test_route_safety_batch_skips_db_without_routes():
+    with patch("src.backend.app.services.queries.get_conn") as get_conn:
+        assert fetch_route_safety_batch([], 500, 100, 30, 90) == []
+    get_conn.assert_not_called()
+
+
+def test_incident_index_matches_buffer_and_date_filter():
+    from src.backend.app.services.incident_index import IncidentIndex
+
+    now = datetime(2026, 3, 1)
+    rows = [
+        # ~30 m off the route, recent
+        ("crime", "1", "larceny", datetime(2026, 2, 20), "Lot A", 38.9403, -92.3250),
+        # ~30 m off the route, too old
+        ("cpd", "2", "assault", datetime(2025, 1, 1), None, 38.9403, -92.3260),
+        # ~1 km away
+        ("call", "3", "alarm", datetime(2026, 2, 25), None, 38.9500, -92.3250),
+    ]
+    conn, cursor = _mock_conn([row + (now,) for row in rows])
+    index = IncidentIndex(cell_m=100)
+    with patch("src.backend.app.services.incident_index.get_conn", return_value=conn):
+        index.load()
+
+    route = LineString(coordinates=[(-92.3300, 38.9400), (-92.3200, 38.9400)])
+    found = index.query(route, 100, since=datetime(2026, 1, 1))
+    assert [incident.id for incident in found] == ["1"]
+    assert found[0].type == "Larceny"
+
+    assert {i.id for i in index.query(route, 100)} == {"1", "2"}
+    assert {i.id for i in index.query(route, 2000)} == {"1", "2", "3"}
+
+
+def test_incident_index_refresh_pages_on_geocoded_at():
+    from src.backend.app.services.incident_index import IncidentIndex
+
+    loaded_through = datetime(2026, 3, 1, 12)
+    first = ("crime", "1", "larceny", datetime(2026, 2, 20), "Lot A", 38.9403, -92.3250, loaded_through)
+    conn, cursor = _mock_conn([first])
+    index = IncidentIndex(cell_m=100)
+    with patch("src.backend.app.services.incident_index.get_conn", return_value=conn):
+        index.load()
+
+        # Reported before the load but only geocoded afterwards
+        late = ("cpd", "2", "assault", datetime(2026, 2, 18), None, 38.9403, -92.3260, datetime(2026, 3, 2, 8))
+        cursor.fetchall.return_value = [late]
+        assert index.refresh() == 1
+
+    query, params = cursor.execute.call_args.args
+    assert params == {"since": loaded_through}
+    assert query.count("COALESCE(geocoded_at, created_at) > %(since)s") == 2
+    route = LineString(coordinates=[(-92.3300, 38.9400), (-92.3200, 38.9400)])
+    assert {i.id for i in index.query(route, 100)} == {"1", "2"}
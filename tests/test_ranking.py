@@ -0,0 +1,43 @@
+from src.backend.app.models import LineString, Route, SafetyAnalysis
+from src.backend.app.services.ranking import PRIORITIES, rank_routes, rank_routes_all
+
+
+def _route(route_id: str, duration: float) -> Route:
+    return Route(
+        id=route_id,
+        geometry=LineString(coordinates=[(-92.33, 38.94), (-92.32, 38.95)]),
+        distance_meters=duration * 1.4,
+        duration_seconds=duration,
+        waypoints=[],
+    )
+
+
+def _analysis(risk: float) -> SafetyAnalysis:
+    return SafetyAnalysis(
+        risk_score=risk,
+        risk_level="Safe",
+        incident_count=0,
+        recent_incidents=[],
+        emergency_phones=0,
+        lighting_quality="moderate",
+        patrol_frequency="low",
+        actionable_tips=[],
+        concerns=[],
+        positives=[],
+        contributing_factors=[],
+    )
+
+
+def test_rank_routes_all_matches_individual_rankings():
+    routes = [_route("a", 600), _route("b", 900), _route("c", 700)]
+    analyses = [_analysis(70), _analysis(10), _analysis(40)]
+
+    for hour in (12, 23):
+        rankings = rank_routes_all(routes, analyses, hour)
+        assert set(rankings) == set(PRIORITIES)
+        for priority, indices in rankings.items():
+            assert indices == rank_routes(routes, analyses, priority, hour)
+
+    day = rank_routes_all(routes, analyses, 12)
+    assert day["speed"] == [0, 2, 1]
+    assert day["safety"] == [1, 2, 0]
@@ -0,0 +1,38 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app import main, rate_limit
+from src.backend.app.rate_limit import TokenBucket
+
+
+def test_bucket_max_wait_fails_fast_without_taking_a_token():
+    clock = MagicMock(return_value=100.0)
+    with patch.object(rate_limit.time, "monotonic", clock), \
+            patch.object(rate_limit.time, "sleep") as sleep:
+        bucket = TokenBucket(rate_per_second=1.0)
+        assert bucket.acquire(max_wait=0) is True
+        # The next token is a second away
+        assert bucket.acquire(max_wait=0.5) is False
+        clock.return_value = 100.6
+        assert bucket.acquire(max_wait=0.5) is True
+        sleep.assert_called_once()
+        assert abs(sleep.call_args.args[0] - 0.4) < 1e-9
+        # Without max_wait callers still queue on credit
+        assert bucket.acquire() is True
+        assert abs(sleep.call_args.args[0] - 1.4) < 1e-9
+
+
+def test_reverse_geocode_answers_with_coordinates_when_rate_limited():
+    bucket = MagicMock()
+    bucket.acquire.return_value = False
+
+    with patch.object(main, "nominatim_bucket", bucket), \
+            patch("requests.get") as http_get:
+        result = main._reverse_geocode_nominatim(38.94461, -92.32641)
+
+    assert result == {"display_name": "38.9446, -92.3264", "source": "coordinates"}
+    assert bucket.acquire.call_args.kwargs["max_wait"] == main.settings.reverse_geocode_max_wait_seconds
+    http_get.assert_not_called()
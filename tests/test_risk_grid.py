@@ -0,0 +1,33 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.services import risk_grid_service
+from src.backend.app.services.risk_grid_service import build_risk_cube, generate_risk_grid
+
+
+def test_risk_cube_applies_severity_and_hour_boost():
+    incidents = [
+        {"lat": 38.9401, "lon": -92.3301, "severity": "high", "hour": 23},
+        {"lat": 38.9402, "lon": -92.3302, "severity": "low", "hour": 12},
+        {"lat": 38.9700, "lon": -92.3300, "severity": "high", "hour": 23},  # off grid
+    ]
+    cube = build_risk_cube(incidents)
+
+    # 22:00 is within three hours of the first incident only
+    assert cube.cube[22].sum() == 3.0 * 2 + 1.0
+    assert cube.cube[12].sum() == 3.0 + 1.0 * 2
+
+
+def test_generate_risk_grid_reuses_cached_cube():
+    incidents = [{"lat": 38.9401, "lon": -92.3301, "severity": "medium", "hour": 1}]
+    risk_grid_service._cube = None
+    with patch.object(risk_grid_service, "_fetch_incidents_from_db", return_value=incidents) as fetch:
+        day = generate_risk_grid(hour=14)
+        night = generate_risk_grid(hour=2)
+
+    assert fetch.call_count == 1
+    assert day["features"][0]["properties"]["risk_score"] == 0.2
+    assert night["features"][0]["properties"]["risk_score"] == 0.8
@@ -0,0 +1,69 @@
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+from src.backend.app.models import Coordinates, Incident
+from src.backend.app.services.safety import (
+    analyze_route_safety,
+    analyze_routes_safety,
+    apply_temporal_weight,
+)
+
+
+def _incident(incident_id, age, now, incident_type="Theft"):
+    """``age`` is a timedelta or a whole number of days."""
+    if not isinstance(age, timedelta):
+        age = timedelta(days=age)
+    return Incident(
+        id=incident_id,
+        type=incident_type,
+        location=Coordinates(latitude=38.94, longitude=-92.33),
+        date=now - age,
+    )
+
+
+def test_temporal_weight_buckets():
+    now = datetime(2026, 3, 1, 12)
+    incidents = [_incident("1", 10, now), _incident("2", 60, now), _incident("3", 200, now)]
+    assert apply_temporal_weight(incidents, now) == 10 * (5 + 2 + 1)
+
+
+def test_batch_matches_single_route_scoring():
+    day = datetime(2026, 3, 1, 14)
+    night = datetime(2026, 3, 1, 23)
+    dawn = datetime(2026, 3, 2, 5, 59)
+    incidents = [
+        [_incident("1", 3, day), _incident("2", 45, day, "Assault")],
+        [],
+        [_incident("3", 120, day)],
+        # Either side of the 30 and 90 day buckets; ages grow with the departure time
+        [
+            _incident("4", timedelta(days=30, hours=23), day),
+            _incident("5", 31, day),
+            _incident("6", timedelta(days=90, hours=1), day),
+            _incident("7", 91, day),
+        ],
+    ]
+    phones = [0, 2, 1, 0]
+    lighting = ["moderate", "good", "poor", "moderate"]
+    patrol = ["low", "high", "moderate", "high"]
+    lengths = [2500.0, 1200.0, 900.0, 6000.0]
+    # Scores from the per-incident scalar formula this engine replaced
+    expected = {day: [35, 0, 14, 17], night: [70, 0, 29, 23], dawn: [70, 0, 29, 23]}
+
+    for user_mode in ["student", "community"]:
+        batch = analyze_routes_safety(
+            incidents, phones, lighting, patrol, user_mode, list(expected), lengths
+        )
+
+        assert len(batch) == 3 and all(len(row) == 4 for row in batch)
+        for row, (current_time, scores) in zip(batch, expected.items()):
+            assert [analysis.risk_score for analysis in row] == scores
+            for i, analysis in enumerate(row):
+                single = analyze_route_safety(
+                    incidents[i], phones[i], lighting[i], patrol[i], user_mode, current_time, lengths[i]
+                )
+                assert analysis == single
@@ -0,0 +1,148 @@
+import copy
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+for module in ["psycopg", "sentence_transformers", "redis", "geopandas", "osmnx"]:
+    sys.modules[module] = MagicMock()
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from src.routing import safety_graph
+from src.routing.safety_graph import SafetyGraph, risk_factors
+
+
+def _line_graph():
+    # 0 --100m-- 1 --100m-- 2
+    #                       |
+    #                     1000m
+    #                       |
+    #                       3
+    graph = nx.MultiDiGraph(crs="EPSG:32615")
+    for node, (x, y) in enumerate([(0, 0), (100, 0), (200, 0), (200, 1000)]):
+        graph.add_node(node, x=float(x), y=float(y))
+    graph.add_edge(0, 1, 0, length=100.0)
+    graph.add_edge(1, 2, 0, length=100.0)
+    graph.add_edge(2, 3, 0, length=1000.0)
+    return graph
+
+
+def _points(coords):
+    x, y = zip(*coords)
+    return SimpleNamespace(empty=False, geometry=SimpleNamespace(x=np.array(x), y=np.array(y)))
+
+
+def _as_graphml(graph):
+    """What ox.load_graphml hands back: edge attributes as strings."""
+    loaded = copy.deepcopy(graph)
+    for _, _, data in loaded.edges(data=True):
+        for attr, value in data.items():
+            data[attr] = str(value)
+    return loaded
+
+
+def _safety_graph():
+    sg = SafetyGraph.__new__(SafetyGraph)
+    sg.engine = MagicMock()
+    return sg
+
+
+def test_incremental_update_survives_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    # Full build: one crime by the first edge only
+    built = _safety_graph()
+    built.graph = _line_graph()
+    built.gdf_assets = SimpleNamespace(empty=True)
+    built.gdf_crimes = _points([(10.0, 10.0)])
+    built.calculate_risk_scores()
+    built.crimes_through = datetime(2026, 3, 1, 12)
+    built._write_state("full")
+    saved = _as_graphml(built.graph)
+
+    # A crime reported before the build but geocoded after it, within 100 m
+    # of samples on edges 1-2 and 2-3 but not 0-1 (nearest sample 103 m)
+    new_crimes = pd.DataFrame({
+        "incident_type": ["Assault"],
+        "lon": [170.0],
+        "lat": [40.0],
+        "geocoded_at": [pd.Timestamp("2026-03-02 08:00")],
+    })
+    update = _safety_graph()
+    with patch.object(safety_graph.ox, "load_graphml", return_value=copy.deepcopy(saved)), \
+            patch.object(safety_graph.pd, "read_sql", return_value=new_crimes) as read_sql, \
+            patch.object(SafetyGraph, "_project_points", lambda self, df: df[["lon", "lat"]].to_numpy()), \
+            patch.object(SafetyGraph, "save_compiled") as save_compiled:
+        assert update.update_incremental() == 2
+
+    query, _ = read_sql.call_args.args
+    assert "geocoded_at > %(since)s" in query
+    assert read_sql.call_args.kwargs["params"] == {"since": datetime(2026, 3, 1, 12)}
+    assert update.crimes_through == datetime(2026, 3, 2, 8)
+    save_compiled.assert_called_once()
+
+    # edge_risk rows updated for exactly the touched edges
+    conn = update.engine.begin.return_value.__enter__.return_value
+    rows = sorted(conn.execute.call_args.args[1], key=lambda row: row["u"])
+    assert rows == [
+        {"u": 1, "v": 2, "k": 0, "risk_factor": 1.25, "safety_score": 125.0},
+        {"u": 2, "v": 3, "k": 0, "risk_factor": 1.25, "safety_score": 1250.0},
+    ]
+
+    # Reloading the saved graph replays the delta on top of the full build
+    reloaded = _safety_graph()
+    with patch.object(safety_graph.ox, "load_graphml", return_value=copy.deepcopy(saved)):
+        reloaded.load_graph()
+    weights = {
+        (u, v): (data["crime_count"], data["risk_factor"], data["safety_score"])
+        for u, v, data in reloaded.graph.edges(data=True)
+    }
+    assert weights == {
+        (0, 1): (1, 1.25, 125.0),
+        (1, 2): (1, 1.25, 125.0),
+        (2, 3): (1, 1.25, 1250.0),
+    }
+
+
+def test_batched_risk_scores_match_hand_computation():
+    # 0 --150m-- 1 --40m-- 2, then 1200 m north to 3
+    sg = _safety_graph()
+    sg.graph = nx.MultiDiGraph(crs="EPSG:32615")
+    for node, (x, y) in enumerate([(0, 0), (150, 0), (190, 0), (190, 1200)]):
+        sg.graph.add_node(node, x=float(x), y=float(y))
+    sg.graph.add_edge(0, 1, 0, length=150.0)
+    sg.graph.add_edge(1, 2, 0, length=40.0)
+    sg.graph.add_edge(2, 3, 0, length=1200.0)
+    edges = list(sg.graph.edges(keys=True, data=True))
+
+    # ceil(length / 50) samples at (i + 0.5) / n, capped at 20 per edge
+    points, edge_of_point = sg._edge_sample_points(edges)
+    assert edge_of_point.tolist() == [0, 0, 0, 1] + [2] * 20
+    assert points[:4].tolist() == [[25, 0], [75, 0], [125, 0], [170, 0]]
+    assert points[4:6].tolist() == [[190, 30], [190, 90]]
+
+    # The first crime is within 100 m of all three samples of edge 0-1 but
+    # counts once; the second reaches every edge. The asset is 30 m from a
+    # sample of edge 2-3 only.
+    sg.gdf_crimes = _points([(75.0, 60.0), (160.0, 20.0)])
+    sg.gdf_assets = _points([(190.0, 600.0)])
+    sg.calculate_risk_scores()
+
+    scored = {
+        (u, v): (data["crime_count"], data["asset_factor"], data["risk_factor"], data["safety_score"])
+        for u, v, data in sg.graph.edges(data=True)
+    }
+    expected = {
+        (0, 1): (2, 1.0, 1.0 * (1.2 + 0.05 * 2), 150 * 1.3),
+        (1, 2): (1, 1.0, 1.0 * (1.2 + 0.05 * 1), 40 * 1.25),
+        (2, 3): (1, 0.8, 0.8 * (1.2 + 0.05 * 1), 1200 * 1.0),
+    }
+    assert scored.keys() == expected.keys()
+    for edge, values in expected.items():
+        assert np.allclose(scored[edge], values), edge
+
+    # No crimes keeps the asset factor; counts past 10 stop adding penalty
+    assert risk_factors(np.array([0.8, 1.0]), np.array([0, 15])).tolist() == [0.8, 1.7]